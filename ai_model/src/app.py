@@ -3,10 +3,21 @@
 # OBJETIVO: API FastAPI com suporte a predição direta ou via ID de aluno
 # =============================================================================
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+from fastapi import BackgroundTasks, FastAPI, Header, HTTPException, Query, Request
+from pydantic import BaseModel, ValidationError
 from enum import Enum
+from itertools import product
+from typing import Any, Dict, List
+import math
+import os
+import threading
+import time
 from pathlib import Path
+
+# Limites de threads (OpenMP/BLAS/joblib) antes de carregar pandas/NumPy
+from src.models.thread_budget import apply_thread_budget, effective_settings
+apply_thread_budget()
+
 import pandas as pd
 
 
@@ -18,6 +29,13 @@ def _model_to_dict(model: BaseModel) -> dict:
 # Serviços de ML
 from src.models.dropout_service import DropoutService
 from src.models.preview import PredictionService
+from src.models.online_dropout import OnlineDropoutTrainer
+from src.models.explanation_jobs import ExplanationJobManager, QueueFullError
+from src.models.model_registry import BUNDLED_VERSION, ModelRegistry, ModelSlot
+from src.models.shadow import ShadowEvaluator
+from src.models.counterfactual import CounterfactualSearch
+from src.models.approval_cube import ApprovalCube
+from src.datasets.storage import load_dataset
 
 # =============================================================================
 # MODELOS DE ENTRADA
@@ -50,6 +68,9 @@ class DropoutData(BaseModel):
     ParentschoolSatisfaction: SatisfactionLevel  # Satisfação dos pais (Good/Bad)
     StudentAbsenceDays: AbsenceDays          # Faixa de faltas do aluno
 
+class LabelledDropoutData(DropoutData):
+    dropout_label: int               # Rótulo observado (1 = Evadiu, 0 = Permaneceu)
+
 class BinaryChoice(str, Enum):
     yes = "Yes"
     no = "No"
@@ -93,8 +114,21 @@ class TeacherQualityEnum(str, Enum):
     average = "Average"
     good = "Good"
 
+class ExplainTier(str, Enum):
+    none = "none"        # Sem fatores
+    fast = "fast"        # Contribuições por caminho das árvores (Saabas)
+    approx = "approx"    # SHAP amostrado com orçamento fixo
+    exact = "exact"      # SHAP completo
+
+class ResponseLevel(str, Enum):
+    full = "full"            # Relatório completo
+    category = "category"    # Decisão + categoria (floresta com parada antecipada)
+    decision = "decision"    # Só aprovado/reprovado (floresta com parada antecipada)
+
 # --- MODELO DE DADOS (Validação com Pydantic) ---
 # Atualizado para usar os Enums e os tipos de dados corretos.
+# Campos removidos por feature_pruning.py continuam aceitos e são ignorados
+# pelo PredictionService (só as colunas do pré-processador são usadas).
 class StudentData(BaseModel):
     Hours_Studied: float
     Previous_Scores: float
@@ -116,6 +150,15 @@ class StudentData(BaseModel):
     Tutoring_Sessions: BinaryChoice
     Physical_Activity: Level
 
+class CohortData(BaseModel):
+    cohort: str                      # Identificador da coorte (ex.: turma, curso, IES)
+    students: List[StudentData]      # Alunos da coorte
+
+class SimulationRequest(BaseModel):
+    student: StudentData                         # Aluno base
+    grid: Dict[str, List[Any]] = {}              # Valores por campo (produto cartesiano)
+    variants: List[Dict[str, Any]] = []          # Alterações explícitas (uma por variante)
+
 
 # =============================================================================
 # CONFIGURAÇÃO DE CAMINHOS E CARREGAMENTO DE DATASETS
@@ -123,30 +166,140 @@ class StudentData(BaseModel):
 BASE_DIR = Path(__file__).resolve().parent
 DATA_DROP = BASE_DIR / "datasets" / "xAPI_dropout.csv"
 DATA_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
-
-df_dropout = pd.read_csv(DATA_DROP)
-df_performance = pd.read_csv(DATA_PATH)
+# Os datasets são lidos sob demanda pelos serviços via src.datasets.storage
+# (formato colunar tipado, apenas as colunas necessárias).
 
 # =============================================================================
 # CARREGAMENTO DOS MODELOS
 # =============================================================================
-DROP_PREPROCESS = BASE_DIR / "pipelines" / "dropout_preprocess.pkl"
-DROP_MODEL = BASE_DIR / "pipelines" / "dropout_logreg_model.pkl"
-PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess.pkl"
-LOGREG_PATH = BASE_DIR / "pipelines" / "perf_logreg_model.pkl"
-RF_PATH = BASE_DIR / "pipelines" / "perf_rf_model.pkl"
-
-try:
-    dropout_service = DropoutService(DROP_PREPROCESS, DROP_MODEL)
-except Exception as e:
-    print(f"Não foi possível iniciar o serviço de predição. Erro: {e}")
-    dropout_service = None
-
-try:
-    prediction_service = PredictionService(PREPROCESSOR_PATH, LOGREG_PATH, RF_PATH, DATA_PATH)
-except Exception as e:
-    print(f"Não foi possível iniciar o serviço de predição. Erro: {e}")
-    prediction_service = None
+# Sem versão ativa no registro, os serviços usam os arquivos de src/pipelines.
+PIPELINES_DIR = BASE_DIR / "pipelines"
+REGISTRY_DIR = Path(os.getenv("MODEL_REGISTRY_DIR", PIPELINES_DIR / "registry"))
+DROP_ONLINE_CHECKPOINT = PIPELINES_DIR / "dropout_online_checkpoint.pkl"
+# Rótulo do modelo incremental de evasão quando ele é o modelo servido
+ONLINE_VERSION = "online"
+# Sem ADMIN_TOKEN, as rotas /admin/* ficam desabilitadas
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def _load_dropout(model_dir):
+    """Cria o serviço de evasão de um diretório de artefatos e o aquece."""
+    service = DropoutService(
+        model_dir / "dropout_preprocess.pkl",
+        model_dir / "dropout_logreg_model.pkl",
+        reference_path=DATA_DROP
+    )
+    if service.reference_data is not None:
+        service.predict_dropout_batch(service.reference_data.head(1).to_dict("records"))
+    return service
+
+def _load_performance(model_dir):
+    """Cria o serviço de desempenho (explainers SHAP inclusos) e o aquece."""
+    service = PredictionService(
+        model_dir / "perf_preprocess.pkl",
+        model_dir / "perf_logreg_model.pkl",
+        model_dir / "perf_rf_model.pkl",
+        DATA_PATH
+    )
+    service.warm_up()
+    return service
+
+model_registry = ModelRegistry(REGISTRY_DIR, loaders={
+    "dropout": _load_dropout,
+    "performance": _load_performance
+})
+
+def _initial_slot(name, loader):
+    """Slot com a versão ativa do registro ou, se não houver, com src/pipelines."""
+    version = model_registry.active_version(name) or BUNDLED_VERSION
+    try:
+        if version == BUNDLED_VERSION:
+            service = loader(PIPELINES_DIR)
+        else:
+            service = model_registry.load(name, version)
+    except Exception as e:
+        print(f"Não foi possível iniciar o serviço de predição ({name}, versão {version}). Erro: {e}")
+        service = None
+    return ModelSlot(name, service, version)
+
+# Cada requisição lê slot.current uma vez: uma troca de versão não afeta
+# requisições em andamento.
+dropout_slot = _initial_slot("dropout", _load_dropout)
+performance_slot = _initial_slot("performance", _load_performance)
+MODEL_SLOTS = {"dropout": dropout_slot, "performance": performance_slot}
+
+# Modelo incremental de evasão: se houver checkpoint e nenhuma versão do
+# registro estiver ativa, ele substitui os arquivos de src/pipelines, é servido
+# como a versão ONLINE_VERSION e recebe novos lotes via /train/dropout/online.
+online_dropout_trainer = None
+if (dropout_slot.current.service and dropout_slot.current.version == BUNDLED_VERSION
+        and DROP_ONLINE_CHECKPOINT.exists()):
+    try:
+        online_dropout_trainer = OnlineDropoutTrainer.load(DROP_ONLINE_CHECKPOINT, service=dropout_slot.current.service)
+        dropout_slot.current.service.publish(online_dropout_trainer.preprocessor, online_dropout_trainer.model)
+        dropout_slot.swap(dropout_slot.current.service, ONLINE_VERSION)
+    except Exception as e:
+        print(f"Não foi possível carregar o modelo incremental de evasão. Erro: {e}")
+        online_dropout_trainer = None
+
+# Importância global do dataset de treino: pré-calculada fora da API
+# (python -m src.models.global_importance) e só lida do disco aqui, para não
+# disputar CPU com as requisições.
+
+def _on_dropout_swap(service, previous):
+    # Uma versão do registro foi ativada: o modelo incremental deixa de ser
+    # servido e não publica mais nada no serviço dela
+    if online_dropout_trainer:
+        online_dropout_trainer.service = None
+
+ON_SWAP = {"dropout": _on_dropout_swap, "performance": None}
+
+# Jobs de explicação assíncrona (opt-in em POST /predict/performance)
+EXPLANATION_WORKERS = int(os.getenv("EXPLANATION_WORKERS", "2"))
+EXPLANATION_JOB_TTL_SECONDS = int(os.getenv("EXPLANATION_JOB_TTL_SECONDS", "600"))
+# Jobs aguardando na fila; acima disso a resposta sai sem explicação (tier none)
+EXPLANATION_MAX_PENDING = int(os.getenv("EXPLANATION_MAX_PENDING", "100"))
+explanation_jobs = ExplanationJobManager(
+    max_workers=EXPLANATION_WORKERS,
+    ttl_seconds=EXPLANATION_JOB_TTL_SECONDS,
+    max_pending=EXPLANATION_MAX_PENDING
+)
+
+# Limite de variantes por chamada de POST /simulate/performance
+MAX_SIMULATION_VARIANTS = int(os.getenv("MAX_SIMULATION_VARIANTS", "1000"))
+# Alunos por coorte em POST /explain/global (SHAP síncrono)
+MAX_GLOBAL_COHORT_SIZE = int(os.getenv("MAX_GLOBAL_COHORT_SIZE", "5000"))
+
+# Contrafactuais de POST /counterfactual/performance: orçamento máximo de
+# variantes avaliadas por pedido e cache por (versão do modelo, aluno)
+COUNTERFACTUAL_MAX_EVALUATIONS = int(os.getenv("COUNTERFACTUAL_MAX_EVALUATIONS", "2000"))
+counterfactual_search = CounterfactualSearch(
+    max_evaluations=COUNTERFACTUAL_MAX_EVALUATIONS,
+    cache_size=int(os.getenv("COUNTERFACTUAL_CACHE_SIZE", "256"))
+)
+
+# Com RECORD_PERCENTILES=1, cada predição servida entra (incrementalmente)
+# na distribuição de referência dos percentis da versão ativa
+RECORD_PERCENTILES = os.getenv("RECORD_PERCENTILES", "0") == "1"
+
+# Cubo de taxa de aprovação do dataset de desempenho (GET /analytics/approval),
+# montado na primeira consulta
+_approval_cube = None
+_approval_cube_lock = threading.Lock()
+
+def _get_approval_cube():
+    global _approval_cube
+    with _approval_cube_lock:
+        if _approval_cube is None:
+            _approval_cube = ApprovalCube(load_dataset(DATA_PATH))
+    return _approval_cube
+
+# Avaliação sombra de um candidato de desempenho (versão do registro),
+# ativada por POST /admin/shadow/{version}
+shadow_evaluator = ShadowEvaluator(
+    sample_rate=float(os.getenv("SHADOW_SAMPLE_RATE", "0.1")),
+    window=int(os.getenv("SHADOW_WINDOW", "1000"))
+)
+shadow_state = {"status": "idle"}
 
 # =============================================================================
 # INICIALIZAÇÃO DA API
@@ -160,6 +313,35 @@ app = FastAPI(
     version="2.1.0"
 )
 
+@app.middleware("http")
+async def add_model_versions_header(request: Request, call_next):
+    """Informa as versões ativas dos modelos em todas as respostas."""
+    response = await call_next(request)
+    response.headers["X-Model-Versions"] = ";".join(
+        f"{name}={slot.current.version}" for name, slot in MODEL_SLOTS.items()
+    )
+    return response
+
+def _live_dropout():
+    """Versão e serviço de evasão ativos, lidos uma vez por requisição."""
+    live = dropout_slot.current
+    if not live.service:
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço de evasão indisponível devido a erro na inicialização."
+        )
+    return live
+
+def _live_performance():
+    """Versão e serviço de desempenho ativos, lidos uma vez por requisição."""
+    live = performance_slot.current
+    if not live.service:
+        raise HTTPException(
+            status_code=503,
+            detail="Serviço não está disponível devido a um erro na inicialização."
+        )
+    return live
+
 # =============================================================================
 # ROTAS DA API
 # =============================================================================
@@ -174,12 +356,21 @@ def health_check():
         "message": "API de Predição Acadêmica funcionando",
         "version": "2.1.0",
         "services": {
-            "dropout_service": "OK" if dropout_service else "ERROR",
-            "prediction_service": "OK" if prediction_service else "ERROR"
+            "dropout_service": "OK" if dropout_slot.current.service else "ERROR",
+            "prediction_service": "OK" if performance_slot.current.service else "ERROR"
         },
+        "model_versions": {name: slot.current.version for name, slot in MODEL_SLOTS.items()},
         "timestamp": "2024-01-15T10:30:00.000Z"
     }
 
+@app.get("/diagnostics/threads", summary="Limites de threads efetivos deste processo")
+def thread_diagnostics():
+    """
+    Núcleos, processos e threads por processo usados no orçamento, as
+    variáveis de ambiente aplicadas e os pools nativos carregados.
+    """
+    return effective_settings()
+
 @app.get("/", summary="Informações da API")
 def root():
     """
@@ -191,7 +382,37 @@ def root():
         "version": "2.1.0",
         "endpoints": {
             "health": "/health",
+            "thread_diagnostics": "/diagnostics/threads",
             "docs": "/docs",
+            "global_explanation": {
+                "GET": "/explain/global",
+                "POST": "/explain/global"
+            },
+            "explanation_job": {
+                "GET": "/explain/{job_id}"
+            },
+            "performance_simulation": {
+                "POST": "/simulate/performance"
+            },
+            "performance_counterfactual": {
+                "POST": "/counterfactual/performance"
+            },
+            "approval_analytics": {
+                "GET": ["/analytics/approval", "/analytics/approval/dimensions"]
+            },
+            "shadow_evaluation": {
+                "GET": "/admin/shadow",
+                "POST": "/admin/shadow/{version}",
+                "DELETE": "/admin/shadow"
+            },
+            "model_admin": {
+                "GET": "/admin/models",
+                "POST": ["/admin/models/{name}/activate/{version}", "/admin/models/{name}/rollback"]
+            },
+            "percentile_admin": {
+                "GET": "/admin/percentiles",
+                "POST": "/admin/percentiles/{name}/rebuild"
+            },
             "dropout_prediction": {
                 "POST": "/predict/dropout",
                 "GET": "/predict/dropout",
@@ -205,7 +426,7 @@ def root():
                 "DELETE": "/predict/performance"
             }
         },
-        "status": "OK" if (dropout_service and prediction_service) else "PARTIAL"
+        "status": "OK" if (dropout_slot.current.service and performance_slot.current.service) else "PARTIAL"
     }
 
 @app.post("/predict/dropout", summary="Prediz risco de evasão do aluno")
@@ -213,18 +434,17 @@ def predict_dropout(data: DropoutData):
     """
     Recebe os dados de um aluno e retorna o risco de evasão previsto.
     """
-    if not dropout_service:
-        raise HTTPException(
-            status_code=503,
-            detail="Serviço de evasão indisponível devido a erro na inicialização."
-        )
+    live = _live_dropout()
 
     try:
         # Converte o objeto Pydantic em dicionário limpo para o modelo
         student_data_dict = _model_to_dict(data)
 
         # Realiza a predição
-        prediction = dropout_service.predict_dropout(student_data_dict)
+        prediction = live.service.predict_dropout(student_data_dict)
+        prediction["model_version"] = live.version
+        if RECORD_PERCENTILES:
+            live.service.percentile_index.record([prediction["probability_dropout"]])
 
         return prediction
 
@@ -239,15 +459,12 @@ def get_dropout_prediction(data: DropoutData):
     """
     Obtém a predição de evasão com os mesmos parâmetros do POST.
     """
-    if not dropout_service:
-        raise HTTPException(
-            status_code=503,
-            detail="Serviço de evasão indisponível devido a erro na inicialização."
-        )
+    live = _live_dropout()
 
     try:
         student_data_dict = _model_to_dict(data)
-        prediction = dropout_service.predict_dropout(student_data_dict)
+        prediction = live.service.predict_dropout(student_data_dict)
+        prediction["model_version"] = live.version
         return prediction
 
     except Exception as e:
@@ -261,15 +478,12 @@ def update_dropout_prediction(data: DropoutData):
     """
     Atualiza ou recalcula a predição de evasão com novos dados.
     """
-    if not dropout_service:
-        raise HTTPException(
-            status_code=503,
-            detail="Serviço de evasão indisponível devido a erro na inicialização."
-        )
+    live = _live_dropout()
     
     try:
         student_data_dict = _model_to_dict(data)
-        prediction = dropout_service.predict_dropout(student_data_dict)
+        prediction = live.service.predict_dropout(student_data_dict)
+        prediction["model_version"] = live.version
         
         return {
             "message": "Predição atualizada com sucesso",
@@ -299,24 +513,302 @@ def delete_dropout_prediction(data: DropoutData):
             detail=f"Ocorreu um erro ao processar a requisição: {str(e)}"
         )
 
-@app.post('/predict/performance', summary="Gera um relatório de predição de desempenho")
-def predict(student_data: StudentData):
+@app.get("/explain/global", summary="Importância global das features (pré-calculada)")
+def get_global_explanation(
+    model: str = Query("Random Forest", description="Modelo explicado"),
+    cohort: str = Query("training", description="Coorte: 'training' ou uma coorte enviada via POST")
+):
     """
-    Recebe os dados do aluno em formato de texto categórico e retorna o relatório.
+    Retorna a média de |SHAP| por feature e a média com sinal por valor de
+    cada categoria, já calculadas para a versão atual do modelo.
     """
-    if not prediction_service:
+    service = _live_performance().service
+    if model not in service.models:
+        raise HTTPException(status_code=404, detail=f"Modelo '{model}' não encontrado.")
+
+    result = service.get_global_importance(model, cohort)
+    if result is None:
         raise HTTPException(
-            status_code=503, 
-            detail="Serviço não está disponível devido a um erro na inicialização."
+            status_code=404,
+            detail=(
+                f"Importância global ainda não calculada para a coorte '{cohort}'. "
+                "Pré-calcule com: python -m src.models.global_importance"
+            )
         )
+    return result
+
+@app.post("/explain/global", summary="Calcula a importância global para uma coorte")
+def compute_global_explanation(data: CohortData, model: str = Query("Random Forest")):
+    """
+    Calcula e armazena a importância global de uma coorte enviada. Se a
+    coorte e o modelo não mudaram, devolve o resultado armazenado.
+    """
+    service = _live_performance().service
+    if model not in service.models:
+        raise HTTPException(status_code=404, detail=f"Modelo '{model}' não encontrado.")
+    if not data.students:
+        raise HTTPException(status_code=422, detail="A coorte enviada está vazia.")
+    if len(data.students) > MAX_GLOBAL_COHORT_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Coorte com {len(data.students)} alunos excede o limite de {MAX_GLOBAL_COHORT_SIZE}."
+        )
+
+    try:
+        students = [_model_to_dict(student) for student in data.students]
+        return service.compute_global_importance(model, students=students, cohort=data.cohort)
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao calcular a importância global: {str(e)}"
+        )
+
+@app.post("/train/dropout/online", summary="Atualiza o modelo incremental de evasão com novos rótulos")
+def update_online_dropout(batch: List[LabelledDropoutData]):
+    """
+    Aplica um mini-lote de matrículas rotuladas ao modelo incremental,
+    grava o checkpoint e publica o modelo atualizado no serviço de evasão.
+    Só os coeficientes dos campos enviados são atualizados; as demais
+    features do xAPI entram com o seu valor médio.
+    """
+    if not online_dropout_trainer:
+        raise HTTPException(
+            status_code=503,
+            detail="Modelo incremental de evasão indisponível. Execute o bootstrap (trainingOnlineDropout.py)."
+        )
+    if dropout_slot.current.version != ONLINE_VERSION:
+        raise HTTPException(
+            status_code=409,
+            detail=(
+                f"A versão servida de evasão é '{dropout_slot.current.version}'; "
+                "o modelo incremental só é atualizado enquanto é a versão servida."
+            )
+        )
+    if not batch:
+        raise HTTPException(status_code=422, detail="O lote de atualização está vazio.")
+
+    try:
+        df_batch = pd.DataFrame([_model_to_dict(item) for item in batch])
+        state = online_dropout_trainer.update(df_batch)
+        return {
+            "message": "Modelo incremental de evasão atualizado com sucesso",
+            "batch_size": len(batch),
+            **state
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao atualizar o modelo: {str(e)}"
+        )
+
+def _check_admin_token(token):
+    # As rotas administrativas exigem o cabeçalho X-Admin-Token; sem
+    # ADMIN_TOKEN configurado, ficam fechadas
+    if not ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=503,
+            detail="Rotas administrativas desabilitadas: defina ADMIN_TOKEN no ambiente."
+        )
+    if token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Token administrativo inválido.")
+
+def _model_slot(name):
+    slot = MODEL_SLOTS.get(name)
+    if slot is None:
+        raise HTTPException(status_code=404, detail=f"Modelo '{name}' não encontrado.")
+    return slot
+
+def _activate(name, version):
+    try:
+        state = model_registry.activate(name, version, MODEL_SLOTS[name], on_swap=ON_SWAP[name])
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {
+        "message": f"Ativação da versão '{version}' iniciada; a troca ocorre após o aquecimento",
+        "model": name,
+        "active_version": MODEL_SLOTS[name].current.version,
+        "state": state
+    }
+
+@app.get("/admin/models", summary="Lista as versões registradas e as ativas")
+def list_model_versions(x_admin_token: str = Header(None)):
+    """
+    Versão ativa, estado da última ativação e versões registradas de cada modelo.
+    """
+    _check_admin_token(x_admin_token)
+    return {
+        name: {
+            "active_version": slot.current.version,
+            "state": slot.state,
+            "versions": model_registry.versions(name)
+        }
+        for name, slot in MODEL_SLOTS.items()
+    }
+
+@app.post("/admin/models/{name}/activate/{version}", status_code=202,
+          summary="Ativa uma versão registrada sem reiniciar a API")
+def activate_model_version(name: str, version: str, x_admin_token: str = Header(None)):
+    """
+    Carrega e aquece a versão em segundo plano e troca o modelo servido.
+    Acompanhe o andamento em GET /admin/models.
+    """
+    _check_admin_token(x_admin_token)
+    _model_slot(name)
+    return _activate(name, version)
+
+@app.post("/admin/models/{name}/rollback", status_code=202,
+          summary="Volta para a versão ativa anterior")
+def rollback_model_version(name: str, x_admin_token: str = Header(None)):
+    """
+    Reativa a versão que estava em produção antes da atual.
+    """
+    _check_admin_token(x_admin_token)
+    slot = _model_slot(name)
+    target = model_registry.rollback_target(name, slot.current.version)
+    if target is None:
+        raise HTTPException(status_code=409, detail=f"Não há versão anterior registrada para '{name}'.")
+    return _activate(name, target)
+
+@app.get("/admin/percentiles", summary="Tamanho das distribuições de referência dos percentis")
+def percentile_state(x_admin_token: str = Header(None)):
+    """
+    Versão ativa, valores na referência e predições aguardando intercalação.
+    """
+    _check_admin_token(x_admin_token)
+    return {
+        name: {"model_version": slot.current.version, **slot.current.service.percentile_index.state()}
+        for name, slot in MODEL_SLOTS.items() if slot.current.service
+    }
+
+@app.post("/admin/percentiles/{name}/rebuild", summary="Substitui a referência dos percentis")
+def rebuild_percentiles(name: str, values: List[float], x_admin_token: str = Header(None)):
+    """
+    Reconstrói a distribuição de referência da versão ativa a partir das
+    notas (desempenho) ou probabilidades (evasão) de uma pontuação completa.
+    """
+    _check_admin_token(x_admin_token)
+    live = _model_slot(name).current
+    if not live.service:
+        raise HTTPException(status_code=503, detail=f"Serviço '{name}' indisponível.")
+    if not values:
+        raise HTTPException(status_code=422, detail="Informe ao menos um valor de referência.")
+    live.service.percentile_index.rebuild(values)
+    return {"model": name, "model_version": live.version, **live.service.percentile_index.state()}
+
+def _load_shadow_candidate(version):
+    global shadow_state
+    try:
+        service = model_registry.load("performance", version)
+        shadow_evaluator.set_candidate(version, service)
+        shadow_state = {"status": "active", "version": version}
+    except Exception as e:
+        shadow_state = {"status": "failed", "version": version, "error": str(e)}
+
+@app.get("/admin/shadow", summary="Resumo da avaliação sombra do candidato")
+def get_shadow_summary(x_admin_token: str = Header(None)):
+    """
+    Diferença de score, inversões de aprovação (corte 60) e latências do
+    modelo principal e do candidato nas últimas requisições amostradas.
+    """
+    _check_admin_token(x_admin_token)
+    return {"state": shadow_state, **shadow_evaluator.summary()}
+
+@app.post("/admin/shadow/{version}", status_code=202, summary="Define a versão candidata da avaliação sombra")
+def start_shadow(
+    version: str,
+    sample_rate: float = Query(None, ge=0.0, le=1.0, description="Fração das requisições avaliadas"),
+    x_admin_token: str = Header(None)
+):
+    """
+    Carrega uma versão registrada de desempenho em segundo plano e passa a
+    reavaliar nela uma amostra das requisições de POST /predict/performance.
+    """
+    global shadow_state
+    _check_admin_token(x_admin_token)
+    if not model_registry.version_dir("performance", version).is_dir():
+        raise HTTPException(status_code=404, detail=f"Versão '{version}' de 'performance' não encontrada no registro.")
+    if shadow_state.get("status") == "loading":
+        raise HTTPException(status_code=409, detail="Já existe um candidato sendo carregado.")
+    if sample_rate is not None:
+        shadow_evaluator.sample_rate = sample_rate
+    shadow_state = {"status": "loading", "version": version}
+    threading.Thread(target=_load_shadow_candidate, args=(version,), daemon=True).start()
+    return {"message": f"Carregando a versão candidata '{version}'", "state": shadow_state}
+
+@app.delete("/admin/shadow", summary="Encerra a avaliação sombra")
+def stop_shadow(x_admin_token: str = Header(None)):
+    """
+    Remove o candidato; o resumo final é devolvido na resposta.
+    """
+    global shadow_state
+    _check_admin_token(x_admin_token)
+    summary = shadow_evaluator.summary()
+    shadow_evaluator.clear_candidate()
+    shadow_state = {"status": "idle"}
+    return {"message": "Avaliação sombra encerrada", **summary}
+
+def _explain_job(service, processed, student_data_dict, tier):
+    """Executado no pool de explicações: fatores e custo de um aluno."""
+    # Usa o mesmo serviço da predição, mesmo que outra versão já esteja ativa
+    explanations, cost = service.explain_students(processed, [student_data_dict], tier=tier)
+    return {"factors": explanations[0], "explanation": cost}
+
+@app.post('/predict/performance', summary="Gera um relatório de predição de desempenho")
+def predict(
+    student_data: StudentData,
+    background_tasks: BackgroundTasks,
+    async_explain: bool = Query(False, description="Retorna a nota já e calcula os fatores em segundo plano"),
+    explain: ExplainTier = Query(ExplainTier.exact, description="Fidelidade da explicação: none, fast, approx ou exact"),
+    response: ResponseLevel = Query(ResponseLevel.full, description="full, category ou decision (sem nota e sem fatores)")
+):
+    """
+    Recebe os dados do aluno em formato de texto categórico e retorna o relatório.
+    Com response=decision/category, devolve só a decisão (e a categoria) e o
+    número de árvores usadas.
+    Com async_explain=true, os fatores vêm depois via GET /explain/{job_id}.
+    O nível de explicação usado e o seu custo vêm em "explanation".
+    """
+    live = _live_performance()
 
     try:
         # Converte o modelo (incluindo enums) em dicionário de strings/números
         # pronto para o pipeline de pré-processamento.
         student_data_dict = _model_to_dict(student_data)
+        started = time.perf_counter()
+
+        if response != ResponseLevel.full:
+            decision = live.service.decide_students([student_data_dict], level=response.value)[0]
+            decision["model_version"] = live.version
+            return decision
         
-        report = prediction_service.generate_report(student_data_dict)
+        if async_explain and explain != ExplainTier.none:
+            processed, reports = live.service.score_students([student_data_dict])
+            report = reports[0]
+            report["factors"] = []
+            try:
+                report["explanation_job_id"] = explanation_jobs.submit(
+                    _explain_job, live.service, processed, student_data_dict, explain.value
+                )
+                report["explanation"] = {"tier": explain.value}
+                report["explanation_status"] = "pending"
+            except QueueFullError:
+                # Fila cheia: a nota sai sem fatores em vez de crescer a fila
+                report["explanation"] = {"tier": ExplainTier.none.value, "requested_tier": explain.value}
+                report["explanation_status"] = "rejected"
+        else:
+            report = live.service.generate_report(student_data_dict, tier=explain.value)
+        report["model_version"] = live.version
         report["saved"] = False  # Por padrão, não salva
+        if RECORD_PERCENTILES:
+            live.service.percentile_index.record([report["predicted_score"]])
+
+        # Sombra: o candidato é avaliado depois do envio da resposta
+        primary_ms = (time.perf_counter() - started) * 1000 - report["explanation"].get("duration_ms", 0)
+        background_tasks.add_task(shadow_evaluator.observe, [student_data_dict], [report], primary_ms)
             
         return report
     
@@ -326,6 +818,174 @@ def predict(student_data: StudentData):
             detail=f"Ocorreu um erro ao processar a requisição: {str(e)}"
         )
 
+def _simulation_overrides(request: SimulationRequest):
+    """Variantes explícitas seguidas do produto cartesiano de `grid`, validadas."""
+    # Tamanho e campos são verificados antes de expandir a grade
+    grid_size = math.prod(len(values) for values in request.grid.values()) if request.grid else 0
+    n_variants = len(request.variants) + grid_size
+    if n_variants > MAX_SIMULATION_VARIANTS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Número de variantes ({n_variants}) excede o limite de {MAX_SIMULATION_VARIANTS}."
+        )
+    known = set(getattr(StudentData, "model_fields", None) or StudentData.__fields__)
+    requested = {field for override in request.variants for field in override} | set(request.grid or {})
+    unknown = sorted(requested - known)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Campos desconhecidos na simulação: {', '.join(unknown)}."
+        )
+
+    overrides = list(request.variants)
+    if request.grid:
+        fields = list(request.grid)
+        overrides += [dict(zip(fields, values)) for values in product(*request.grid.values())]
+
+    base = _model_to_dict(request.student)
+    validated = []
+    for override in overrides:
+        try:
+            # Mesmas regras de StudentData (tipos e valores das categorias)
+            row = _model_to_dict(StudentData(**{**base, **override}))
+        except ValidationError as e:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Variante inválida {override}: {e.errors()[0].get('msg')}"
+            )
+        validated.append({field: row[field] for field in override})
+    return base, validated
+
+@app.post('/simulate/performance', summary="Simula variantes (\"e se\") de um aluno em uma chamada")
+def simulate_performance(request: SimulationRequest):
+    """
+    Pontua o aluno base e todas as variantes (lista `variants` e/ou grade
+    `grid`, ex.: {"Hours_Studied": [10, 12, 14], "Sleep_Hours": [7, 8]}) em
+    uma única passada vetorizada, sem SHAP. Retorna uma tabela compacta com
+    a nota prevista e a aprovação de cada variante.
+    """
+    live = _live_performance()
+    base, overrides = _simulation_overrides(request)
+
+    try:
+        started = time.perf_counter()
+        base_report, reports = live.service.simulate_student(base, overrides)
+        fields = list(dict.fromkeys(field for override in overrides for field in override))
+        return {
+            "model_version": live.version,
+            "base": {
+                "predicted_score": base_report["predicted_score"],
+                "is_approved": base_report["is_approved"],
+                "grade_category": base_report["grade_category"]
+            },
+            "fields": fields,
+            "variants": [
+                {**override, "predicted_score": report["predicted_score"], "is_approved": report["is_approved"]}
+                for override, report in zip(overrides, reports)
+            ],
+            "n_variants": len(overrides),
+            "duration_ms": (time.perf_counter() - started) * 1000
+        }
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao simular as variantes: {str(e)}"
+        )
+
+@app.post('/counterfactual/performance', summary="Menores mudanças de hábitos que levam à aprovação")
+def counterfactual_performance(
+    student_data: StudentData,
+    max_results: int = Query(3, ge=1, le=10, description="Número de conjuntos de mudanças retornados"),
+    budget: int = Query(None, ge=1, description="Máximo de variantes avaliadas (limitado pela configuração)")
+):
+    """
+    Para um aluno REPROVADO, busca os conjuntos de mudanças em campos
+    acionáveis (horas de estudo, frequência, sono, tutoria, motivação...)
+    de menor custo que levam a nota prevista a 60 ou mais. Alunos aprovados
+    recebem a lista vazia.
+    """
+    live = _live_performance()
+
+    try:
+        result = counterfactual_search.search(
+            live.service,
+            live.version,
+            _model_to_dict(student_data),
+            n_results=max_results,
+            max_evaluations=min(budget or COUNTERFACTUAL_MAX_EVALUATIONS, COUNTERFACTUAL_MAX_EVALUATIONS)
+        )
+        result["model_version"] = live.version
+        return result
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao buscar contrafactuais: {str(e)}"
+        )
+
+@app.get("/analytics/approval", summary="Taxa de aprovação e nota média de uma fatia do dataset")
+def approval_slice(
+    filter: List[str] = Query([], description="Filtros 'campo=valor' (ex.: Motivation_Level=Low, Attendance=<70%)"),
+    group_by: str = Query(None, description="Dimensão detalhada na resposta (ex.: Attendance)")
+):
+    """
+    Consulta o cubo pré-calculado (até duas dimensões por consulta, contando
+    filtros e group_by). As faixas e valores disponíveis estão em
+    GET /analytics/approval/dimensions.
+    """
+    filters = {}
+    for item in filter:
+        field, sep, value = item.partition("=")
+        if not sep:
+            raise HTTPException(status_code=422, detail=f"Filtro inválido '{item}': use campo=valor.")
+        filters[field] = value
+
+    try:
+        cube = _get_approval_cube()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao montar o cubo de aprovação: {str(e)}"
+        )
+    try:
+        return cube.query(filters, group_by=group_by)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=str(e.args[0]))
+
+@app.get("/analytics/approval/dimensions", summary="Dimensões e faixas do cubo de aprovação")
+def approval_dimensions():
+    """
+    Lista as dimensões do cubo e os rótulos aceitos em cada uma.
+    """
+    try:
+        return _get_approval_cube().describe()
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ocorreu um erro ao montar o cubo de aprovação: {str(e)}"
+        )
+
+@app.get("/explain/{job_id}", summary="Consulta os fatores de uma explicação assíncrona")
+def get_explanation_job(job_id: str):
+    """
+    Retorna o estado do job de explicação e, quando concluído, os fatores.
+    """
+    job = explanation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Job de explicação não encontrado ou expirado."
+        )
+
+    response = {"job_id": job_id, "status": job["status"]}
+    if job["status"] == "done":
+        response.update(job["result"])
+        response["duration_ms"] = job["duration_ms"]
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+    return response
+
 @app.get("/predict/performance", summary="Obtém informações sobre predição de desempenho")
 def get_performance_info():
     """
@@ -333,6 +993,7 @@ def get_performance_info():
     """
     return {
         "message": "Use POST /predict/performance para fazer predições",
+        "explain_tiers": [tier.value for tier in ExplainTier],
         "required_fields": [
             "Hours_Studied", "Previous_Scores", "Sleep_Hours", "Distance_from_Home",
             "Attendance", "Gender", "Parental_Education_Level", "Parental_Involvement",
@@ -386,19 +1047,19 @@ def get_performance_info():
     }
 
 @app.put("/predict/performance", summary="Atualiza/recalcula relatório de desempenho")
-def update_performance_prediction(student_data: StudentData):
+def update_performance_prediction(
+    student_data: StudentData,
+    explain: ExplainTier = Query(ExplainTier.exact, description="Fidelidade da explicação: none, fast, approx ou exact")
+):
     """
     Atualiza ou recalcula o relatório de desempenho com novos dados.
     """
-    if not prediction_service:
-        raise HTTPException(
-            status_code=503, 
-            detail="Serviço não está disponível devido a um erro na inicialização."
-        )
+    live = _live_performance()
     
     try:
         student_data_dict = _model_to_dict(student_data)
-        report = prediction_service.generate_report(student_data_dict)
+        report = live.service.generate_report(student_data_dict, tier=explain.value)
+        report["model_version"] = live.version
         
         return {
             "message": "Relatório atualizado com sucesso",
@@ -0,0 +1,240 @@
+# =============================================================================
+# ARQUIVO: src/datasets/storage.py
+# OBJETIVO: Armazenamento colunar tipado (Parquet/Feather) dos datasets.
+#           - Os CSVs continuam sendo a fonte da verdade.
+#           - Cada dataset tem um schema declarado (categorias fixas e tipos
+#             numéricos compactos), gravado junto com o arquivo colunar.
+#           - O carregamento aceita projeção de colunas, lendo só o necessário.
+# Uso: python -m src.datasets.storage  (a partir da pasta ai_model)
+# =============================================================================
+
+import json
+from pathlib import Path
+
+import pandas as pd
+from pandas.api.types import CategoricalDtype
+
+try:
+    import pyarrow  # noqa: F401  (necessário para Parquet/Feather)
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+DATASETS_DIR = Path(__file__).resolve().parent
+COLUMNAR_DIR = DATASETS_DIR / "columnar"
+DEFAULT_FORMAT = "parquet"
+SCHEMA_VERSION = 1
+
+_LEVEL = ["Low", "Medium", "High"]
+_YES_NO = ["No", "Yes"]
+_XAPI_COUNTRIES = [
+    "Egypt", "Iran", "Iraq", "Jordan", "KW", "Lybia", "Morocco", "Palestine",
+    "SaudiArabia", "Syria", "Tunis", "USA", "lebanon", "venzuela",
+]
+_XAPI_BIRTHPLACES = [
+    "Egypt", "Iran", "Iraq", "Jordan", "KuwaIT", "Lybia", "Morocco", "Palestine",
+    "SaudiArabia", "Syria", "Tunis", "USA", "lebanon", "venzuela",
+]
+
+# Schema de cada dataset: nome da coluna -> dtype (string numpy ou lista de
+# categorias). Tutoring_Sessions e Physical_Activity são contagens no CSV e
+# os pré-processadores já as tratam como valores inteiros, então continuam
+# numéricas aqui.
+_XAPI_SCHEMA = {
+    "gender": ["F", "M"],
+    "NationalITy": _XAPI_COUNTRIES,
+    "PlaceofBirth": _XAPI_BIRTHPLACES,
+    "StageID": ["lowerlevel", "MiddleSchool", "HighSchool"],
+    "GradeID": ["G-02", "G-04", "G-05", "G-06", "G-07", "G-08", "G-09", "G-10", "G-11", "G-12"],
+    "SectionID": ["A", "B", "C"],
+    "Topic": [
+        "Arabic", "Biology", "Chemistry", "English", "French", "Geology",
+        "History", "IT", "Math", "Quran", "Science", "Spanish",
+    ],
+    "Semester": ["F", "S"],
+    "Relation": ["Father", "Mum"],
+    "raisedhands": "int16",
+    "VisITedResources": "int16",
+    "AnnouncementsView": "int16",
+    "Discussion": "int16",
+    "ParentAnsweringSurvey": _YES_NO,
+    "ParentschoolSatisfaction": ["Bad", "Good"],
+    "StudentAbsenceDays": ["Under-7", "Above-7"],
+    "Class": ["L", "M", "H"],
+}
+
+SCHEMAS = {
+    "StudentPerformanceFactors": {
+        "Hours_Studied": "float32",
+        "Attendance": "float32",
+        "Parental_Involvement": _LEVEL,
+        "Access_to_Resources": _LEVEL,
+        "Extracurricular_Activities": _YES_NO,
+        "Sleep_Hours": "float32",
+        "Previous_Scores": "float32",
+        "Motivation_Level": _LEVEL,
+        "Internet_Access": _YES_NO,
+        "Tutoring_Sessions": "int8",
+        "Family_Income": _LEVEL,
+        "Teacher_Quality": _LEVEL,
+        "School_Type": ["Public", "Private"],
+        "Peer_Influence": ["Negative", "Neutral", "Positive"],
+        "Physical_Activity": "int8",
+        "Learning_Disabilities": _YES_NO,
+        "Parental_Education_Level": ["High School", "College", "Postgraduate"],
+        "Distance_from_Home": ["Near", "Moderate", "Far"],
+        "Gender": ["Female", "Male"],
+        "Exam_Score": "float32",
+    },
+    "xAPI-Edu-Data": _XAPI_SCHEMA,
+    "xAPI_dropout": {**_XAPI_SCHEMA, "dropout_label": "int8"},
+}
+
+
+def _dataset_name(path) -> str:
+    return Path(path).stem
+
+
+def _pandas_dtypes(schema: dict) -> dict:
+    """Converte o schema declarado em dtypes do pandas."""
+    return {
+        col: CategoricalDtype(categories=spec) if isinstance(spec, list) else spec
+        for col, spec in schema.items()
+    }
+
+
+def _columnar_paths(name: str, fmt: str):
+    return COLUMNAR_DIR / f"{name}.{fmt}", COLUMNAR_DIR / f"{name}.schema.json"
+
+
+def _source_signature(csv_path: Path) -> dict:
+    stat = csv_path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_csv_typed(csv_path, columns=None) -> pd.DataFrame:
+    """
+    Lê o CSV aplicando o schema declarado (fallback quando não há arquivo colunar).
+    Colunas sem schema conhecido são inferidas normalmente pelo pandas.
+    """
+    csv_path = Path(csv_path)
+    schema = SCHEMAS.get(_dataset_name(csv_path), {})
+    dtypes = _pandas_dtypes(schema)
+    if columns is not None:
+        columns = list(columns)
+        dtypes = {col: dtype for col, dtype in dtypes.items() if col in columns}
+    # Inteiros não aceitam NaN: só aplicamos o dtype numérico depois da leitura
+    numeric = {col: dtype for col, dtype in dtypes.items() if not isinstance(dtype, CategoricalDtype)}
+    categorical = {col: dtype for col, dtype in dtypes.items() if isinstance(dtype, CategoricalDtype)}
+    df = pd.read_csv(csv_path, usecols=columns, dtype=categorical)
+    for col, dtype in numeric.items():
+        if col in df.columns and not df[col].isna().any():
+            df[col] = df[col].astype(dtype)
+    if columns is not None:
+        df = df[columns]
+    return df
+
+
+def convert_dataset(csv_path, fmt: str = DEFAULT_FORMAT) -> Path:
+    """
+    Converte um CSV para o formato colunar tipado e grava o schema ao lado.
+    Retorna o caminho do arquivo gerado.
+    """
+    if not HAS_PYARROW:
+        raise ImportError("pyarrow é necessário para gravar Parquet/Feather.")
+    if fmt not in ("parquet", "feather"):
+        raise ValueError(f"Formato colunar não suportado: {fmt}")
+
+    csv_path = Path(csv_path)
+    name = _dataset_name(csv_path)
+    data_path, schema_path = _columnar_paths(name, fmt)
+    COLUMNAR_DIR.mkdir(parents=True, exist_ok=True)
+
+    df = read_csv_typed(csv_path)
+    if fmt == "parquet":
+        df.to_parquet(data_path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(data_path)
+
+    schema = {
+        "version": SCHEMA_VERSION,
+        "dataset": name,
+        "format": fmt,
+        "source": _source_signature(csv_path),
+        "rows": int(len(df)),
+        "columns": {col: str(dtype) for col, dtype in df.dtypes.items()},
+        "categories": {
+            col: list(dtype.categories)
+            for col, dtype in df.dtypes.items() if isinstance(dtype, CategoricalDtype)
+        },
+    }
+    schema_path.write_text(json.dumps(schema, indent=2, ensure_ascii=False), encoding="utf-8")
+    return data_path
+
+
+def _is_fresh(csv_path: Path, schema_path: Path) -> bool:
+    if not schema_path.exists():
+        return False
+    try:
+        schema = json.loads(schema_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    return (
+        schema.get("version") == SCHEMA_VERSION
+        and schema.get("source") == _source_signature(csv_path)
+    )
+
+
+def load_dataset(csv_path, columns=None, fmt: str = DEFAULT_FORMAT, refresh: bool = True) -> pd.DataFrame:
+    """
+    Carrega um dataset pelo caminho do seu CSV de origem.
+
+    Usa o arquivo colunar se ele estiver atualizado em relação ao CSV; caso
+    contrário (e se `refresh` for True) reconverte antes. Sem pyarrow, cai
+    para a leitura tipada do CSV.
+
+    Args:
+        csv_path: Caminho do CSV (fonte da verdade).
+        columns: Lista opcional de colunas a ler (projeção).
+        fmt: 'parquet' ou 'feather'.
+        refresh: Reconverte automaticamente quando o CSV mudou.
+    """
+    csv_path = Path(csv_path)
+    if columns is not None:
+        columns = list(columns)
+    if not HAS_PYARROW:
+        return read_csv_typed(csv_path, columns=columns)
+
+    data_path, schema_path = _columnar_paths(_dataset_name(csv_path), fmt)
+    if not (data_path.exists() and _is_fresh(csv_path, schema_path)):
+        if not refresh:
+            return read_csv_typed(csv_path, columns=columns)
+        try:
+            convert_dataset(csv_path, fmt=fmt)
+        except OSError as e:
+            print(f"⚠️ Não foi possível gravar a versão colunar de '{csv_path.name}': {e}")
+            return read_csv_typed(csv_path, columns=columns)
+
+    if fmt == "parquet":
+        return pd.read_parquet(data_path, columns=columns)
+    return pd.read_feather(data_path, columns=columns)
+
+
+def convert_all(fmt: str = DEFAULT_FORMAT):
+    """Converte todos os datasets com schema declarado."""
+    for name in SCHEMAS:
+        csv_path = DATASETS_DIR / f"{name}.csv"
+        if not csv_path.exists():
+            print(f"⚠️ Dataset '{csv_path.name}' não encontrado, ignorando.")
+            continue
+        out = convert_dataset(csv_path, fmt=fmt)
+        print(f"✅ {csv_path.name} -> {out.relative_to(DATASETS_DIR)}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converte os datasets CSV para formato colunar tipado.")
+    parser.add_argument("--format", choices=["parquet", "feather"], default=DEFAULT_FORMAT)
+    args = parser.parse_args()
+    convert_all(fmt=args.format)
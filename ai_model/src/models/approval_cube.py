@@ -0,0 +1,142 @@
+# =============================================================================
+# ARQUIVO: src/models/approval_cube.py
+# OBJETIVO: Cubo pré-calculado de taxa de aprovação e nota média.
+#           - Features numéricas viram faixas (BINS ou quartis); numéricas com
+#             poucos valores e categóricas usam os próprios valores.
+#           - Para cada dimensão e cada par de dimensões são guardados
+#             contagem, aprovados e soma das notas em arrays (np.bincount);
+#             uma consulta é só indexação, sem varrer o dataset.
+#           Generaliza o groupby por faixa de frequência de analise_feature.py.
+# =============================================================================
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+APPROVAL_CUTOFF = 60
+MISSING = "N/A"
+MAX_DISTINCT_NUMERIC = 12
+
+# Faixas das features numéricas contínuas: limites (fechado à esquerda) e rótulos
+BINS = {
+    "Attendance": ([0, 70, 80, 90, 101], ["<70%", "70-80%", "80-90%", ">90%"]),
+    "Hours_Studied": ([0, 10, 20, 30, np.inf], ["<10h", "10-20h", "20-30h", ">=30h"]),
+    "Sleep_Hours": ([0, 6, 8, np.inf], ["<6h", "6-8h", ">=8h"]),
+    "Previous_Scores": ([0, 60, 70, 80, 90, 101], ["<60", "60-70", "70-80", "80-90", ">=90"]),
+}
+
+
+def _encode(series, bins=None):
+    """Códigos inteiros 0..k-1 e rótulos de uma coluna (ausentes viram MISSING)."""
+    if bins is not None:
+        edges, labels = bins
+        values = pd.cut(series, bins=edges, labels=labels, right=False)
+    elif pd.api.types.is_numeric_dtype(series) and series.nunique() > MAX_DISTINCT_NUMERIC:
+        values = pd.qcut(series, q=4, duplicates="drop")
+    else:
+        values = series.astype(object).map(lambda v: getattr(v, "value", v))
+    codes, uniques = pd.factorize(values, sort=True)
+    labels = [str(label) for label in uniques]
+    if (codes < 0).any():
+        codes = np.where(codes < 0, len(labels), codes)
+        labels.append(MISSING)
+    return codes.astype(np.intp), labels
+
+
+class ApprovalCube:
+    """
+    Agregados de aprovação por dimensão e por par de dimensões.
+
+    Args:
+        df: Dataset com `Exam_Score` e as features originais.
+        cutoff: Nota mínima de aprovação.
+        bins: Faixas das numéricas (padrão: BINS).
+        target: Coluna da nota.
+    """
+    def __init__(self, df, cutoff=APPROVAL_CUTOFF, bins=None, target="Exam_Score"):
+        bins = BINS if bins is None else bins
+        scores = df[target].to_numpy(dtype=float)
+        approved = (scores >= cutoff).astype(float)
+        self.cutoff = cutoff
+        self.n_rows = len(df)
+        self.dimensions = [column for column in df.columns if column != target]
+
+        codes = {}
+        self.labels = {}
+        for column in self.dimensions:
+            codes[column], self.labels[column] = _encode(df[column], bins.get(column))
+
+        # (dims) -> array [contagem, aprovados, soma das notas] × células
+        self._cells = {}
+        groups = [(d,) for d in self.dimensions] + list(combinations(self.dimensions, 2))
+        for dims in groups:
+            shape = tuple(len(self.labels[d]) for d in dims)
+            flat = np.ravel_multi_index(tuple(codes[d] for d in dims), shape)
+            size = int(np.prod(shape))
+            self._cells[dims] = np.stack([
+                np.bincount(flat, minlength=size),
+                np.bincount(flat, weights=approved, minlength=size),
+                np.bincount(flat, weights=scores, minlength=size),
+            ]).reshape((3,) + shape)
+        self._order = {d: i for i, d in enumerate(self.dimensions)}
+
+    def _index(self, dimension, label):
+        if dimension not in self.labels:
+            raise KeyError(f"Dimensão desconhecida: {dimension}")
+        try:
+            return self.labels[dimension].index(str(label))
+        except ValueError:
+            raise KeyError(f"Valor '{label}' inexistente em {dimension} (use {self.labels[dimension]})")
+
+    @staticmethod
+    def _cell(count, approved, score_sum):
+        count = int(count)
+        return {
+            "count": count,
+            "approval_rate": float(approved / count) if count else None,
+            "mean_score": float(score_sum / count) if count else None,
+        }
+
+    def query(self, filters=None, group_by=None):
+        """
+        Fatia do cubo: `filters` {dimensão: rótulo} e, opcionalmente, uma
+        dimensão `group_by` para detalhar; no máximo duas dimensões no total.
+
+        Returns:
+            dict: totais da fatia e, com group_by, uma célula por rótulo.
+        """
+        filters = dict(filters or {})
+        dims = list(filters) + ([group_by] if group_by and group_by not in filters else [])
+        if len(dims) > 2:
+            raise ValueError("O cubo guarda combinações de até duas dimensões.")
+        for dimension, label in filters.items():
+            self._index(dimension, label)
+        if group_by and group_by not in self.labels:
+            raise KeyError(f"Dimensão desconhecida: {group_by}")
+
+        if not dims:
+            # Qualquer dimensão tem o total do dataset
+            cells = self._cells[(self.dimensions[0],)].sum(axis=1)
+            return {"filters": {}, **self._cell(*cells)}
+
+        key = tuple(sorted(dims, key=self._order.get))
+        selector = tuple(
+            self._index(d, filters[d]) if d in filters else slice(None) for d in key
+        )
+        cells = self._cells[key][(slice(None),) + selector]
+        result = {"filters": filters}
+        if group_by and group_by not in filters:
+            result.update(self._cell(*cells.sum(axis=1)))
+            result["group_by"] = group_by
+            result["groups"] = [
+                {"value": label, **self._cell(*cells[:, i])}
+                for i, label in enumerate(self.labels[group_by])
+            ]
+        else:
+            result.update(self._cell(*cells))
+        return result
+
+    def describe(self):
+        """Dimensões e rótulos disponíveis para consulta."""
+        return {"n_rows": self.n_rows, "cutoff": self.cutoff, "dimensions": self.labels}
@@ -0,0 +1,203 @@
+# =============================================================================
+# ARQUIVO: src/models/counterfactual.py
+# OBJETIVO: Contrafactuais de mínima mudança para alunos REPROVADOS.
+#           - Só campos acionáveis (hábitos) mudam, em passos e limites
+#             plausíveis (ACTIONABLE); cada passo custa 1.
+#           - Os candidatos são gerados por custo total crescente e avaliados
+#             em lotes vetorizados pelo PredictionService (sem SHAP); a busca
+#             para ao fechar o nível de custo em que há soluções suficientes
+#             ou ao esgotar o orçamento de avaliações.
+#           - Candidatos que contêm uma solução já encontrada (mesma direção,
+#             passo igual ou maior) são descartados: não são mínimos.
+#           - Resultados ficam em cache por (versão do modelo, aluno, pedido).
+# =============================================================================
+
+import threading
+from collections import OrderedDict
+
+APPROVAL_CUTOFF = 60.0
+
+# Campo -> especificação. Numéricos: passo, limites e direções permitidas;
+# categóricos: valores em ordem e direções permitidas (+1 = próximo valor).
+# Tutoring_Sessions e Physical_Activity são contagens no dataset (0-8 sessões
+# por mês, 0-6 horas por semana) e o modelo foi treinado com elas assim. O
+# StudentData da API ainda os declara como enums ("No"/"Yes", Low/Medium/High);
+# com esses valores os campos não são movidos (field_moves devolve []).
+ACTIONABLE = {
+    "Hours_Studied": {"step": 2.0, "min": 0.0, "max": 44.0, "directions": (1,)},
+    "Attendance": {"step": 5.0, "min": 0.0, "max": 100.0, "directions": (1,)},
+    "Sleep_Hours": {"step": 1.0, "min": 4.0, "max": 10.0, "directions": (1, -1)},
+    "Motivation_Level": {"levels": ("Low", "Medium", "High"), "directions": (1,)},
+    "Tutoring_Sessions": {"step": 1.0, "min": 0.0, "max": 8.0, "directions": (1,)},
+    "Extracurricular_Activities": {"levels": ("No", "Yes"), "directions": (1, -1)},
+    "Physical_Activity": {"step": 1.0, "min": 0.0, "max": 6.0, "directions": (1, -1)},
+}
+
+
+def _plain(value):
+    # Enums da API são reduzidos ao seu valor
+    return getattr(value, "value", value)
+
+
+def field_moves(spec, current):
+    """Movimentos possíveis de um campo: lista de (passos com sinal, novo valor)."""
+    moves = []
+    if "levels" in spec:
+        levels = spec["levels"]
+        if current not in levels:
+            return moves
+        position = levels.index(current)
+        for direction in spec["directions"]:
+            for steps in range(1, len(levels)):
+                target = position + direction * steps
+                if 0 <= target < len(levels):
+                    moves.append((direction * steps, levels[target]))
+        return moves
+
+    try:
+        current = float(current)
+    except (TypeError, ValueError):
+        # Valor não numérico (ex.: enum da API em um campo de contagem)
+        return moves
+    for direction in spec["directions"]:
+        steps = 1
+        while True:
+            value = current + direction * steps * spec["step"]
+            if value < spec["min"] or value > spec["max"]:
+                break
+            moves.append((direction * steps, value))
+            steps += 1
+    return moves
+
+
+def candidates_with_cost(moves, cost):
+    """Conjuntos de mudanças (campo -> (passos, valor)) de custo total `cost`."""
+    fields = list(moves)
+
+    def build(index, remaining):
+        if remaining == 0:
+            yield {}
+            return
+        if index == len(fields):
+            return
+        # Sem mudar este campo
+        yield from build(index + 1, remaining)
+        field = fields[index]
+        for steps, value in moves[field]:
+            if abs(steps) <= remaining:
+                for rest in build(index + 1, remaining - abs(steps)):
+                    yield {field: (steps, value), **rest}
+
+    yield from build(0, cost)
+
+
+def _contains(candidate, solution):
+    """True se `candidate` inclui a solução (mesma direção, passo igual ou maior)."""
+    for field, (steps, _) in solution.items():
+        if field not in candidate:
+            return False
+        other = candidate[field][0]
+        if other * steps <= 0 or abs(other) < abs(steps):
+            return False
+    return True
+
+
+class CounterfactualSearch:
+    """
+    Busca de contrafactuais com orçamento de avaliações por pedido e cache
+    LRU por entrada.
+
+    Args:
+        max_evaluations: Orçamento padrão de variantes avaliadas por pedido.
+        batch_size: Variantes por chamada vetorizada ao modelo.
+        max_cost: Custo total máximo (soma de passos) considerado.
+        cache_size: Entradas mantidas no cache.
+    """
+    def __init__(self, max_evaluations=2000, batch_size=256, max_cost=8, cache_size=256):
+        self.max_evaluations = max_evaluations
+        self.batch_size = batch_size
+        self.max_cost = max_cost
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def search(self, service, model_version, student, n_results=3, max_evaluations=None):
+        """
+        Menores mudanças que levam o aluno a >= 60.
+
+        Returns:
+            dict: nota base, contrafactuais (mudanças, custo e nota), número
+            de avaliações e se o orçamento acabou; "cached" indica reuso.
+        """
+        base = {field: _plain(value) for field, value in student.items()}
+        budget = max_evaluations or self.max_evaluations
+        key = (model_version, tuple(sorted((k, str(v)) for k, v in base.items())), n_results, budget)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return {**self._cache[key], "cached": True}
+
+        result = self._search(service, base, n_results, budget)
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return {**result, "cached": False}
+
+    def _search(self, service, base, n_results, budget):
+        base_report, _ = service.simulate_student(base, [])
+        result = {
+            "predicted_score": base_report["predicted_score"],
+            "is_approved": base_report["is_approved"],
+            "counterfactuals": [],
+            "evaluations": 0,
+            "budget_exhausted": False,
+        }
+        if base_report["is_approved"]:
+            return result
+
+        moves = {
+            field: field_moves(spec, base[field])
+            for field, spec in ACTIONABLE.items() if field in base
+        }
+        solutions = []
+        for cost in range(1, self.max_cost + 1):
+            pending = [
+                candidate for candidate in candidates_with_cost(moves, cost)
+                if not any(_contains(candidate, found) for found, _ in solutions)
+            ]
+            if not pending:
+                continue
+            if result["evaluations"] + len(pending) > budget:
+                pending = pending[:budget - result["evaluations"]]
+                result["budget_exhausted"] = True
+
+            for start in range(0, len(pending), self.batch_size):
+                batch = pending[start:start + self.batch_size]
+                _, reports = service.simulate_student(
+                    base, [{field: value for field, (_, value) in candidate.items()} for candidate in batch]
+                )
+                for candidate, report in zip(batch, reports):
+                    if report["predicted_score"] >= APPROVAL_CUTOFF:
+                        solutions.append((candidate, report["predicted_score"]))
+            result["evaluations"] += len(pending)
+
+            if len(solutions) >= n_results or result["budget_exhausted"]:
+                break
+
+        # Menor custo, menos campos alterados e, no empate, maior nota
+        solutions.sort(key=lambda item: (
+            sum(abs(steps) for steps, _ in item[0].values()), len(item[0]), -item[1]
+        ))
+        result["counterfactuals"] = [
+            {
+                "changes": [
+                    {"feature": field, "from": base[field], "to": value}
+                    for field, (_, value) in candidate.items()
+                ],
+                "cost": sum(abs(steps) for steps, _ in candidate.values()),
+                "predicted_score": score,
+            }
+            for candidate, score in solutions[:n_results]
+        ]
+        return result
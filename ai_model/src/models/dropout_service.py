@@ -1,51 +1,177 @@
 import joblib
+import numpy as np
 import pandas as pd
 
+from src.datasets.storage import load_dataset
+from src.models.explanation import build_source_index, top_n_indices
+from src.models.online_dropout import StreamingPreprocessor
+from src.models.percentile_index import PercentileIndex
+
 class DropoutService:
-    def __init__(self, preprocess_path, model_path, columns_path=None):
+    def __init__(self, preprocess_path, model_path, columns_path=None, reference_path=None):
         # Carrega o pré-processador e o modelo treinado
-        self.preprocessor = joblib.load(preprocess_path)
-        self.model = joblib.load(model_path)
+        preprocessor = joblib.load(preprocess_path)
+        model = joblib.load(model_path)
 
         # Se houver arquivo de colunas salvas, usa para alinhar as features
         if columns_path:
-            self.columns = joblib.load(columns_path)
+            columns = joblib.load(columns_path)
         else:
+            columns = None
+
+        # Dados de referência para as explicações: contribuição = coef × (x − média)
+        self.reference_data = None
+        if reference_path:
+            reference_columns = columns if columns is not None else getattr(preprocessor, 'feature_names_in_', None)
+            self.reference_data = load_dataset(reference_path, columns=reference_columns)
+        self.percentile_index = PercentileIndex()
+        self.publish(preprocessor, model, columns)
+
+    def publish(self, preprocessor, model, columns=None):
+        """
+        Publica um novo par (pré-processador, modelo) sem reiniciar o serviço.
+
+        A troca é uma única atribuição: requisições em andamento terminam com
+        o par antigo, as seguintes já usam o novo.
+        """
+        if columns is None:
             # Caso não exista, tenta extrair automaticamente do pré-processador
-            try:
-                self.columns = self.preprocessor.feature_names_in_
-            except AttributeError:
-                self.columns = None
+            columns = getattr(preprocessor, 'feature_names_in_', None)
+        basis = self._explanation_basis(preprocessor, model, columns)
+        self._artifacts = (preprocessor, model, columns, basis)
+        # Cada modelo publicado tem a sua distribuição de referência
+        if self.reference_data is not None:
+            self.percentile_index.rebuild(self.dropout_probabilities(self.reference_data))
+
+    def _explanation_basis(self, preprocessor, model, columns):
+        """
+        Pré-calcula o necessário para as explicações em forma fechada do modelo
+        linear: coeficientes, média das features processadas e a matriz que
+        soma as colunas one-hot por feature original do xAPI.
+        Sem dados de referência, a média das features padronizadas é 0 e as
+        categorias são comparadas com a ausência da categoria.
+        """
+        coef = getattr(model, 'coef_', None)
+        if coef is None or not hasattr(preprocessor, 'get_feature_names_out'):
+            return None
+        feature_names = preprocessor.get_feature_names_out()
+        coef = np.ravel(coef[0])
+        if self.reference_data is not None:
+            reference = self._dense(
+                preprocessor.transform(self._align(self.reference_data, columns, preprocessor))
+            ).mean(axis=0)
+        else:
+            reference = np.zeros(len(feature_names))
+        source_columns, source_index = build_source_index(feature_names, columns)
+        group_matrix = np.zeros((len(feature_names), len(source_columns)))
+        group_matrix[np.arange(len(feature_names)), source_index] = 1.0
+        return {
+            "coef": coef,
+            "reference": reference,
+            "source_columns": source_columns,
+            "group_matrix": group_matrix
+        }
 
-    def predict_dropout(self, student_data: dict):
-        # Converte o dicionário em DataFrame
-        X = pd.DataFrame([student_data])
+    @staticmethod
+    def _dense(X):
+        return X.toarray() if hasattr(X, 'toarray') else np.asarray(X, dtype=float)
 
+    @staticmethod
+    def _align(X, columns, preprocessor=None):
         # Reorganiza colunas conforme o esperado pelo modelo
-        if self.columns is not None:
-            X = X.reindex(columns=self.columns, fill_value=0)
+        if columns is None:
+            return X
+        if isinstance(preprocessor, StreamingPreprocessor):
+            # O modelo incremental imputa as ausentes pelo valor esperado:
+            # só as colunas enviadas seguem adiante, sem preencher com 0
+            return X[[column for column in columns if column in X.columns]]
+        return X.reindex(columns=columns, fill_value=0)
 
-        # Aplica o pré-processamento
-        X_processed = self.preprocessor.transform(X)
+    @property
+    def preprocessor(self):
+        return self._artifacts[0]
 
-        # Calcula probabilidade de evasão
-        proba = self.model.predict_proba(X_processed)[0, 1]
+    @property
+    def model(self):
+        return self._artifacts[1]
+
+    @property
+    def columns(self):
+        return self._artifacts[2]
 
+    @staticmethod
+    def _classify(proba):
         # Define a classificação com base no limiar
         if proba < 0.33:
-            dropout_class = "baixo"
-        elif proba < 0.66:
-            dropout_class = "médio"
-        else:
-            dropout_class = "alto"
+            return "baixo"
+        if proba < 0.66:
+            return "médio"
+        return "alto"
 
-        explain = (
-            f"Probabilidade de evasão classificada como {dropout_class} "
-            f"com base nos dados fornecidos."
-        )
+    def _factors(self, basis, X_processed, students, top_n):
+        """
+        Top-N features originais por aluno, em log-odds: coef × (x − média)
+        somado por feature original. Features que não vieram na requisição
+        (preenchidas no alinhamento) não entram no ranking.
+        """
+        if basis is None or top_n <= 0:
+            return [[] for _ in students]
+        contributions = ((self._dense(X_processed) - basis["reference"]) * basis["coef"]) @ basis["group_matrix"]
+        provided = {key for student in students for key in student}
+        missing = [j for j, column in enumerate(basis["source_columns"]) if column not in provided]
+        contributions[:, missing] = 0.0
 
-        return {
-            "probability_dropout": float(proba),
-            "class_dropout": dropout_class,
-            "explain": explain
-        }
+        indices = top_n_indices(contributions, top_n)
+        values = np.take_along_axis(contributions, indices, axis=1)
+        factors = []
+        for student, row_indices, row_values in zip(students, indices, values):
+            factors.append([
+                {
+                    "feature": basis["source_columns"][j],
+                    "value": student.get(basis["source_columns"][j], 'N/A'),
+                    "contribution": float(value),
+                    "influence": "aumenta o risco" if value > 0 else "reduz o risco"
+                }
+                for j, value in zip(row_indices, row_values) if value != 0.0
+            ])
+        return factors
+
+    def predict_dropout_batch(self, students: list, top_n=3):
+        """
+        Predição e explicação de um lote de alunos com uma única transformação.
+        """
+        preprocessor, model, columns, basis = self._artifacts
+
+        # Converte os dicionários em DataFrame e aplica o pré-processamento
+        X_processed = preprocessor.transform(self._align(pd.DataFrame(students), columns, preprocessor))
+
+        # Calcula probabilidade de evasão
+        probabilities = model.predict_proba(X_processed)[:, 1]
+        factors = self._factors(basis, X_processed, students, top_n)
+        percentiles = self.percentile_index.percentile(probabilities)
+
+        results = []
+        for proba, student_factors, percentile in zip(probabilities, factors, percentiles):
+            dropout_class = self._classify(proba)
+            explain = (
+                f"Probabilidade de evasão classificada como {dropout_class} "
+                f"com base nos dados fornecidos."
+            )
+            if student_factors:
+                explain += " Principais fatores: " + ", ".join(f["feature"] for f in student_factors) + "."
+            results.append({
+                "probability_dropout": float(proba),
+                "class_dropout": dropout_class,
+                "percentile": percentile,
+                "explain": explain,
+                "factors": student_factors
+            })
+        return results
+
+    def dropout_probabilities(self, df: pd.DataFrame):
+        """Só as probabilidades de evasão de um lote (sem classes nem explicações)."""
+        preprocessor, model, columns, _ = self._artifacts
+        return model.predict_proba(preprocessor.transform(self._align(df, columns, preprocessor)))[:, 1]
+
+    def predict_dropout(self, student_data: dict, top_n=3):
+        return self.predict_dropout_batch([student_data], top_n=top_n)[0]
@@ -0,0 +1,91 @@
+# =============================================================================
+# ARQUIVO: src/models/explanation_jobs.py
+# OBJETIVO: Jobs assíncronos de explicação (SHAP fora do caminho da requisição).
+#           - A rota devolve a predição imediatamente com um job_id.
+#           - Os fatores são calculados por um pool de workers em segundo plano.
+#           - Os resultados ficam disponíveis por um TTL configurável.
+#           - A fila é limitada (`max_pending`): acima dela o job é recusado
+#             (QueueFullError). Jobs que esperam mais que `pending_timeout`
+#             expiram e não chegam a ser executados.
+# =============================================================================
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFullError(RuntimeError):
+    """Há `max_pending` jobs aguardando; o novo job não foi agendado."""
+
+
+class ExplanationJobManager:
+    """
+    Executa funções de explicação em segundo plano e guarda o resultado por
+    `ttl_seconds` após a conclusão. Jobs expirados são removidos sob demanda.
+    """
+    def __init__(self, max_workers=2, ttl_seconds=600, max_pending=100, pending_timeout=None):
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self.pending_timeout = ttl_seconds if pending_timeout is None else pending_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="explain")
+        self._jobs = {}
+        # Jobs ainda na fila do executor (inclusive os já expirados)
+        self._queued = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, **kwargs) -> str:
+        """Agenda `fn(*args, **kwargs)` e retorna o id do job (QueueFullError se a fila estiver cheia)."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._purge_expired()
+            if self._queued >= self.max_pending:
+                raise QueueFullError(f"{self._queued} explicações aguardando na fila.")
+            self._queued += 1
+            self._jobs[job_id] = {
+                "status": PENDING, "created_at": time.time(), "started_at": None, "finished_at": None
+            }
+        self._executor.submit(self._run, job_id, fn, args, kwargs)
+        return job_id
+
+    def _run(self, job_id, fn, args, kwargs):
+        with self._lock:
+            self._queued -= 1
+            if job_id not in self._jobs:
+                # Expirou enquanto esperava na fila
+                return
+            self._jobs[job_id]["started_at"] = time.time()
+        started = time.perf_counter()
+        try:
+            update = {"status": DONE, "result": fn(*args, **kwargs)}
+        except Exception as e:
+            update = {"status": FAILED, "error": str(e)}
+        update["finished_at"] = time.time()
+        update["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(update)
+
+    def _purge_expired(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if (job["finished_at"] is not None and now - job["finished_at"] > self.ttl_seconds)
+            or (job["started_at"] is None and now - job["created_at"] > self.pending_timeout)
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def get(self, job_id):
+        """Estado do job (cópia) ou None se não existir/expirou."""
+        with self._lock:
+            self._purge_expired()
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -6,7 +6,8 @@
 
 import pandas as pd
 import joblib
-import shap
+
+from explanation import ExplanationSession
 
 # --- 1. CONFIGURAÇÕES E CARREGAMENTO DOS ARTEFATOS ---
 PREPROCESSOR_PATH = '../pipelines/perf_preprocess.pkl'
@@ -33,6 +34,21 @@ except FileNotFoundError as e:
 
 # --- 2. IMPLEMENTAÇÃO DOS CRITÉRIOS DE ACEITE ---
 
+# Sessões de explicação por modelo: o conjunto de treino é transformado e o
+# explainer é construído uma única vez, não a cada chamada.
+_sessions = {}
+
+def get_explanation_session(model, preprocessor, X_train_ref):
+    """Retorna (criando na primeira chamada) a sessão SHAP do modelo."""
+    key = (id(model), id(preprocessor))
+    if key not in _sessions:
+        X_train_proc = preprocessor.transform(X_train_ref)
+        _sessions[key] = ExplanationSession(
+            model, X_train_proc, preprocessor.get_feature_names_out(),
+            source_columns=X_train_ref.columns
+        )
+    return _sessions[key]
+
 def get_top_features(model, preprocessor, X_train_ref, input_data: dict, top_n=3):
     """
     Calcula e retorna as features mais importantes para uma única previsão.
@@ -48,37 +64,15 @@ def get_top_features(model, preprocessor, X_train_ref, input_data: dict, top_n=3
     Returns:
         list: Lista de dicionários contendo a explicação dos principais fatores.
     """
-    df_input = pd.DataFrame([input_data])
-    input_proc = preprocessor.transform(df_input)
-    X_train_proc = preprocessor.transform(X_train_ref)
-    
-    explainer = shap.Explainer(model, X_train_proc)
-    shap_values = explainer(input_proc)
-
-    feature_names = preprocessor.get_feature_names_out()
-    try:
-        shap_values_for_positive_class = shap_values.values[0, :, 1]
-    except IndexError:
-        shap_values_for_positive_class = shap_values.values[0]
-    
-    feature_impacts = pd.DataFrame(
-        list(zip(feature_names, shap_values_for_positive_class)),
-        columns=['feature', 'shap_value']
-    ).sort_values(by='shap_value', key=abs, ascending=False).head(top_n)
-    
-    explanation = []
-    for _, row in feature_impacts.iterrows():
-        feature_part = row['feature'].split('__')[1]
-        original_feature_name = next((col for col in input_data if feature_part.startswith(col)), feature_part)
-        feature_value = input_data.get(original_feature_name, 'N/A')
-        influence = "positiva (aumenta a chance de aprovação)" if row['shap_value'] > 0 else "negativa (aumenta a chance de reprovação)"
-        explanation.append({
-            "feature": original_feature_name,
-            "value": feature_value,
-            "influence": influence
-        })
-        
-    return explanation
+    session = get_explanation_session(model, preprocessor, X_train_ref)
+    input_proc = preprocessor.transform(pd.DataFrame([input_data]))
+    return session.explain(
+        input_proc, [input_data], top_n=top_n,
+        labels=(
+            "positiva (aumenta a chance de aprovação)",
+            "negativa (aumenta a chance de reprovação)"
+        )
+    )[0]
 
 def get_prediction(model, preprocessor, input_data: dict):
     """
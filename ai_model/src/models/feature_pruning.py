@@ -0,0 +1,196 @@
+# =============================================================================
+# ARQUIVO: src/models/feature_pruning.py
+# OBJETIVO: Poda de features do pipeline de desempenho guiada pela
+#           importância global.
+#           - As features originais são ordenadas pela média de |SHAP| do
+#             Random Forest implantado (global_importance.py).
+#           - Para k = 0..max_drop, as k menos importantes são removidas do
+#             pré-processador e os dois modelos são retreinados com os mesmos
+#             hiperparâmetros; cada passo registra ROC-AUC, largura da matriz
+#             e latência (transformação + predição).
+#           - O maior k cuja perda de ROC-AUC fica dentro da tolerância é
+#             salvo como um conjunto completo de artefatos, pronto para
+#             `python -m src.models.model_registry register performance <dir>`.
+#           A API continua aceitando os campos removidos e os ignora
+#           (PredictionService._frame).
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.feature_pruning --max-drop 8 --tolerance 0.005
+# =============================================================================
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from src.datasets.storage import load_dataset
+from src.models.explanation import ExplanationSession
+from src.models.global_importance import compute_global_importance
+from src.models.model_registry import ARTIFACTS
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+PIPELINES_DIR = BASE_DIR / "pipelines"
+DATA_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
+OUTPUT_DIR = PIPELINES_DIR / "slim"
+
+PREPROCESSOR_FILE, LOGREG_FILE, RF_FILE = ARTIFACTS["performance"]
+# Mesmos cortes de trainingLogisticRegression.py e trainingRandomForest.py
+MODELS = {
+    "Regressão Logística": (LOGREG_FILE, 60),
+    "Random Forest": (RF_FILE, 68),
+}
+REPORT_MODEL = "Random Forest"
+
+
+def rank_features(preprocessor, model, X, n_samples=500, random_state=42):
+    """Features originais da menos para a mais importante (média de |SHAP|)."""
+    sample = X.sample(min(n_samples, len(X)), random_state=random_state)
+    X_proc = preprocessor.transform(sample)
+    session = ExplanationSession(
+        model, X_proc[:200], preprocessor.get_feature_names_out(),
+        source_columns=preprocessor.feature_names_in_
+    )
+    result = compute_global_importance(session, X_proc, sample)
+    return [item["feature"] for item in reversed(result["features"])]
+
+
+def slim_preprocessor(preprocessor, dropped):
+    """
+    Cópia não treinada do pré-processador sem as colunas `dropped`.
+    Deve ser treinada em um DataFrame sem essas colunas, para que
+    `feature_names_in_` liste apenas as features mantidas.
+    """
+    slim = clone(preprocessor)
+    slim.transformers = [
+        (name, transformer, [column for column in columns if column not in dropped])
+        for name, transformer, columns in preprocessor.transformers
+    ]
+    return slim
+
+
+def _latency_ms(preprocessor, model, X, repeats=20):
+    """Latência mediana (ms) de uma linha e de um lote: transformação + predição."""
+    def run(rows):
+        start = time.perf_counter()
+        model.predict_proba(preprocessor.transform(rows))
+        return time.perf_counter() - start
+
+    run(X.iloc[:1])
+    single = np.median([run(X.iloc[:1]) for _ in range(repeats)])
+    batch = np.median([run(X) for _ in range(max(repeats // 4, 1))])
+    return float(single * 1000), float(batch * 1000)
+
+
+def evaluate_step(preprocessor, models, dropped, X_train, X_test, scores_train, scores_test):
+    """Retreina pré-processador e modelos sem `dropped` e mede o resultado."""
+    X_train = X_train.drop(columns=list(dropped))
+    X_test = X_test.drop(columns=list(dropped))
+    slim = slim_preprocessor(preprocessor, dropped).fit(X_train)
+    X_train_proc = slim.transform(X_train)
+    X_test_proc = slim.transform(X_test)
+
+    fitted, metrics = {}, {}
+    for name, (model, cutoff) in models.items():
+        y_train = (scores_train >= cutoff).astype(int)
+        y_test = (scores_test >= cutoff).astype(int)
+        fitted[name] = clone(model).fit(X_train_proc, y_train)
+        probabilities = fitted[name].predict_proba(X_test_proc)[:, 1]
+        metrics[name] = {
+            "roc_auc": float(roc_auc_score(y_test, probabilities)),
+            "accuracy": float(accuracy_score(y_test, probabilities >= 0.5)),
+        }
+
+    single_ms, batch_ms = _latency_ms(slim, fitted[REPORT_MODEL], X_test)
+    step = {
+        "dropped": list(dropped),
+        "n_features": len(slim.feature_names_in_),
+        "n_processed_columns": int(X_test_proc.shape[1]),
+        "metrics": metrics,
+        "latency_ms": {"single_row": single_ms, "batch": batch_ms, "batch_rows": int(len(X_test))},
+    }
+    return step, slim, fitted
+
+
+def prune_features(max_drop=8, tolerance=0.005, test_size=0.2, random_state=42):
+    """
+    Remove progressivamente as features menos importantes.
+
+    Returns:
+        tuple: (relatório, pré-processador escolhido, modelos escolhidos)
+    """
+    preprocessor = joblib.load(PIPELINES_DIR / PREPROCESSOR_FILE)
+    models = {
+        name: (joblib.load(PIPELINES_DIR / filename), cutoff)
+        for name, (filename, cutoff) in MODELS.items()
+    }
+
+    df = load_dataset(DATA_PATH)
+    X = df[list(preprocessor.feature_names_in_)]
+    scores = df["Exam_Score"]
+    stratify = (scores >= MODELS[REPORT_MODEL][1]).astype(int)
+    X_train, X_test, scores_train, scores_test = train_test_split(
+        X, scores, test_size=test_size, random_state=random_state, stratify=stratify
+    )
+
+    ranking = rank_features(preprocessor, models[REPORT_MODEL][0], X_test, random_state=random_state)
+    print(f"Ordem de remoção (menos importante primeiro): {', '.join(ranking)}")
+
+    steps, chosen = [], None
+    for k in range(0, min(max_drop, len(ranking) - 1) + 1):
+        step, slim, fitted = evaluate_step(
+            preprocessor, models, ranking[:k], X_train, X_test, scores_train, scores_test
+        )
+        baseline_auc = steps[0]["metrics"][REPORT_MODEL]["roc_auc"] if steps else step["metrics"][REPORT_MODEL]["roc_auc"]
+        step["roc_auc_lost"] = baseline_auc - step["metrics"][REPORT_MODEL]["roc_auc"]
+        steps.append(step)
+        print(f"  k={k:2d} | {step['n_processed_columns']:3d} colunas | "
+              f"ROC-AUC {step['metrics'][REPORT_MODEL]['roc_auc']:.4f} (-{step['roc_auc_lost']:.4f}) | "
+              f"1 linha {step['latency_ms']['single_row']:.2f} ms | lote {step['latency_ms']['batch']:.1f} ms")
+        if step["roc_auc_lost"] <= tolerance:
+            chosen = (k, slim, fitted)
+
+    k, slim, fitted = chosen
+    report = {
+        "ranking": ranking,
+        "tolerance": tolerance,
+        "selected_drop": k,
+        "dropped": ranking[:k],
+        "steps": steps,
+    }
+    return report, slim, fitted
+
+
+def save_artifacts(output_dir, report, preprocessor, models):
+    """Grava o conjunto de artefatos (nomes de model_registry.ARTIFACTS) e o relatório."""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump(preprocessor, output_dir / PREPROCESSOR_FILE)
+    for name, (filename, _) in MODELS.items():
+        joblib.dump(models[name], output_dir / filename)
+    (output_dir / "feature_pruning.json").write_text(
+        json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poda de features do pipeline de desempenho")
+    parser.add_argument("--max-drop", type=int, default=8, help="Máximo de features originais removidas")
+    parser.add_argument("--tolerance", type=float, default=0.005, help="Perda máxima de ROC-AUC aceita")
+    parser.add_argument("--output", default=str(OUTPUT_DIR), help="Diretório dos artefatos enxutos")
+    args = parser.parse_args()
+
+    report, preprocessor, models = prune_features(max_drop=args.max_drop, tolerance=args.tolerance)
+    save_artifacts(args.output, report, preprocessor, models)
+    selected = report["steps"][report["selected_drop"]]
+    print(f"✅ {report['selected_drop']} features removidas: {', '.join(report['dropped']) or '-'}")
+    print(f"   {report['steps'][0]['n_processed_columns']} -> {selected['n_processed_columns']} colunas processadas")
+    print(f"💾 Artefatos em {args.output} (registre com: python -m src.models.model_registry register performance {args.output})")
+
+
+if __name__ == "__main__":
+    main()
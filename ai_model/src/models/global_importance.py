@@ -0,0 +1,219 @@
+# =============================================================================
+# ARQUIVO: src/models/global_importance.py
+# OBJETIVO: Importância global das features (turma, instituição ou dataset
+#           de treino) pré-calculada e servida em tempo constante.
+#           - Média de |SHAP| por feature original e média com sinal por
+#             valor de cada categoria, calculadas em blocos paralelos.
+#           - Resultados gravados por versão do modelo e por coorte; só são
+#             recalculados quando o modelo ou a coorte mudam.
+#           - O cálculo do dataset de treino é feito fora da API (este
+#             script), antes de ativar uma versão; a API só lê o resultado.
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.global_importance   (pré-calcula para o treino)
+#   python -m src.models.global_importance --model-dir src/pipelines/registry/performance/v2
+# =============================================================================
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+
+TRAINING_COHORT = "training"
+
+
+def file_digest(path) -> str:
+    """Versão de um artefato: prefixo do SHA-256 do arquivo."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def cohort_digest(df: pd.DataFrame) -> str:
+    """Identifica o conteúdo de uma coorte (mesmos dados -> mesmo hash)."""
+    hashed = pd.util.hash_pandas_object(df.reset_index(drop=True), index=False).to_numpy()
+    return hashlib.sha256(hashed.tobytes()).hexdigest()[:16]
+
+
+def _categorical_sources(session, df: pd.DataFrame):
+    """Features originais tratadas por valor: não numéricas ou com one-hot."""
+    counts = np.bincount(session.source_index, minlength=len(session.source_columns))
+    categorical = []
+    for j, column in enumerate(session.source_columns):
+        if column not in df.columns:
+            continue
+        if counts[j] > 1 or not pd.api.types.is_numeric_dtype(df[column]):
+            categorical.append((j, column))
+    return categorical
+
+
+def _chunk_statistics(session, X_chunk, df_chunk, categorical):
+    """Somas parciais de um bloco (combinadas depois por soma simples)."""
+    grouped = session.grouped_values(session.shap_values(X_chunk))
+    per_value = {}
+    for j, column in categorical:
+        # Enums (entrada da API) são reduzidos ao seu valor textual
+        column_values = df_chunk[column].astype(object).map(lambda v: getattr(v, "value", v))
+        values = column_values.where(column_values.notna(), "N/A").astype(str).to_numpy()
+        uniques, codes = np.unique(values, return_inverse=True)
+        sums = np.bincount(codes, weights=grouped[:, j], minlength=len(uniques))
+        counts = np.bincount(codes, minlength=len(uniques))
+        per_value[column] = {u: (s, c) for u, s, c in zip(uniques, sums, counts)}
+    return np.abs(grouped).sum(axis=0), grouped.sum(axis=0), len(grouped), per_value
+
+
+def compute_global_importance(session, X_processed, df_original, chunk_size=500, n_jobs=-1):
+    """
+    Calcula a importância global de um conjunto de alunos.
+
+    Args:
+        session: ExplanationSession do modelo.
+        X_processed: Dados já processados (N×d).
+        df_original: Os mesmos alunos com as colunas originais (N linhas).
+        chunk_size: Linhas por bloco de cálculo SHAP.
+        n_jobs: Blocos em paralelo (threads; o explainer é compartilhado).
+
+    Returns:
+        dict: n_samples e a lista de features ordenada por média de |SHAP|.
+    """
+    df_original = df_original.reset_index(drop=True)
+    categorical = _categorical_sources(session, df_original)
+    bounds = [(start, min(start + chunk_size, len(df_original))) for start in range(0, len(df_original), chunk_size)]
+    partials = Parallel(n_jobs=n_jobs, prefer="threads")(
+        delayed(_chunk_statistics)(session, X_processed[start:end], df_original.iloc[start:end], categorical)
+        for start, end in bounds
+    )
+
+    n_features = len(session.source_columns)
+    abs_sum, signed_sum, n_samples = np.zeros(n_features), np.zeros(n_features), 0
+    value_stats = {}
+    for chunk_abs, chunk_signed, chunk_n, chunk_values in partials:
+        abs_sum += chunk_abs
+        signed_sum += chunk_signed
+        n_samples += chunk_n
+        for column, stats in chunk_values.items():
+            merged = value_stats.setdefault(column, {})
+            for value, (s, c) in stats.items():
+                total_s, total_c = merged.get(value, (0.0, 0))
+                merged[value] = (total_s + s, total_c + c)
+
+    features = []
+    for j, column in enumerate(session.source_columns):
+        entry = {
+            "feature": column,
+            "mean_abs_shap": float(abs_sum[j] / max(n_samples, 1)),
+            "mean_shap": float(signed_sum[j] / max(n_samples, 1)),
+        }
+        if column in value_stats:
+            entry["values"] = {
+                value: {"mean_shap": float(s / c), "count": int(c)}
+                for value, (s, c) in sorted(value_stats[column].items())
+            }
+        features.append(entry)
+    features.sort(key=lambda item: item["mean_abs_shap"], reverse=True)
+    return {"n_samples": int(n_samples), "features": features}
+
+
+class GlobalImportanceStore:
+    """
+    Guarda os resultados por (modelo, versão, coorte) em disco e os mais
+    usados em memória (LRU com `max_entries`). Leituras são um acesso a
+    dicionário; cálculos só acontecem quando a versão do modelo ou o
+    conteúdo da coorte mudam.
+    """
+    def __init__(self, directory, max_entries=64):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, model_name, model_version, cohort):
+        safe_model = "".join(ch if ch.isalnum() else "_" for ch in model_name)
+        safe_cohort = "".join(ch if ch.isalnum() or ch in "-_" else "_" for ch in cohort)
+        # O hash do nome separa coortes que viram o mesmo texto ("turma a" e "turma_a")
+        cohort_hash = hashlib.sha256(cohort.encode("utf-8")).hexdigest()[:8]
+        return self.directory / f"{safe_model}__{model_version}__{safe_cohort}-{cohort_hash}.json"
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_entries:
+                self._results.popitem(last=False)
+
+    def get(self, model_name, model_version, cohort=TRAINING_COHORT):
+        key = (model_name, model_version, cohort)
+        result = self._results.get(key)
+        if result is None:
+            path = self._path(model_name, model_version, cohort)
+            if not path.exists():
+                return None
+            result = json.loads(path.read_text(encoding="utf-8"))
+            if (result.get("model"), result.get("model_version"), result.get("cohort")) != key:
+                return None
+            self._remember(key, result)
+        return result
+
+    def entries(self):
+        return [
+            {"model": m, "model_version": v, "cohort": c, "n_samples": r["n_samples"], "computed_at": r["computed_at"]}
+            for (m, v, c), r in list(self._results.items())
+        ]
+
+    def compute(self, session, model_name, model_version, X_processed, df_original,
+                cohort=TRAINING_COHORT, force=False, **kwargs):
+        """Calcula (se necessário) e grava o resultado da coorte."""
+        digest = cohort_digest(df_original)
+        current = self.get(model_name, model_version, cohort)
+        if current is not None and current.get("cohort_hash") == digest and not force:
+            return current
+
+        result = compute_global_importance(session, X_processed, df_original, **kwargs)
+        result.update({
+            "model": model_name,
+            "model_version": model_version,
+            "cohort": cohort,
+            "cohort_hash": digest,
+            "computed_at": datetime.now(timezone.utc).isoformat(),
+        })
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self._path(model_name, model_version, cohort)
+            tmp_path = path.with_suffix(".json.tmp")
+            tmp_path.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+            tmp_path.replace(path)
+        self._remember((model_name, model_version, cohort), result)
+        return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.models.model_registry import ARTIFACTS
+    from src.models.preview import PredictionService
+
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Pré-calcula a importância global do dataset de treino")
+    parser.add_argument("--model-dir", type=Path, default=base_dir / "pipelines",
+                        help="Diretório com os artefatos de desempenho (padrão: src/pipelines)")
+    parser.add_argument("--force", action="store_true", help="Recalcula mesmo se já houver resultado")
+    args = parser.parse_args()
+
+    preprocessor_file, logreg_file, rf_file = ARTIFACTS["performance"]
+    prediction_service = PredictionService(
+        args.model_dir / preprocessor_file,
+        args.model_dir / logreg_file,
+        args.model_dir / rf_file,
+        base_dir / "datasets" / "StudentPerformanceFactors.csv"
+    )
+    for name in prediction_service.models:
+        result = prediction_service.compute_global_importance(name, force=args.force)
+        top = ", ".join(item["feature"] for item in result["features"][:5])
+        print(f"✅ {name} ({result['model_version']}): {result['n_samples']} alunos | top 5: {top}")
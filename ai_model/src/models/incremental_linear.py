@@ -0,0 +1,175 @@
+# =============================================================================
+# ARQUIVO: src/models/incremental_linear.py
+# OBJETIVO: Mínimos quadrados incrementais por estatísticas suficientes.
+#           - Mantém XᵀX, Xᵀy, yᵀy, somas e contagem sobre as features
+#             já codificadas pelo perf_preprocess.pkl.
+#           - Adicionar/remover alunos ou coortes custa O(d²) por linha e
+#             resolver o sistema custa O(d³), independente do nº de linhas.
+#           - Sem regularização o resultado é o mesmo do LinearRegression
+#             em lote (mesma centragem e solução de norma mínima); com alpha
+#             é o mesmo do Ridge.
+#           - Estatísticas separadas por janela (ex.: semestre) permitem
+#             treinar/avaliar em qualquer combinação de janelas.
+# =============================================================================
+
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+
+
+class SufficientStats:
+    """Estatísticas suficientes (ponderadas) de um conjunto de linhas."""
+    def __init__(self, n_features):
+        self.n = 0.0
+        self.sx = np.zeros(n_features)
+        self.sy = 0.0
+        self.xtx = np.zeros((n_features, n_features))
+        self.xty = np.zeros(n_features)
+        self.yty = 0.0
+
+    def update(self, X, y, sample_weight=None, sign=1.0):
+        X = np.asarray(X, dtype=float)
+        y = np.asarray(y, dtype=float)
+        w = np.ones(len(y)) if sample_weight is None else np.asarray(sample_weight, dtype=float)
+        w = sign * w
+        Xw = X * w[:, None]
+        self.n += w.sum()
+        self.sx += Xw.sum(axis=0)
+        self.sy += w @ y
+        self.xtx += Xw.T @ X
+        self.xty += Xw.T @ y
+        self.yty += w @ (y * y)
+        return self
+
+    def __iadd__(self, other):
+        self.n += other.n
+        self.sx += other.sx
+        self.sy += other.sy
+        self.xtx += other.xtx
+        self.xty += other.xty
+        self.yty += other.yty
+        return self
+
+    def to_dict(self, prefix=''):
+        return {
+            f'{prefix}n': np.array(self.n), f'{prefix}sx': self.sx, f'{prefix}sy': np.array(self.sy),
+            f'{prefix}xtx': self.xtx, f'{prefix}xty': self.xty, f'{prefix}yty': np.array(self.yty),
+        }
+
+    @classmethod
+    def from_dict(cls, data, prefix=''):
+        stats = cls(len(data[f'{prefix}sx']))
+        stats.n = float(data[f'{prefix}n'])
+        stats.sx = np.array(data[f'{prefix}sx'], dtype=float)
+        stats.sy = float(data[f'{prefix}sy'])
+        stats.xtx = np.array(data[f'{prefix}xtx'], dtype=float)
+        stats.xty = np.array(data[f'{prefix}xty'], dtype=float)
+        stats.yty = float(data[f'{prefix}yty'])
+        return stats
+
+
+class IncrementalLeastSquares:
+    """
+    Regressão linear (ou Ridge) mantida por estatísticas suficientes,
+    agrupadas por janela. A janela padrão é 'default'.
+    """
+    def __init__(self, n_features, alpha=0.0):
+        self.n_features = n_features
+        self.alpha = alpha
+        self.windows = {}
+
+    def _window(self, window):
+        if window not in self.windows:
+            self.windows[window] = SufficientStats(self.n_features)
+        return self.windows[window]
+
+    def partial_fit(self, X, y, sample_weight=None, window='default'):
+        """Acumula novas linhas (já pré-processadas) na janela indicada."""
+        self._window(window).update(X, y, sample_weight)
+        return self
+
+    def remove(self, X, y, sample_weight=None, window='default'):
+        """Remove linhas previamente acumuladas (ex.: correção de notas)."""
+        self._window(window).update(X, y, sample_weight, sign=-1.0)
+        return self
+
+    def remove_window(self, window):
+        """Remove uma coorte/janela inteira."""
+        self.windows.pop(window, None)
+        return self
+
+    def combined(self, windows=None):
+        keys = self.windows.keys() if windows is None else windows
+        total = SufficientStats(self.n_features)
+        for key in keys:
+            total += self.windows[key]
+        return total
+
+    def solve(self, windows=None, alpha=None):
+        """
+        Resolve o sistema para as janelas escolhidas (todas por padrão).
+        Retorna (coef, intercept).
+        """
+        alpha = self.alpha if alpha is None else alpha
+        stats = self.combined(windows)
+        if stats.n <= 0:
+            raise ValueError("Nenhuma linha acumulada para as janelas selecionadas.")
+        x_mean = stats.sx / stats.n
+        y_mean = stats.sy / stats.n
+        # Estatísticas centradas, como o LinearRegression/Ridge fazem com fit_intercept
+        sxx = stats.xtx - stats.n * np.outer(x_mean, x_mean)
+        sxy = stats.xty - stats.n * x_mean * y_mean
+        if alpha > 0:
+            coef = np.linalg.solve(sxx + alpha * np.eye(self.n_features), sxy)
+        else:
+            # One-hot completo + intercepto é singular: solução de norma mínima
+            coef = np.linalg.lstsq(sxx, sxy, rcond=None)[0]
+        intercept = y_mean - x_mean @ coef
+        return coef, intercept
+
+    def to_estimator(self, windows=None, alpha=None):
+        """Gera um estimador scikit-learn pronto para salvar (mesmo formato do .pkl atual)."""
+        alpha = self.alpha if alpha is None else alpha
+        coef, intercept = self.solve(windows, alpha)
+        model = Ridge(alpha=alpha) if alpha > 0 else LinearRegression()
+        model.coef_ = coef
+        model.intercept_ = float(intercept)
+        model.n_features_in_ = self.n_features
+        return model
+
+    def evaluate(self, coef, intercept, windows=None):
+        """
+        Métricas de um modelo (coef, intercept) sobre as janelas escolhidas,
+        calculadas só com as estatísticas (sem reler linhas brutas).
+        O MAE depende das linhas individuais e não é obtido aqui.
+        """
+        stats = self.combined(windows)
+        # SSE = Σ w (y - b - xᵀβ)²
+        sse = (
+            stats.yty
+            - 2 * (coef @ stats.xty + intercept * stats.sy)
+            + coef @ stats.xtx @ coef
+            + 2 * intercept * (coef @ stats.sx)
+            + intercept ** 2 * stats.n
+        )
+        sst = stats.yty - stats.sy ** 2 / stats.n
+        return {
+            'n': stats.n,
+            'rmse': float(np.sqrt(max(sse, 0.0) / stats.n)),
+            'r2': float(1 - sse / sst) if sst > 0 else float('nan'),
+        }
+
+    def save(self, path):
+        data = {'n_features': np.array(self.n_features), 'alpha': np.array(self.alpha)}
+        keys = list(self.windows)
+        data['windows'] = np.array(keys, dtype=str)
+        for i, key in enumerate(keys):
+            data.update(self.windows[key].to_dict(prefix=f'w{i}_'))
+        np.savez(path, **data)
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        model = cls(int(data['n_features']), alpha=float(data['alpha']))
+        for i, key in enumerate(data['windows'].tolist()):
+            model.windows[key] = SufficientStats.from_dict(data, prefix=f'w{i}_')
+        return model
@@ -0,0 +1,207 @@
+# =============================================================================
+# ARQUIVO: src/models/intervention.py
+# OBJETIVO: Simulação Monte Carlo de intervenções em uma coorte inteira.
+#           - Regras alteram colunas da coorte: add, multiply ou set, para uma
+#             fração `coverage` dos alunos, com efeito aleatório opcional
+#             (desvio `sd`, sorteado por simulação).
+#           - Colunas inteiras (contagens como Tutoring_Sessions, que o
+#             pré-processador codifica como categorias 0..8) são arredondadas
+#             e não ficam negativas: um 2,82 seria uma categoria desconhecida.
+#           - Cada bloco de simulações vira um único DataFrame (simulações ×
+#             alunos) pontuado de uma vez pelos modelos de desempenho e de
+#             evasão; só as taxas por simulação são guardadas, então a memória
+#             fica limitada pelo tamanho do bloco (`max_rows_per_chunk`).
+#           - Resultado: distribuição da taxa de aprovação e da parcela em
+#             risco alto de evasão, comparadas com a coorte sem intervenção.
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.intervention coorte.csv regras.json --draws 500
+#   regras.json: [{"column": "Attendance", "op": "multiply", "value": 1.1,
+#                  "sd": 0.02, "max": 100},
+#                 {"column": "Tutoring_Sessions", "op": "add", "value": 1,
+#                  "max": 8}]
+# =============================================================================
+
+import argparse
+import json
+
+import numbers
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_integer_dtype, is_numeric_dtype
+
+APPROVAL_THRESHOLD = 0.60   # nota prevista >= 60
+HIGH_RISK_THRESHOLD = 0.66  # classe "alto" do DropoutService
+OPERATIONS = ("add", "multiply", "set")
+
+
+def _is_number(value):
+    return isinstance(value, numbers.Number) and not isinstance(value, bool)
+
+
+def validate_rules(rules, cohort):
+    """Confere operação, coluna, cobertura e o tipo do valor de cada regra."""
+    for rule in rules:
+        if rule.get("op") not in OPERATIONS:
+            raise ValueError(f"Operação inválida: {rule.get('op')} (use {', '.join(OPERATIONS)})")
+        column = rule.get("column")
+        if column not in cohort.columns:
+            raise ValueError(f"Coluna inexistente na coorte: {column}")
+        if not 0.0 <= rule.get("coverage", 1.0) <= 1.0:
+            raise ValueError("coverage deve estar entre 0 e 1")
+
+        # O valor tem de ter o tipo da coluna (ex.: Tutoring_Sessions é uma contagem)
+        dtype, value = cohort[column].dtype, rule.get("value")
+        if rule["op"] != "set" or is_numeric_dtype(dtype):
+            if not is_numeric_dtype(dtype):
+                raise ValueError(f"{rule['op']} exige uma coluna numérica: {column} é {dtype}")
+            if not _is_number(value):
+                raise ValueError(f"Valor de {column} deve ser numérico, recebido {value!r}")
+            if rule["op"] == "set" and is_integer_dtype(dtype) and float(value) != int(value):
+                raise ValueError(f"Valor de {column} deve ser inteiro, recebido {value!r}")
+        elif not isinstance(value, str):
+            raise ValueError(f"Valor de {column} deve ser texto, recebido {value!r}")
+
+
+def _is_stochastic(rules):
+    return any(rule.get("sd", 0) > 0 or rule.get("coverage", 1.0) < 1.0 for rule in rules)
+
+
+def apply_rules(frame, rules, draw_ids, n_draws, rng):
+    """
+    Aplica as regras a um bloco (simulações empilhadas). O efeito é sorteado
+    por simulação e a cobertura por aluno.
+    """
+    for rule in rules:
+        column = rule["column"]
+        covered = rng.random(len(frame)) < rule.get("coverage", 1.0)
+        if rule["op"] == "set":
+            values = frame[column].astype(object)
+            values[covered] = rule["value"]
+            frame[column] = values
+            continue
+
+        effect = rule["value"] + rule.get("sd", 0.0) * rng.standard_normal(n_draws)
+        current = frame[column].to_numpy(dtype=float)
+        changed = current + effect[draw_ids] if rule["op"] == "add" else current * effect[draw_ids]
+        changed = np.clip(changed, rule.get("min", -np.inf), rule.get("max", np.inf))
+        if is_integer_dtype(frame[column].dtype):
+            lower = 0 if current.min() >= 0 else -np.inf
+            changed = np.clip(np.rint(changed), max(np.ceil(rule.get("min", lower)), lower),
+                              np.floor(rule.get("max", np.inf)))
+            frame[column] = np.where(covered, changed, current).astype(frame[column].dtype)
+            continue
+        frame[column] = np.where(covered, changed, current)
+    return frame
+
+
+def _summary(baseline, per_draw):
+    return {
+        "baseline": float(baseline),
+        "mean": float(per_draw.mean()),
+        "std": float(per_draw.std()),
+        "p05": float(np.quantile(per_draw, 0.05)),
+        "p50": float(np.quantile(per_draw, 0.50)),
+        "p95": float(np.quantile(per_draw, 0.95)),
+        "delta_mean": float(per_draw.mean() - baseline),
+    }
+
+
+def simulate_interventions(cohort, rules, performance_service=None, dropout_service=None,
+                           n_draws=200, max_rows_per_chunk=100_000, random_state=0):
+    """
+    Distribuições da taxa de aprovação e da parcela em risco alto de evasão
+    sob as regras de intervenção.
+
+    Args:
+        cohort: DataFrame com as colunas originais dos modelos usados.
+        rules: Lista de regras (column, op, value, sd, coverage, min, max).
+        performance_service: PredictionService (taxa de aprovação) ou None.
+        dropout_service: DropoutService (risco de evasão) ou None.
+        n_draws: Simulações Monte Carlo (1 se as regras forem determinísticas).
+        max_rows_per_chunk: Linhas pontuadas por vez (simulações × alunos).
+
+    Returns:
+        dict: resumo por métrica (base, média, desvio, quantis e variação).
+    """
+    validate_rules(rules, cohort)
+    cohort = cohort.reset_index(drop=True)
+    n_students = len(cohort)
+    n_draws = n_draws if _is_stochastic(rules) else 1
+    chunk_draws = max(1, max_rows_per_chunk // max(n_students, 1))
+    rng = np.random.default_rng(random_state)
+
+    scorers = {}
+    if performance_service is not None:
+        scorers["pass_rate"] = lambda df: performance_service.approval_probabilities(df) >= APPROVAL_THRESHOLD
+    if dropout_service is not None:
+        scorers["high_risk_share"] = lambda df: dropout_service.dropout_probabilities(df) >= HIGH_RISK_THRESHOLD
+    if not scorers:
+        raise ValueError("Informe ao menos um serviço (desempenho ou evasão).")
+
+    baseline = {name: float(scorer(cohort).mean()) for name, scorer in scorers.items()}
+    per_draw = {name: np.empty(n_draws) for name in scorers}
+    for start in range(0, n_draws, chunk_draws):
+        stop = min(start + chunk_draws, n_draws)
+        size = stop - start
+        draw_ids = np.repeat(np.arange(size), n_students)
+        frame = cohort.iloc[np.tile(np.arange(n_students), size)].reset_index(drop=True)
+        frame = apply_rules(frame, rules, draw_ids, size, rng)
+        for name, scorer in scorers.items():
+            hits = np.bincount(draw_ids, weights=scorer(frame).astype(float), minlength=size)
+            per_draw[name][start:stop] = hits / n_students
+
+    return {
+        "n_students": n_students,
+        "n_draws": n_draws,
+        "rules": rules,
+        **{name: _summary(baseline[name], per_draw[name]) for name in scorers},
+    }
+
+
+if __name__ == "__main__":
+    from pathlib import Path
+
+    import joblib
+
+    from src.models.dropout_service import DropoutService
+    from src.models.model_registry import ARTIFACTS
+    from src.models.preview import PredictionService
+
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description="Simula intervenções em uma coorte")
+    parser.add_argument("cohort", help="CSV com os alunos da coorte")
+    parser.add_argument("rules", help="JSON com a lista de regras")
+    parser.add_argument("--draws", type=int, default=200, help="Simulações Monte Carlo")
+    parser.add_argument("--chunk-rows", type=int, default=100_000, help="Linhas pontuadas por bloco")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--model-dir", type=Path, default=base_dir / "pipelines",
+                        help="Diretório com os artefatos dos modelos (padrão: src/pipelines)")
+    args = parser.parse_args()
+
+    cohort_df = pd.read_csv(args.cohort)
+    with open(args.rules, encoding="utf-8") as f:
+        intervention_rules = json.load(f)
+
+    # Cada modelo só é carregado se existir e a coorte tiver todas as suas colunas
+    def _usable(files):
+        if not all(path.exists() for path in files):
+            return False
+        needed = getattr(joblib.load(files[0]), "feature_names_in_", None)
+        return needed is not None and set(needed) <= set(cohort_df.columns)
+
+    services = {}
+    performance_files = [args.model_dir / name for name in ARTIFACTS["performance"]]
+    if _usable(performance_files):
+        services["performance_service"] = PredictionService(
+            *performance_files, base_dir / "datasets" / "StudentPerformanceFactors.csv"
+        )
+    dropout_files = [args.model_dir / name for name in ARTIFACTS["dropout"]]
+    if _usable(dropout_files):
+        services["dropout_service"] = DropoutService(*dropout_files)
+
+    result = simulate_interventions(
+        cohort_df, intervention_rules, n_draws=args.draws,
+        max_rows_per_chunk=args.chunk_rows, random_state=args.seed, **services
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
@@ -0,0 +1,229 @@
+# =============================================================================
+# ARQUIVO: src/models/model_registry.py
+# OBJETIVO: Registro local de versões de modelos e troca sem indisponibilidade.
+#           - Cada versão é um diretório imutável <raiz>/<modelo>/<versão>/
+#             com os .pkl; um manifest.json guarda a versão ativa e o histórico.
+#           - Uma nova versão é carregada e aquecida em segundo plano; só
+#             depois a referência servida é trocada (uma única atribuição).
+#             Requisições em andamento terminam com a versão antiga.
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.model_registry register performance src/pipelines --version v2
+#   python -m src.models.model_registry list
+# =============================================================================
+
+import argparse
+import json
+import shutil
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Arquivos que compõem cada modelo servido pela API
+ARTIFACTS = {
+    "performance": ("perf_preprocess.pkl", "perf_logreg_model.pkl", "perf_rf_model.pkl"),
+    "dropout": ("dropout_preprocess.pkl", "dropout_logreg_model.pkl"),
+}
+
+# Versão usada quando o registro está vazio (arquivos de src/pipelines)
+BUNDLED_VERSION = "bundled"
+
+LiveModel = namedtuple("LiveModel", ["version", "service"])
+
+
+class ModelSlot:
+    """
+    Referência ao serviço em produção de um modelo. Cada requisição lê
+    `current` uma única vez e usa o par (versão, serviço) até o fim.
+    """
+    def __init__(self, name, service=None, version=None):
+        self.name = name
+        self.current = LiveModel(version, service)
+        self.state = {"status": "idle"}
+        # Serializa o início das ativações (verificação e marcação de "loading")
+        self.lock = threading.Lock()
+
+    def swap(self, service, version):
+        """Troca o serviço publicado; retorna o anterior."""
+        previous = self.current
+        self.current = LiveModel(version, service)
+        return previous
+
+
+class ModelRegistry:
+    """
+    Versões registradas em disco e ativação em segundo plano.
+
+    Args:
+        root: Diretório do registro.
+        loaders: {modelo: função(diretório da versão) -> serviço já aquecido}.
+    """
+    def __init__(self, root, loaders=None):
+        self.root = Path(root)
+        self.loaders = loaders or {}
+        self.manifest_path = self.root / "manifest.json"
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Manifesto
+    # ------------------------------------------------------------------
+    def _read_manifest(self):
+        if self.manifest_path.exists():
+            return json.loads(self.manifest_path.read_text(encoding="utf-8"))
+        return {"models": {}}
+
+    def _write_manifest(self, manifest):
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".json.tmp")
+        tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.manifest_path)
+
+    def _entry(self, manifest, name):
+        return manifest["models"].setdefault(name, {"active": None, "history": [], "versions": {}})
+
+    def active_version(self, name):
+        return self._read_manifest()["models"].get(name, {}).get("active")
+
+    def version_dir(self, name, version):
+        return self.root / name / version
+
+    def versions(self, name):
+        entry = self._read_manifest()["models"].get(name, {"active": None, "versions": {}})
+        return [
+            {"version": version, "active": version == entry["active"], **info}
+            for version, info in sorted(entry["versions"].items(), key=lambda item: item[1]["registered_at"])
+        ]
+
+    # ------------------------------------------------------------------
+    # Registro
+    # ------------------------------------------------------------------
+    def register(self, name, source_dir, version=None):
+        """
+        Copia os artefatos de `source_dir` para uma nova versão imutável.
+        A cópia é feita em um diretório temporário e renomeada no final.
+        """
+        if name not in ARTIFACTS:
+            raise ValueError(f"Modelo desconhecido: {name}")
+        source_dir = Path(source_dir)
+        missing = [f for f in ARTIFACTS[name] if not (source_dir / f).exists()]
+        if missing:
+            raise FileNotFoundError(f"Artefatos ausentes em {source_dir}: {', '.join(missing)}")
+
+        version = version or datetime.now(timezone.utc).strftime("v%Y%m%d%H%M%S")
+        target = self.version_dir(name, version)
+        if target.exists():
+            raise ValueError(f"A versão '{version}' de '{name}' já existe.")
+
+        tmp_dir = target.with_name(f".{version}.tmp")
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        for filename in ARTIFACTS[name]:
+            shutil.copy2(source_dir / filename, tmp_dir / filename)
+            # Formato compacto (packed_forest.py), quando exportado
+            packed = (source_dir / filename).with_suffix(".packed")
+            if packed.is_dir():
+                shutil.copytree(packed, tmp_dir / packed.name)
+        tmp_dir.rename(target)
+
+        with self._lock:
+            manifest = self._read_manifest()
+            self._entry(manifest, name)["versions"][version] = {
+                "registered_at": datetime.now(timezone.utc).isoformat(),
+                "source": str(source_dir),
+            }
+            self._write_manifest(manifest)
+        return version
+
+    # ------------------------------------------------------------------
+    # Carregamento e ativação
+    # ------------------------------------------------------------------
+    def load(self, name, version):
+        """Carrega (e aquece) o serviço de uma versão registrada."""
+        version_dir = self.version_dir(name, version)
+        if not version_dir.is_dir():
+            raise FileNotFoundError(f"Versão '{version}' de '{name}' não encontrada no registro.")
+        return self.loaders[name](version_dir)
+
+    def _record_activation(self, name, version):
+        with self._lock:
+            manifest = self._read_manifest()
+            entry = self._entry(manifest, name)
+            entry["active"] = version
+            entry["history"].append(version)
+            self._write_manifest(manifest)
+
+    def activate(self, name, version, slot, on_swap=None, background=True):
+        """
+        Carrega a versão fora do caminho das requisições e troca o slot.
+        O estado da ativação fica em `slot.state`.
+        """
+        with slot.lock:
+            if slot.state.get("status") == "loading":
+                raise RuntimeError(f"Já existe uma ativação em andamento para '{name}'.")
+            if not self.version_dir(name, version).is_dir():
+                raise FileNotFoundError(f"Versão '{version}' de '{name}' não encontrada no registro.")
+            slot.state = {"status": "loading", "target": version, "started_at": time.time()}
+
+        def _run():
+            started = time.perf_counter()
+            try:
+                service = self.load(name, version)
+                previous = slot.swap(service, version)
+                self._record_activation(name, version)
+                if on_swap:
+                    on_swap(service, previous)
+                slot.state = {
+                    "status": "active",
+                    "version": version,
+                    "previous": previous.version,
+                    "load_seconds": round(time.perf_counter() - started, 2),
+                }
+            except Exception as e:
+                slot.state = {"status": "failed", "target": version, "error": str(e)}
+
+        if background:
+            threading.Thread(target=_run, name=f"activate-{name}", daemon=True).start()
+        else:
+            _run()
+        return slot.state
+
+    def rollback_target(self, name, current_version):
+        """Versão ativa antes da atual (segundo o histórico do manifesto)."""
+        history = self._read_manifest()["models"].get(name, {}).get("history", [])
+        for version in reversed(history):
+            if version != current_version and self.version_dir(name, version).is_dir():
+                return version
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Registro local de versões de modelos")
+    parser.add_argument("--root", type=Path, default=Path(__file__).resolve().parents[1] / "pipelines" / "registry")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    register = subparsers.add_parser("register", help="Registra uma nova versão a partir de um diretório")
+    register.add_argument("model", choices=sorted(ARTIFACTS))
+    register.add_argument("source_dir", type=Path)
+    register.add_argument("--version")
+
+    subparsers.add_parser("list", help="Lista as versões registradas")
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.root)
+    if args.command == "register":
+        version = registry.register(args.model, args.source_dir, version=args.version)
+        print(f"✅ {args.model}: versão '{version}' registrada em {registry.version_dir(args.model, version)}")
+        if args.model == "performance":
+            print(f"➡️ Pré-calcule a importância global: python -m src.models.global_importance "
+                  f"--model-dir {registry.version_dir(args.model, version)}")
+        print("➡️ Ative com POST /admin/models/{modelo}/activate/{versão}")
+    else:
+        for name in sorted(ARTIFACTS):
+            for info in registry.versions(name):
+                marker = "*" if info["active"] else " "
+                print(f"{marker} {name:<12} {info['version']:<20} {info['registered_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# =============================================================================
+# ARQUIVO: src/models/online_dropout.py
+# OBJETIVO: Variante incremental do modelo de evasão (xAPI).
+#           - Pré-processador compatível com streaming: one-hot com categorias
+#             fixas (schema dos datasets) e StandardScaler via partial_fit.
+#           - SGDClassifier com perda logística, atualizado por mini-lotes.
+#           - Lotes parciais (ex.: os 7 campos da API) só atualizam os
+#             coeficientes das features presentes; as ausentes entram com o
+#             seu valor esperado (média ou frequência das categorias).
+#           - Checkpoint atômico após cada atualização e publicação direta
+#             no DropoutService, sem retreino completo.
+# =============================================================================
+
+import copy
+import os
+import threading
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.datasets.storage import SCHEMAS
+
+TARGET = 'dropout_label'
+# 'Class' é o desempenho final do aluno e não entra como feature
+EXCLUDED = ('Class', TARGET)
+CLASSES = np.array([0, 1])
+
+
+class StreamingPreprocessor:
+    """
+    Pré-processador equivalente ao dropout_preprocess.pkl, mas atualizável
+    em mini-lotes. As categorias vêm do schema declarado, então o one-hot não
+    depende dos dados vistos; só as estatísticas numéricas evoluem.
+    """
+    def __init__(self, dataset='xAPI_dropout'):
+        schema = SCHEMAS[dataset]
+        self.categorical_cols = [c for c, spec in schema.items() if isinstance(spec, list) and c not in EXCLUDED]
+        self.numeric_cols = [c for c, spec in schema.items() if not isinstance(spec, list) and c not in EXCLUDED]
+        self.feature_names_in_ = np.array(self.categorical_cols + self.numeric_cols, dtype=object)
+
+        self.encoder = OneHotEncoder(
+            categories=[schema[c] for c in self.categorical_cols],
+            handle_unknown='ignore',
+            sparse_output=False
+        )
+        # As categorias são fixas: o fit só registra a estrutura do encoder
+        self.encoder.fit(pd.DataFrame({c: [schema[c][0]] for c in self.categorical_cols}))
+        self.scaler = StandardScaler()
+        self.medians_ = None
+        # Contagem de cada categoria vista (one-hot esperado de uma feature ausente)
+        self.category_counts_ = {c: np.zeros(len(schema[c])) for c in self.categorical_cols}
+
+    def _absent(self, X: pd.DataFrame, columns):
+        return [c for c in columns if c not in X.columns]
+
+    def _numeric(self, X: pd.DataFrame) -> np.ndarray:
+        values = X.reindex(columns=self.numeric_cols).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        if self.medians_ is not None:
+            mask = np.isnan(values)
+            if mask.any():
+                values[mask] = np.take(self.medians_, np.nonzero(mask)[1])
+        return values
+
+    def _categorical(self, X: pd.DataFrame) -> np.ndarray:
+        encoded = self.encoder.transform(X.reindex(columns=self.categorical_cols).astype(object))
+        start = 0
+        for column, categories in zip(self.categorical_cols, self.encoder.categories_):
+            if column not in X.columns:
+                counts = self.category_counts_[column]
+                total = counts.sum()
+                encoded[:, start:start + len(categories)] = counts / total if total else 1.0 / len(categories)
+            start += len(categories)
+        return encoded
+
+    def partial_fit(self, X: pd.DataFrame):
+        """Atualiza as estatísticas só com as colunas presentes em `X`."""
+        absent = self._absent(X, self.numeric_cols)
+        if len(absent) == len(self.numeric_cols) and self.medians_ is None:
+            raise ValueError("O primeiro lote precisa trazer as features numéricas.")
+        values = X.reindex(columns=self.numeric_cols).apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        if self.medians_ is None:
+            self.medians_ = np.nan_to_num(np.nanmedian(values, axis=0))
+        numeric = self._numeric(X)
+        # NaN é ignorado pelo StandardScaler: colunas ausentes não mudam média nem variância
+        numeric[:, [self.numeric_cols.index(c) for c in absent]] = np.nan
+        self.scaler.partial_fit(numeric)
+
+        for column, categories in zip(self.categorical_cols, self.encoder.categories_):
+            if column in X.columns:
+                labels = X[column].astype(object).map(lambda v: getattr(v, 'value', v))
+                codes = pd.Categorical(labels, categories=categories).codes
+                self.category_counts_[column] += np.bincount(codes[codes >= 0], minlength=len(categories))
+        return self
+
+    def transform(self, X: pd.DataFrame) -> np.ndarray:
+        """
+        Mesma ordem do pré-processador original: categóricas, depois numéricas.
+        Colunas ausentes entram com o valor esperado (one-hot médio e 0 após
+        a padronização).
+        """
+        numeric = self.scaler.transform(self._numeric(X))
+        numeric[:, [self.numeric_cols.index(c) for c in self._absent(X, self.numeric_cols)]] = 0.0
+        return np.hstack([self._categorical(X), numeric])
+
+    def output_mask(self, columns) -> np.ndarray:
+        """Colunas processadas que vêm das features originais `columns`."""
+        owners = [c for c, categories in zip(self.categorical_cols, self.encoder.categories_) for _ in categories]
+        owners += self.numeric_cols
+        return np.isin(owners, list(columns))
+
+    def get_feature_names_out(self):
+        cat_names = [f"categorical__{name}" for name in self.encoder.get_feature_names_out(self.categorical_cols)]
+        num_names = [f"numeric__{name}" for name in self.numeric_cols]
+        return np.array(cat_names + num_names, dtype=object)
+
+
+class OnlineDropoutTrainer:
+    """
+    Mantém o modelo de evasão incremental: recebe mini-lotes rotulados,
+    atualiza pré-processador e modelo, grava o checkpoint e publica no
+    DropoutService (se houver um associado).
+    """
+    def __init__(self, checkpoint_path, service=None, random_state=42, alpha=5e-3):
+        self.checkpoint_path = Path(checkpoint_path)
+        self.service = service
+        self.preprocessor = StreamingPreprocessor()
+        # alpha próximo da regularização da LogisticRegression em lote (C=1):
+        # com valores menores os coeficientes crescem e as probabilidades saturam
+        self.model = SGDClassifier(
+            loss='log_loss',
+            alpha=alpha,
+            learning_rate='optimal',
+            random_state=random_state
+        )
+        # Pesos 'balanced' estimados no bootstrap (partial_fit não aceita 'balanced')
+        self.class_weights = None
+        self.n_updates = 0
+        self.n_samples = 0
+        # Atualizações concorrentes (ex.: rotas da API) são serializadas
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, checkpoint_path, service=None):
+        """Restaura o treinador a partir de um checkpoint salvo."""
+        state = joblib.load(checkpoint_path)
+        trainer = cls(checkpoint_path, service=service)
+        trainer.preprocessor = state['preprocessor']
+        trainer.model = state['model']
+        trainer.class_weights = state['class_weights']
+        trainer.n_updates = state['n_updates']
+        trainer.n_samples = state['n_samples']
+        return trainer
+
+    def _split(self, batch: pd.DataFrame):
+        if TARGET not in batch.columns:
+            raise ValueError(f"A coluna '{TARGET}' é obrigatória nos lotes rotulados.")
+        present = [c for c in self.preprocessor.feature_names_in_ if c in batch.columns]
+        if not present:
+            raise ValueError("O lote não traz nenhuma feature do modelo de evasão.")
+        y = batch[TARGET].astype(int).to_numpy()
+        return batch[present], y
+
+    def bootstrap(self, data: pd.DataFrame, batch_size=256, epochs=5):
+        """
+        Treino inicial a partir do dataset completo, em mini-lotes.
+        Depois disso o modelo só recebe atualizações incrementais.
+        """
+        X, y = self._split(data)
+        missing = [c for c in self.preprocessor.feature_names_in_ if c not in X.columns]
+        if missing:
+            raise ValueError(f"O bootstrap exige todas as features; ausentes: {', '.join(missing)}")
+        counts = np.bincount(y, minlength=2).astype(float)
+        counts[counts == 0] = 1.0
+        self.class_weights = len(y) / (2.0 * counts)
+
+        self.preprocessor.partial_fit(X)
+        X_proc = self.preprocessor.transform(X)
+        rng = np.random.RandomState(self.model.random_state)
+        for _ in range(epochs):
+            order = rng.permutation(len(y))
+            for start in range(0, len(y), batch_size):
+                idx = order[start:start + batch_size]
+                self.model.partial_fit(
+                    X_proc[idx], y[idx], classes=CLASSES,
+                    sample_weight=self.class_weights[y[idx]]
+                )
+        self.n_samples += len(y)
+        return self._commit()
+
+    def update(self, batch: pd.DataFrame):
+        """
+        Aplica um mini-lote de novas matrículas rotuladas. Se o lote não
+        trouxer todas as features, só os coeficientes das presentes mudam.
+        """
+        if self.class_weights is None:
+            raise RuntimeError("Modelo ainda não inicializado. Execute bootstrap() primeiro.")
+        X, y = self._split(batch)
+        with self._lock:
+            # Atualiza cópias: o par publicado segue intacto até a troca
+            preprocessor = copy.deepcopy(self.preprocessor).partial_fit(X)
+            model = copy.deepcopy(self.model)
+            model.partial_fit(
+                preprocessor.transform(X), y, classes=CLASSES,
+                sample_weight=self.class_weights[y]
+            )
+            frozen = ~preprocessor.output_mask(X.columns)
+            model.coef_[:, frozen] = self.model.coef_[:, frozen]
+            self.preprocessor, self.model = preprocessor, model
+            self.n_samples += len(y)
+            return self._commit()
+
+    def _commit(self):
+        self.n_updates += 1
+        self.save_checkpoint()
+        if self.service is not None:
+            self.service.publish(self.preprocessor, self.model)
+        return {"n_updates": self.n_updates, "n_samples": self.n_samples}
+
+    def save_checkpoint(self):
+        """Grava o estado em arquivo temporário e troca atomicamente."""
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + '.tmp')
+        joblib.dump({
+            'preprocessor': self.preprocessor,
+            'model': self.model,
+            'class_weights': self.class_weights,
+            'n_updates': self.n_updates,
+            'n_samples': self.n_samples,
+        }, tmp_path)
+        os.replace(tmp_path, self.checkpoint_path)
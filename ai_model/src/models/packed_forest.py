@@ -0,0 +1,419 @@
+# =============================================================================
+# ARQUIVO: src/models/packed_forest.py
+# OBJETIVO: Formato compacto para os ensembles de árvores persistidos
+#           (Random Forest de classificação/regressão e Gradient Boosting).
+#           - Todas as árvores ficam em arrays contíguos float32/int32; dos
+#             valores dos nós só é mantido o que a predição usa (probabilidade
+#             da classe positiva ou valor da regressão).
+#           - Os arrays são gravados como .npy em um diretório e carregados
+#             com mmap: processos trabalhadores compartilham as páginas do SO
+#             e a carga não depende de unpickle de milhares de objetos.
+#           - A predição percorre todas as árvores de um lote em NumPy e o
+#             modelo é exposto ao SHAP (TreeExplainer) no formato de dicionário.
+#           - Em NumPy o percurso só ganha do scikit-learn em lotes pequenos.
+#             O export mede a latência dos dois em vários tamanhos de lote
+#             (meta.json: "latency_ms") e grava o maior lote em que o formato
+#             compacto é mais rápido ("max_packed_rows"); lotes maiores usam o
+#             pickle original, carregado só quando necessário. Se o compacto
+#             já for mais lento com uma linha, o export é recusado.
+#           - load_model compara tamanho e mtime do .pkl com os gravados no
+#             export e só calcula o SHA-256 quando eles mudam.
+#
+# DESVIO MÁXIMO: os limiares e valores em float32 podem alterar a predição em
+#   relação ao pickle original. O export mede o maior |desvio| nas linhas de
+#   verificação (meta.json: "max_abs_deviation") e recusa gravar acima da
+#   tolerância (padrão 1e-4 em probabilidade, 1e-3 em nota de 0 a 100).
+#   Na prática o desvio vem do arredondamento dos valores (~1e-7 relativo);
+#   um limiar só muda de lado quando x cai entre dois floats32 vizinhos.
+#
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.packed_forest src/pipelines/perf_rf_model.pkl \
+#       --preprocessor src/pipelines/perf_preprocess.pkl \
+#       --data src/datasets/StudentPerformanceFactors.csv
+# =============================================================================
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ARRAYS = ("roots", "feature", "threshold", "left", "right", "value", "cover")
+DEFAULT_TOLERANCE = {"classifier": 1e-4, "regressor": 1e-3}
+ROWS_PER_BLOCK = 4096
+# Tamanhos de lote medidos no export (compacto x pickle original)
+LATENCY_ROWS = (1, 16, 64, 256, 1024, 4096)
+
+
+def _source_signature(path) -> dict:
+    """Tamanho e mtime do .pkl: se não mudaram, o SHA-256 também não."""
+    stat = Path(path).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def _digest(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def packed_path(model_path) -> Path:
+    """Diretório do formato compacto correspondente a um .pkl."""
+    return Path(model_path).with_suffix(".packed")
+
+
+def _unwrap(model):
+    # Wrappers do projeto (ex.: AsymmetricGradientBoosting) guardam o ensemble em .model
+    inner = getattr(model, "model", None)
+    if not hasattr(model, "estimators_") and inner is not None and hasattr(inner, "estimators_"):
+        return inner
+    return model
+
+
+class PackedForest:
+    """
+    Ensemble de árvores em arrays planos. Nós de todas as árvores são
+    concatenados; `roots[t]` é o índice da raiz da árvore t e os filhos são
+    índices absolutos (-1 nas folhas).
+
+    predição = bias + scale × Σ_t value[folha_t(x)]
+      - Random Forest: scale = 1/n_árvores, bias = 0
+      - Gradient Boosting: scale = learning_rate, bias = predição inicial
+    """
+    def __init__(self, arrays, meta, source_path=None):
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+        self.meta = meta
+        # Lotes acima de max_packed_rows vão para o pickle original (se conhecido)
+        self.max_packed_rows = meta.get("max_packed_rows")
+        self.source_path = source_path
+        self._original = None
+        self.kind = meta["kind"]
+        self.scale = meta["scale"]
+        self.bias = meta["bias"]
+        self.max_depth = meta["max_depth"]
+        self.n_features_in_ = meta["n_features"]
+        self.source_digest = meta.get("source_digest")
+        if self.kind == "classifier":
+            self.classes_ = np.asarray(meta["classes"])
+
+    # ------------------------------------------------------------------
+    # Conversão
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_estimator(cls, model):
+        """Empacota um RandomForest/ExtraTrees (classificação binária ou regressão) ou GradientBoostingRegressor."""
+        model = _unwrap(model)
+        estimators = getattr(model, "estimators_", None)
+        if estimators is None:
+            raise TypeError(f"Modelo sem árvores ajustadas: {type(model).__name__}")
+
+        is_boosting = isinstance(estimators, np.ndarray) and estimators.ndim == 2
+        kind = "classifier" if hasattr(model, "classes_") else "regressor"
+        if is_boosting:
+            if kind == "classifier" or estimators.shape[1] != 1:
+                raise TypeError("Gradient Boosting suportado apenas para regressão")
+            trees = [row[0].tree_ for row in estimators]
+            scale = float(model.learning_rate)
+            init = model.init_
+            bias = 0.0 if init == "zero" else float(np.ravel(init.predict(np.zeros((1, model.n_features_in_))))[0])
+        else:
+            trees = [estimator.tree_ for estimator in estimators]
+            scale = 1.0 / len(trees)
+            bias = 0.0
+        if kind == "classifier" and len(model.classes_) != 2:
+            raise TypeError("Apenas classificação binária é suportada")
+
+        roots, features, thresholds, lefts, rights, values, covers = [], [], [], [], [], [], []
+        offset = 0
+        for tree in trees:
+            n_nodes = tree.node_count
+            roots.append(offset)
+            left = tree.children_left.astype(np.int32)
+            right = tree.children_right.astype(np.int32)
+            is_leaf = left == -1
+            lefts.append(np.where(is_leaf, -1, left + offset))
+            rights.append(np.where(is_leaf, -1, right + offset))
+            features.append(np.where(is_leaf, -1, tree.feature))
+            thresholds.append(tree.threshold)
+            node_values = tree.value[:, 0, :]
+            if kind == "classifier":
+                # Só a fração da classe positiva é necessária
+                node_values = node_values[:, 1] / node_values.sum(axis=1)
+            else:
+                node_values = node_values[:, 0]
+            values.append(node_values)
+            covers.append(tree.weighted_n_node_samples)
+            offset += n_nodes
+
+        arrays = {
+            "roots": np.asarray(roots, dtype=np.int32),
+            "feature": np.concatenate(features).astype(np.int32),
+            "threshold": np.concatenate(thresholds).astype(np.float32),
+            "left": np.concatenate(lefts).astype(np.int32),
+            "right": np.concatenate(rights).astype(np.int32),
+            "value": np.concatenate(values).astype(np.float32),
+            "cover": np.concatenate(covers).astype(np.float32),
+        }
+        meta = {
+            "kind": kind,
+            "estimator": type(model).__name__,
+            "n_trees": len(trees),
+            "n_nodes": int(offset),
+            "n_features": int(model.n_features_in_),
+            "max_depth": int(max(tree.max_depth for tree in trees)),
+            "scale": scale,
+            "bias": bias,
+        }
+        if kind == "classifier":
+            meta["classes"] = np.asarray(model.classes_).tolist()
+        return cls(arrays, meta)
+
+    # ------------------------------------------------------------------
+    # Persistência
+    # ------------------------------------------------------------------
+    def save(self, directory):
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            np.save(directory / f"{name}.npy", getattr(self, name))
+        (directory / "meta.json").write_text(json.dumps(self.meta, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    @classmethod
+    def load(cls, directory, mmap=True, source_path=None):
+        """Carrega os arrays (mapeados em memória por padrão)."""
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode="r" if mmap else None) for name in ARRAYS}
+        return cls(arrays, meta, source_path=source_path)
+
+    # ------------------------------------------------------------------
+    # Inferência
+    # ------------------------------------------------------------------
+    def _leaves(self, X, roots=None):
+        """Índice da folha de cada (linha, árvore): N×T (ou só das árvores de `roots`)."""
+        roots = self.roots if roots is None else roots
+        n_rows = X.shape[0]
+        rows = np.arange(n_rows)[:, None]
+        node = np.broadcast_to(roots, (n_rows, len(roots))).copy()
+        for _ in range(self.max_depth):
+            feature = self.feature[node]
+            internal = feature >= 0
+            if not internal.any():
+                break
+            go_left = X[rows, np.where(internal, feature, 0)] <= self.threshold[node]
+            child = np.where(go_left, self.left[node], self.right[node])
+            node = np.where(internal, child, node)
+        return node
+
+    def _delegate(self, n_rows):
+        """Modelo original para lotes grandes (None se o compacto deve ser usado)."""
+        if self.max_packed_rows is None or self.source_path is None or n_rows <= self.max_packed_rows:
+            return None
+        if self._original is None:
+            self._original = _unwrap(joblib.load(self.source_path))
+        return self._original
+
+    def _raw_predict(self, X):
+        original = self._delegate(X.shape[0])
+        if original is not None:
+            if self.kind == "classifier":
+                return original.predict_proba(X)[:, 1]
+            return np.ravel(original.predict(X))
+        X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+        X = X.astype(np.float32, copy=False)
+        output = np.empty(X.shape[0])
+        # Em blocos, para limitar a matriz N×T de nós em memória
+        for start in range(0, X.shape[0], ROWS_PER_BLOCK):
+            block = X[start:start + ROWS_PER_BLOCK]
+            output[start:start + len(block)] = self.value[self._leaves(block)].sum(axis=1, dtype=np.float64)
+        return self.bias + self.scale * output
+
+    def tree_outputs(self, X, start, stop):
+        """
+        Saída individual das árvores start..stop-1 (probabilidade da classe
+        positiva ou valor da regressão), N×k. Usado na avaliação com parada
+        antecipada (early_exit.py); só faz sentido para florestas (média).
+        """
+        X = X.toarray() if hasattr(X, "toarray") else np.asarray(X)
+        X = X.astype(np.float32, copy=False)
+        return np.asarray(self.value[self._leaves(X, self.roots[start:stop])], dtype=np.float64)
+
+    def predict_proba(self, X):
+        if self.kind != "classifier":
+            raise AttributeError("predict_proba disponível apenas para classificadores")
+        positive = np.clip(self._raw_predict(X), 0.0, 1.0)
+        return np.column_stack([1.0 - positive, positive])
+
+    def predict(self, X):
+        if self.kind == "classifier":
+            return self.classes_[(self.predict_proba(X)[:, 1] > 0.5).astype(int)]
+        return self._raw_predict(X)
+
+    # ------------------------------------------------------------------
+    # Explicação
+    # ------------------------------------------------------------------
+    def shap_model(self):
+        """Árvores no formato de dicionário aceito pelo shap.TreeExplainer."""
+        trees = []
+        ends = np.append(self.roots[1:], len(self.feature))
+        for start, end in zip(self.roots, ends):
+            left = np.asarray(self.left[start:end])
+            right = np.asarray(self.right[start:end])
+            is_leaf = left == -1
+            trees.append({
+                "children_left": np.where(is_leaf, -1, left - start).astype(np.int32),
+                "children_right": np.where(is_leaf, -1, right - start).astype(np.int32),
+                "children_default": np.where(is_leaf, -1, left - start).astype(np.int32),
+                "features": np.where(is_leaf, -2, self.feature[start:end]).astype(np.int32),
+                "thresholds": np.asarray(self.threshold[start:end], dtype=np.float64),
+                "values": (np.asarray(self.value[start:end], dtype=np.float64) * self.scale).reshape(-1, 1),
+                "node_sample_weight": np.asarray(self.cover[start:end], dtype=np.float64),
+            })
+        return {
+            "trees": trees,
+            "base_offset": self.bias,
+            "tree_output": "probability" if self.kind == "classifier" else "raw_value",
+            "objective": "binary_crossentropy" if self.kind == "classifier" else "squared_error",
+            "input_dtype": np.float32,
+        }
+
+
+def _matches_source(forest, model_path):
+    """O .packed foi exportado deste .pkl? (hash só se tamanho/mtime mudaram)"""
+    if forest.meta.get("source_signature") == _source_signature(model_path):
+        return True
+    return forest.source_digest == _digest(model_path)
+
+
+def load_model(model_path):
+    """
+    Carrega o formato compacto se existir ao lado do .pkl e tiver sido
+    exportado deste mesmo .pkl (source_digest); senão, o pickle. Um .packed
+    antigo deixado por um retreino é ignorado com um aviso.
+    """
+    packed = packed_path(model_path)
+    if (packed / "meta.json").exists():
+        if not Path(model_path).exists():
+            return PackedForest.load(packed)
+        forest = PackedForest.load(packed, source_path=model_path)
+        if _matches_source(forest, model_path):
+            return forest
+        print(f"⚠️ {packed.name} não corresponde ao {Path(model_path).name} atual "
+              f"(retreinado depois do export); usando o pickle.", file=sys.stderr)
+    return joblib.load(model_path)
+
+
+def max_deviation(original, packed, X):
+    """Maior |diferença| entre o modelo original e o compacto em X."""
+    if packed.kind == "classifier":
+        return float(np.max(np.abs(original.predict_proba(X)[:, 1] - packed.predict_proba(X)[:, 1])))
+    return float(np.max(np.abs(np.ravel(original.predict(X)) - packed.predict(X))))
+
+
+def _best_ms(fn, X, repeats):
+    fn(X)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return float(min(timings) * 1000)
+
+
+def measure_latency(original, packed, X, rows=LATENCY_ROWS, repeats=5):
+    """Latência (ms) do modelo original e do compacto para cada tamanho de lote."""
+    original_fn = original.predict_proba if packed.kind == "classifier" else original.predict
+    X = np.asarray(X.toarray() if hasattr(X, "toarray") else X)
+    latency = {}
+    for n_rows in rows:
+        block = X[np.arange(n_rows) % len(X)]
+        latency[str(n_rows)] = {
+            "original": _best_ms(original_fn, block, repeats),
+            "packed": _best_ms(packed._raw_predict, block, repeats),
+        }
+    return latency
+
+
+def max_packed_rows(latency):
+    """Maior lote (a partir de 1 linha) em que o compacto não é mais lento; None se nenhum."""
+    best = None
+    for n_rows, timing in sorted(latency.items(), key=lambda item: int(item[0])):
+        if timing["packed"] > timing["original"]:
+            break
+        best = int(n_rows)
+    return best
+
+
+def export(model_path, X_check, output_dir=None, tolerance=None):
+    """
+    Empacota o modelo, mede o desvio e a latência em X_check e grava o
+    diretório .packed. Levanta ValueError se o desvio passar da tolerância
+    ou se o compacto for mais lento que o original já com uma linha.
+    """
+    model = joblib.load(model_path)
+    packed = PackedForest.from_estimator(model)
+    deviation = max_deviation(model, packed, X_check)
+    tolerance = DEFAULT_TOLERANCE[packed.kind] if tolerance is None else tolerance
+    if deviation > tolerance:
+        raise ValueError(f"Desvio máximo {deviation:.3g} acima da tolerância {tolerance:.3g}")
+    latency = measure_latency(model, packed, X_check)
+    packed_rows = max_packed_rows(latency)
+    if packed_rows is None:
+        raise ValueError(
+            f"Formato compacto mais lento que o original com 1 linha "
+            f"({latency['1']['packed']:.2f} ms x {latency['1']['original']:.2f} ms)"
+        )
+    packed.meta.update({
+        "latency_ms": latency,
+        "max_packed_rows": packed_rows,
+        "source": Path(model_path).name,
+        "source_signature": _source_signature(model_path),
+        "source_digest": _digest(model_path),
+        "max_abs_deviation": deviation,
+        "tolerance": tolerance,
+        "checked_rows": int(X_check.shape[0]),
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    })
+    packed.source_digest = packed.meta["source_digest"]
+    packed.max_packed_rows = packed_rows
+    packed.source_path = Path(model_path)
+    packed.save(output_dir or packed_path(model_path))
+    return packed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta um ensemble de árvores para o formato compacto float32/int32")
+    parser.add_argument("model", type=Path, help="Arquivo .pkl do modelo")
+    parser.add_argument("--preprocessor", type=Path, required=True, help="Pré-processador usado no treino")
+    parser.add_argument("--data", type=Path, required=True, help="CSV usado para medir o desvio")
+    parser.add_argument("--output", type=Path, help="Diretório de saída (padrão: <modelo>.packed)")
+    parser.add_argument("--tolerance", type=float, help="Desvio máximo aceito")
+    args = parser.parse_args()
+
+    preprocessor = joblib.load(args.preprocessor)
+    df = pd.read_csv(args.data)
+    X_check = preprocessor.transform(df[list(preprocessor.feature_names_in_)])
+    try:
+        packed = export(args.model, X_check, output_dir=args.output, tolerance=args.tolerance)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+    meta = packed.meta
+    print(f"✅ {meta['n_trees']} árvores / {meta['n_nodes']} nós exportados para {args.output or packed_path(args.model)}")
+    print(f"   Desvio máximo em {meta['checked_rows']} linhas: {meta['max_abs_deviation']:.3g}")
+    for n_rows, timing in meta["latency_ms"].items():
+        print(f"   {int(n_rows):5d} linhas: compacto {timing['packed']:.2f} ms | original {timing['original']:.2f} ms")
+    print(f"   Lotes acima de {meta['max_packed_rows']} linhas usam o pickle original")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# =============================================================================
+# ARQUIVO: src/models/percentile_index.py
+# OBJETIVO: Percentil de uma nota/probabilidade em relação a uma distribuição
+#           de referência (dados de treino ou a última pontuação completa).
+#           - A referência fica ordenada, com um peso por ponto (quantas
+#             predições ele representa) e a soma acumulada dos pesos; o
+#             percentil de um lote é uma busca binária por valor
+#             (np.searchsorted, O(log n)), com ranking médio nos empates.
+#           - Predições novas entram em um buffer com peso 1; a cada
+#             `merge_every` o buffer é ordenado e intercalado na referência
+#             em O(n + k), sem reordenar tudo.
+#           - Acima de `max_size` a referência é resumida em `max_size // 2`
+#             quantis de mesmo peso, tomados sobre o peso acumulado. O peso
+#             total não muda, então dados antigos e novos continuam contando
+#             pelo número de predições e a referência não se desloca para o
+#             tráfego recente.
+#           Cada serviço (uma versão de modelo) mantém o seu índice.
+# =============================================================================
+
+import threading
+
+import numpy as np
+
+
+class PercentileIndex:
+    def __init__(self, values=(), merge_every=1024, max_size=200_000):
+        self.merge_every = merge_every
+        self.max_size = max_size
+        self._reference = self._build(np.sort(np.asarray(values, dtype=float)))
+        self._pending = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _build(values, weights=None):
+        """(valores, pesos, pesos acumulados com 0 à esquerda)."""
+        weights = np.ones(len(values)) if weights is None else weights
+        return values, weights, np.concatenate(([0.0], np.cumsum(weights)))
+
+    def __len__(self):
+        return len(self._reference[0])
+
+    def percentile(self, values):
+        """Percentil (0-100) de cada valor; None se a referência estiver vazia."""
+        reference, _, cumulative = self._reference  # leitura única: trocas são atômicas
+        values = np.asarray(values, dtype=float)
+        if not len(reference):
+            return [None] * len(values)
+        below = cumulative[np.searchsorted(reference, values, side="left")]
+        up_to = cumulative[np.searchsorted(reference, values, side="right")]
+        return (100.0 * (below + up_to) / (2 * cumulative[-1])).tolist()
+
+    def record(self, values):
+        """Acrescenta predições; a intercalação acontece a cada `merge_every`."""
+        with self._lock:
+            self._pending.extend(float(v) for v in values)
+            if len(self._pending) >= self.merge_every:
+                self._merge()
+
+    def flush(self):
+        """Intercala já as predições pendentes."""
+        with self._lock:
+            if self._pending:
+                self._merge()
+
+    def rebuild(self, values):
+        """Substitui a referência (ex.: por uma pontuação completa mais recente)."""
+        reference = self._build(np.sort(np.asarray(values, dtype=float)))
+        with self._lock:
+            self._pending = []
+            self._reference = reference
+
+    def _merge(self):
+        values, weights, _ = self._reference
+        new = np.sort(np.asarray(self._pending, dtype=float))
+        positions = np.searchsorted(values, new)
+        values = np.insert(values, positions, new)
+        weights = np.insert(weights, positions, np.ones(len(new)))
+        if len(values) > self.max_size:
+            values, weights = self._compact(values, weights, max(self.max_size // 2, 1))
+        self._reference = self._build(values, weights)
+        self._pending = []
+
+    @staticmethod
+    def _compact(values, weights, size):
+        """`size` quantis de mesmo peso (o peso total se mantém)."""
+        cumulative = np.cumsum(weights)
+        targets = (np.arange(size) + 0.5) * cumulative[-1] / size
+        positions = np.minimum(np.searchsorted(cumulative, targets), len(values) - 1)
+        return values[positions], np.full(size, cumulative[-1] / size)
+
+    def state(self):
+        _, _, cumulative = self._reference
+        return {"size": len(self), "weight": int(round(cumulative[-1])), "pending": len(self._pending)}
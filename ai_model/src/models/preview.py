@@ -1,6 +1,15 @@
+import time
+from pathlib import Path
+
 import pandas as pd
 import joblib
-import shap
+
+from src.datasets.storage import load_dataset
+from src.models.explanation import ExplanationSession, SampledShap
+from src.models.packed_forest import load_model
+from src.models.early_exit import early_exit_proba
+from src.models.global_importance import GlobalImportanceStore, TRAINING_COHORT, file_digest
+from src.models.percentile_index import PercentileIndex
 
 class PredictionService:
     """
@@ -10,9 +19,22 @@ class PredictionService:
         print("Iniciando PredictionService...")
         self.preprocessor = None
         self.models = {}
-        self.explainers = {}
+        self.explanations = {}
+        self.X_train_ref = None
         self.X_train_proc = None
         self.feature_names = None
+        self.model_versions = {}
+        # Modelo usado nas respostas da API
+        self.report_model = 'Random Forest'
+        # Nível 'approx': orçamento de avaliações do SHAP amostrado (None = mínimo 2·d + 1)
+        self.approx_max_evals = None
+        self.sampled_explainer = None
+        # Parada antecipada da floresta quando só a decisão/categoria é pedida
+        self.early_exit_confidence = 0.95
+        # Posição da nota prevista em relação às notas previstas do treino
+        self.percentile_index = None
+        # Importância global gravada junto dos pipelines, por versão do modelo
+        self.importance_store = GlobalImportanceStore(Path(rf_path).parent / "global_importance")
         self._load_artifacts(preprocessor_path, logreg_path, rf_path, data_path)
 
     def _load_artifacts(self, preprocessor_path, logreg_path, rf_path, data_path):
@@ -21,79 +43,219 @@ class PredictionService:
         """
         try:
             self.preprocessor = joblib.load(preprocessor_path)
-            self.models = {
-                'Regressão Logística': joblib.load(logreg_path),
-                'Random Forest': joblib.load(rf_path)
+            model_paths = {
+                'Regressão Logística': logreg_path,
+                'Random Forest': rf_path
+            }
+            # Ensembles exportados por packed_forest.py são carregados no formato compacto
+            self.models = {name: load_model(path) for name, path in model_paths.items()}
+            self.model_versions = {
+                name: getattr(self.models[name], 'source_digest', None) or file_digest(path)
+                for name, path in model_paths.items()
             }
-            df_train = pd.read_csv(data_path)
-            X_train_ref = df_train.drop('Exam_Score', axis=1)
+            # Lê apenas as colunas que o pré-processador espera (projeção colunar)
+            columns = getattr(self.preprocessor, 'feature_names_in_', None)
+            if columns is not None:
+                X_train_ref = load_dataset(data_path, columns=columns)
+            else:
+                X_train_ref = load_dataset(data_path).drop('Exam_Score', axis=1)
             
             print("Pré-processando dados de referência para o SHAP...")
+            self.X_train_ref = X_train_ref
             self.X_train_proc = self.preprocessor.transform(X_train_ref)
             self.feature_names = self.preprocessor.get_feature_names_out()
             
             print("Pré-calculando os explainers SHAP...")
-            self.explainers = {
-                name: shap.Explainer(model, self.X_train_proc)
+            self.explanations = {
+                name: ExplanationSession(model, self.X_train_proc, self.feature_names, source_columns=columns)
                 for name, model in self.models.items()
             }
+            report_model = self.models[self.report_model]
+            self.percentile_index = PercentileIndex(report_model.predict_proba(self.X_train_proc)[:, 1] * 100)
+            self.sampled_explainer = SampledShap(
+                lambda X: report_model.predict_proba(X)[:, 1],
+                self.X_train_proc,
+                max_evals=self.approx_max_evals
+            )
             print("OK - Todos os artefatos foram carregados e pré-calculados com sucesso.")
         except FileNotFoundError as e:
             print(f"ERRO CRITICO ao carregar artefatos: {e}")
             raise
 
-    def generate_report(self, student_data: dict, top_n=3):
+    def warm_up(self, tiers=("exact", "approx", "fast")):
+        """
+        Uma explicação de cada nível com uma linha do treino, para que a
+        primeira requisição após a carga (ou troca de versão) não pague a
+        inicialização do SHAP (o 'approx' compila o Permutation na 1ª chamada).
+        """
+        sample = self.X_train_ref.head(1).to_dict("records")
+        for tier in tiers:
+            self.generate_reports(sample, tier=tier)
+
+    def generate_report(self, student_data: dict, top_n=3, tier="exact"):
         """
         Gera um relatório completo para os dados de um aluno no formato de API especificado.
         """
-        df_student = pd.DataFrame([student_data])
-        processed_student_data = self.preprocessor.transform(df_student)
+        return self.generate_reports([student_data], top_n=top_n, tier=tier)[0]
+
+    def generate_reports(self, students: list, top_n=3, tier="exact"):
+        """
+        Gera os relatórios de um lote de alunos (ex.: uma turma inteira) com
+        uma única transformação, predição e cálculo SHAP para o lote.
+        O nível de explicação (none/fast/approx/exact) e o seu custo vão em
+        report["explanation"].
+        """
+        processed_students, reports = self.score_students(students)
         
-        # Vamos usar o modelo 'Random Forest' para a resposta final.
-        model_name = 'Random Forest'
-        model = self.models[model_name]
+        # Explicação (top-N por aluno em uma operação vetorizada)
+        explanations, cost = self.explain_students(processed_students, students, top_n=top_n, tier=tier)
+        for report, explanation_list in zip(reports, explanations):
+            report["factors"] = explanation_list  # Fatores que influenciam a predição
+            report["explanation"] = cost
         
-        # Previsão
-        prediction_code = int(model.predict(processed_student_data)[0])
-        probability = float(model.predict_proba(processed_student_data)[0][1]) # Probabilidade de ser classe 1 (APROVADO)
+        return reports
+
+    def score_students(self, students: list):
+        """
+        Apenas a predição (sem SHAP). Retorna os dados processados, para
+        reaproveitar na explicação, e os relatórios sem os fatores.
+        """
+        processed_students = self.preprocessor.transform(self._frame(students))
         
-        # Explicação com SHAP
-        explainer = self.explainers[model_name]
-        shap_values = explainer(processed_student_data)
+        # Vamos usar o modelo 'Random Forest' para a resposta final.
+        model = self.models[self.report_model]
         
-        try:
-            shap_values_for_positive_class = shap_values.values[0, :, 1]
-        except IndexError:
-            shap_values_for_positive_class = shap_values.values[0]
-
-        feature_impacts = pd.DataFrame(
-            list(zip(self.feature_names, shap_values_for_positive_class)),
-            columns=['feature', 'shap_value']
-        ).sort_values(by='shap_value', key=abs, ascending=False).head(top_n)
-
-        explanation_list = []
-        for _, row in feature_impacts.iterrows():
-            feature_part = row['feature'].split('__')[1]
-            original_feature_name = next((col for col in student_data if feature_part.startswith(col)), feature_part)
-            feature_value = student_data.get(original_feature_name, 'N/A')
-            influence = "positiva" if row['shap_value'] > 0 else "negativa"
-            explanation_list.append({"feature": original_feature_name, "value": feature_value, "influence": influence})
+        # Previsão: probabilidade de ser classe 1 (APROVADO)
+        probabilities = model.predict_proba(processed_students)[:, 1]
         
-        # --- MUDANÇA PRINCIPAL: Monta o dicionário de resposta com as chaves corretas ---
-        predicted_score = float(probability * 100)  # Score de 0-100
-        is_approved = predicted_score >= 60.0  # Nota de corte para aprovação
+        # Percentil em relação à distribuição de referência (busca binária)
+        percentiles = self.percentile_index.percentile(probabilities * 100)
         
-        api_response = {
-            "predicted_score": predicted_score,  # Score de 0-100
-            "confidence": float(probability),  # Confiança de 0-1
-            "is_approved": is_approved,  # True se aprovado, False se reprovado
-            "approval_status": "APROVADO" if is_approved else "REPROVADO",
-            "grade_category": self._get_grade_category(predicted_score),
-            "factors": explanation_list  # Fatores que influenciam a predição
-        }
+        reports = []
+        for probability, percentile in zip(probabilities, percentiles):
+            predicted_score = float(probability * 100)  # Score de 0-100
+            is_approved = predicted_score >= 60.0  # Nota de corte para aprovação
+            reports.append({
+                "predicted_score": predicted_score,  # Score de 0-100
+                "confidence": float(probability),  # Confiança de 0-1
+                "is_approved": is_approved,  # True se aprovado, False se reprovado
+                "approval_status": "APROVADO" if is_approved else "REPROVADO",
+                "grade_category": self._get_grade_category(predicted_score),
+                "percentile": percentile  # % da referência com nota menor (0-100)
+            })
         
-        return api_response
+        return processed_students, reports
+
+    def explain_students(self, processed_students, students: list, top_n=3, tier="exact"):
+        """
+        Fatores de cada aluno de um lote já processado, no nível pedido:
+          - none: sem fatores;
+          - fast: contribuições por caminho (Saabas) das árvores do modelo da resposta;
+          - approx: SHAP por permutação com orçamento fixo de avaliações;
+          - exact: SHAP completo do modelo da resposta.
+
+        Returns:
+            tuple: (lista de fatores por aluno, custo {tier, duration_ms, model_evaluations}).
+        """
+        started = time.perf_counter()
+        session = self.explanations[self.report_model]
+        model_evaluations = 0
+        if tier == "none":
+            explanations = [[] for _ in students]
+        elif tier == "fast":
+            values = session.shap_values(processed_students, approximate=True)
+            explanations = session.factors(values, students, top_n=top_n)
+            model_evaluations = None
+        elif tier == "approx":
+            values, model_evaluations = self.sampled_explainer.shap_values(processed_students)
+            explanations = session.factors(values, students, top_n=top_n)
+        elif tier == "exact":
+            explanations = session.explain(processed_students, students, top_n=top_n)
+            # O TreeExplainer percorre as árvores; não há contagem de avaliações
+            model_evaluations = None
+        else:
+            raise ValueError(f"Nível de explicação inválido: {tier}")
+        cost = {
+            "tier": tier,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+            "model_evaluations": model_evaluations
+        }
+        return explanations, cost
     
+    def approval_probabilities(self, students):
+        """Probabilidade de aprovação de um lote (lista ou DataFrame), sem relatórios."""
+        processed_students = self.preprocessor.transform(self._frame(students))
+        return self.models[self.report_model].predict_proba(processed_students)[:, 1]
+
+    def simulate_student(self, base: dict, overrides: list):
+        """
+        Cenários "e se" de um aluno: a linha base e uma linha por dicionário
+        de `overrides`, pontuadas em uma única transformação e predição (sem
+        SHAP). Retorna os relatórios da base e de cada variante.
+        """
+        rows = [base] + [{**base, **override} for override in overrides]
+        _, reports = self.score_students(rows)
+        return reports[0], reports[1:]
+
+    def decide_students(self, students: list, level="decision"):
+        """
+        Só a decisão (aprovado/reprovado) ou também a categoria, avaliando a
+        floresta com parada antecipada: cada aluno usa apenas as árvores
+        necessárias para situar a nota em relação aos cortes com a confiança
+        `early_exit_confidence`. Alunos próximos de um corte usam todas.
+        """
+        processed_students = self.preprocessor.transform(self._frame(students))
+        cutoffs = [60.0] if level == "decision" else [60.0, 70.0, 80.0, 90.0]
+        probabilities, trees_used, total = early_exit_proba(
+            self.models[self.report_model],
+            processed_students,
+            [cutoff / 100 for cutoff in cutoffs],
+            confidence=self.early_exit_confidence
+        )
+        
+        results = []
+        for probability, used in zip(probabilities, trees_used):
+            is_approved = probability * 100 >= 60.0
+            result = {
+                "is_approved": bool(is_approved),
+                "approval_status": "APROVADO" if is_approved else "REPROVADO",
+                "trees_used": int(used),
+                "n_trees": int(total)
+            }
+            if level == "category":
+                result["grade_category"] = self._get_grade_category(float(probability * 100))
+            results.append(result)
+        return results
+
+    def compute_global_importance(self, model_name='Random Forest', students=None,
+                                  cohort=TRAINING_COHORT, force=False):
+        """
+        Calcula (ou reaproveita) a importância global das features para o
+        dataset de treino ou para uma coorte enviada (lista de alunos).
+        """
+        if students is None:
+            df_cohort, X_processed = self.X_train_ref, self.X_train_proc
+        else:
+            df_cohort = self._frame(students)
+            X_processed = self.preprocessor.transform(df_cohort)
+        return self.importance_store.compute(
+            self.explanations[model_name], model_name, self.model_versions[model_name],
+            X_processed, df_cohort, cohort=cohort, force=force
+        )
+
+    def get_global_importance(self, model_name='Random Forest', cohort=TRAINING_COHORT):
+        """Resultado já calculado para a versão atual do modelo (ou None)."""
+        return self.importance_store.get(model_name, self.model_versions[model_name], cohort)
+
+    def _frame(self, students: list):
+        """
+        Alunos como DataFrame com apenas as colunas que o pré-processador usa:
+        campos removidos por feature_pruning.py continuam aceitos e são ignorados.
+        """
+        df_students = pd.DataFrame(students)
+        columns = getattr(self.preprocessor, 'feature_names_in_', None)
+        return df_students[list(columns)] if columns is not None else df_students
+
     def _get_grade_category(self, score: float) -> str:
         """
         Categoriza a nota em faixas de desempenho.
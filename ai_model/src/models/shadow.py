@@ -0,0 +1,140 @@
+# =============================================================================
+# ARQUIVO: src/models/shadow.py
+# OBJETIVO: Avaliação "sombra" de um modelo candidato com tráfego real.
+#           - Uma amostra das requisições é reavaliada pelo candidato depois
+#             que a resposta principal já foi enviada, em um executor próprio
+#             de baixa prioridade (a latência principal não muda).
+#           - Guarda um resumo móvel: diferença de score, inversões de
+#             aprovação em torno do corte de 60 e latência dos dois modelos.
+# =============================================================================
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+APPROVAL_CUTOFF = 60.0
+
+
+def _lower_thread_priority():
+    # No Linux a prioridade (nice) vale por thread; em outros sistemas é ignorada
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 10)
+    except (AttributeError, OSError):
+        pass
+
+
+class ShadowEvaluator:
+    """
+    Compara o modelo principal com um candidato em uma amostra do tráfego.
+
+    Args:
+        sample_rate: Fração das requisições reavaliadas (0-1).
+        window: Número de observações do resumo móvel.
+        max_pending: Limite de avaliações na fila; acima dele a amostra é descartada.
+    """
+    def __init__(self, sample_rate=0.1, window=1000, max_pending=100, cutoff=APPROVAL_CUTOFF):
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.cutoff = cutoff
+        self.candidate = None  # (versão, serviço)
+        self._observations = deque(maxlen=window)
+        self._counters = {"sampled": 0, "dropped": 0, "errors": 0}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="shadow", initializer=_lower_thread_priority
+        )
+
+    def set_candidate(self, version, service):
+        """Troca o candidato e reinicia o resumo."""
+        with self._lock:
+            self.candidate = (version, service)
+            self._observations.clear()
+            self._counters = {"sampled": 0, "dropped": 0, "errors": 0}
+
+    def clear_candidate(self):
+        self.candidate = None
+
+    def observe(self, students, primary_reports, primary_latency_ms):
+        """
+        Chamado após o envio da resposta principal: sorteia a amostra e
+        agenda a avaliação do candidato sem esperar por ela.
+        """
+        candidate = self.candidate
+        if candidate is None or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["dropped"] += 1
+                return
+            self._pending += 1
+            self._counters["sampled"] += 1
+        primary_scores = [report["predicted_score"] for report in primary_reports]
+        self._executor.submit(self._evaluate, candidate, students, primary_scores, primary_latency_ms)
+
+    def _evaluate(self, candidate, students, primary_scores, primary_latency_ms):
+        version, service = candidate
+        try:
+            started = time.perf_counter()
+            _, reports = service.score_students(students)
+            candidate_latency_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                # O candidato pode ter sido trocado enquanto esta avaliação rodava
+                if self.candidate is not candidate:
+                    return
+                for primary, report in zip(primary_scores, reports):
+                    self._observations.append((
+                        report["predicted_score"] - primary,
+                        primary >= self.cutoff,
+                        report["predicted_score"] >= self.cutoff,
+                        primary_latency_ms,
+                        candidate_latency_ms
+                    ))
+        except Exception:
+            with self._lock:
+                self._counters["errors"] += 1
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def summary(self):
+        """Resumo móvel das últimas observações."""
+        with self._lock:
+            observations = list(self._observations)
+            counters = dict(self._counters)
+            pending = self._pending
+        summary = {
+            "candidate_version": self.candidate[0] if self.candidate else None,
+            "sample_rate": self.sample_rate,
+            "n_observations": len(observations),
+            "pending": pending,
+            **counters
+        }
+        if not observations:
+            return summary
+
+        diff, primary_ok, candidate_ok, primary_ms, candidate_ms = (np.asarray(col) for col in zip(*observations))
+        summary.update({
+            "score_diff": {
+                "mean": float(diff.mean()),
+                "mean_abs": float(np.abs(diff).mean()),
+                "max_abs": float(np.abs(diff).max()),
+            },
+            "approval_flips": {
+                "rate": float((primary_ok != candidate_ok).mean()),
+                "approved_to_failed": int((primary_ok & ~candidate_ok).sum()),
+                "failed_to_approved": int((~primary_ok & candidate_ok).sum()),
+            },
+            "latency_ms": {
+                "primary_p50": float(np.percentile(primary_ms, 50)),
+                "primary_p95": float(np.percentile(primary_ms, 95)),
+                "candidate_p50": float(np.percentile(candidate_ms, 50)),
+                "candidate_p95": float(np.percentile(candidate_ms, 95)),
+            },
+        })
+        return summary
@@ -0,0 +1,121 @@
+# =============================================================================
+# ARQUIVO: src/models/thread_budget.py
+# OBJETIVO: Orçamento de threads por processo (OpenMP/BLAS/joblib).
+#           - Os núcleos disponíveis (afinidade e cota do cgroup) são
+#             divididos entre os processos do servidor (SERVER_WORKERS ou
+#             WEB_CONCURRENCY); THREADS_PER_WORKER fixa o valor manualmente.
+#           - As variáveis de ambiente das bibliotecas nativas são definidas
+#             antes da importação do NumPy; se já estiverem carregadas, os
+#             pools são limitados com threadpoolctl (quando instalado).
+#           - LOKY_MAX_CPU_COUNT faz o `n_jobs=-1` do scikit-learn/joblib
+#             respeitar o mesmo limite.
+#           Deve ser chamado no início dos scripts de treino e da API.
+# =============================================================================
+
+import os
+import sys
+
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "LOKY_MAX_CPU_COUNT",
+)
+
+_applied = {}
+
+
+def available_cores() -> int:
+    """Núcleos utilizáveis pelo processo: afinidade de CPU limitada pela cota do cgroup."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # sem sched_getaffinity (ex.: macOS, Windows)
+        cores = os.cpu_count() or 1
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            cores = min(cores, max(1, int(int(quota) // int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cores)
+
+
+def _env_int(name):
+    value = os.getenv(name)
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+def thread_budget(workers=None, threads=None):
+    """
+    Threads por processo para `workers` processos na máquina.
+
+    Args:
+        workers: Processos concorrentes (padrão: SERVER_WORKERS, WEB_CONCURRENCY ou 1).
+        threads: Valor fixo (padrão: THREADS_PER_WORKER, se definido).
+
+    Returns:
+        tuple: (núcleos, processos, threads por processo)
+    """
+    cores = available_cores()
+    workers = workers or _env_int("SERVER_WORKERS") or _env_int("WEB_CONCURRENCY") or 1
+    threads = threads or _env_int("THREADS_PER_WORKER") or max(1, cores // workers)
+    return cores, workers, threads
+
+
+def apply_thread_budget(workers=None, threads=None):
+    """
+    Aplica o orçamento ao processo atual e retorna as configurações efetivas.
+    Pode ser chamado de novo (ex.: em cada processo de um pool).
+    """
+    cores, workers, threads = thread_budget(workers, threads)
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+
+    limited = False
+    if "numpy" in sys.modules:
+        # Bibliotecas nativas já carregadas: as variáveis acima não valem mais
+        try:
+            from threadpoolctl import threadpool_limits
+            threadpool_limits(limits=threads)
+            limited = True
+        except ImportError:
+            pass
+
+    _applied.clear()
+    _applied.update({
+        "cores": cores,
+        "workers": workers,
+        "threads_per_worker": threads,
+        "applied_before_numpy": not limited and "numpy" not in sys.modules,
+        "runtime_limited": limited,
+    })
+    return dict(_applied)
+
+
+def effective_settings():
+    """Configuração aplicada, variáveis de ambiente e pools nativos carregados."""
+    settings = {
+        **_applied,
+        "environment": {name: os.getenv(name) for name in THREAD_ENV_VARS},
+    }
+    try:
+        from threadpoolctl import threadpool_info
+        settings["threadpools"] = [
+            {key: info.get(key) for key in ("user_api", "internal_api", "prefix", "version", "num_threads")}
+            for info in threadpool_info()
+        ]
+    except ImportError:
+        settings["threadpools"] = None
+    try:
+        from joblib import cpu_count
+        settings["joblib_cpu_count"] = cpu_count()
+    except ImportError:
+        settings["joblib_cpu_count"] = None
+    return settings
@@ -0,0 +1,127 @@
+# =============================================================================
+# OBJETIVO: Treinar/atualizar o modelo de Regressão Linear (perf_reglin_model.pkl)
+#           de forma incremental, mantendo apenas as estatísticas suficientes
+#           (XᵀX, Xᵀy) das features codificadas.
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.trainingIncrementalLinear fit [--window-col Semestre] [--alpha 1.0]
+#   python -m src.models.trainingIncrementalLinear add novos_alunos.csv --window 2025-2
+#   python -m src.models.trainingIncrementalLinear remove-window 2023-1
+#   python -m src.models.trainingIncrementalLinear evaluate --train 2024-1 2024-2 --eval 2025-1
+# =============================================================================
+
+import argparse
+import sys
+from pathlib import Path
+
+import joblib
+import pandas as pd
+
+from src.models.incremental_linear import IncrementalLeastSquares
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATASET_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
+PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess.pkl"
+MODEL_PATH = BASE_DIR / "pipelines" / "perf_reglin_model.pkl"
+STATS_PATH = BASE_DIR / "pipelines" / "perf_reglin_stats.npz"
+TARGET = 'Exam_Score'
+CHUNK_SIZE = 10_000
+
+
+def accumulate(trainer, preprocessor, csv_path, window=None, window_col=None):
+    """Lê o CSV em blocos e acumula as estatísticas por janela."""
+    columns = list(preprocessor.feature_names_in_)
+    total = 0
+    for chunk in pd.read_csv(csv_path, chunksize=CHUNK_SIZE):
+        if window_col:
+            groups = chunk.groupby(window_col, sort=False)
+        else:
+            groups = [(window or 'default', chunk)]
+        for key, part in groups:
+            X_proc = preprocessor.transform(part[columns])
+            trainer.partial_fit(X_proc, part[TARGET].to_numpy(), window=str(key))
+        total += len(chunk)
+    return total
+
+
+def publish(trainer):
+    """Resolve o sistema e salva estatísticas + modelo no formato atual."""
+    model = trainer.to_estimator()
+    trainer.save(STATS_PATH)
+    joblib.dump(model, MODEL_PATH)
+    metrics = trainer.evaluate(model.coef_, model.intercept_)
+    print(f"🔹 RMSE (todas as janelas): {metrics['rmse']:.2f}")
+    print(f"🔸 R² (todas as janelas): {metrics['r2']:.2f}")
+    print(f"\n💾 Modelo salvo em '{MODEL_PATH}' e estatísticas em '{STATS_PATH}'")
+
+
+def load_trainer():
+    if not STATS_PATH.exists():
+        print(f"❌ Erro: estatísticas '{STATS_PATH}' não encontradas. Execute 'fit' primeiro.")
+        sys.exit(1)
+    return IncrementalLeastSquares.load(STATS_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regressão Linear incremental por estatísticas suficientes.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    fit = sub.add_parser("fit", help="Recria as estatísticas a partir de um CSV completo")
+    fit.add_argument("data", nargs="?", type=Path, default=DATASET_PATH)
+    fit.add_argument("--window-col", help="Coluna que define a janela (ex.: semestre)")
+    fit.add_argument("--alpha", type=float, default=0.0, help="Regularização Ridge (0 = mínimos quadrados)")
+
+    add = sub.add_parser("add", help="Acumula novos alunos avaliados")
+    add.add_argument("data", type=Path)
+    add.add_argument("--window", default="default")
+    add.add_argument("--window-col")
+
+    remove = sub.add_parser("remove-window", help="Remove uma coorte/janela inteira")
+    remove.add_argument("window")
+
+    evaluate = sub.add_parser("evaluate", help="Treina em algumas janelas e avalia em outras")
+    evaluate.add_argument("--train", nargs="+", help="Janelas de treino (padrão: todas)")
+    evaluate.add_argument("--eval", nargs="+", required=True, help="Janelas de avaliação")
+
+    args = parser.parse_args()
+
+    try:
+        preprocessor = joblib.load(PREPROCESSOR_PATH)
+    except FileNotFoundError:
+        print(f"❌ Erro: Pré-processador '{PREPROCESSOR_PATH}' não encontrado.")
+        sys.exit(1)
+    n_features = len(preprocessor.get_feature_names_out())
+
+    if args.command == "fit":
+        trainer = IncrementalLeastSquares(n_features, alpha=args.alpha)
+        total = accumulate(trainer, preprocessor, args.data, window_col=args.window_col)
+        print(f"✅ Estatísticas acumuladas para {total} registros em {len(trainer.windows)} janela(s).")
+        publish(trainer)
+    elif args.command == "add":
+        trainer = load_trainer()
+        total = accumulate(trainer, preprocessor, args.data, window=args.window, window_col=args.window_col)
+        print(f"✅ {total} novos registros acumulados.")
+        publish(trainer)
+    elif args.command == "remove-window":
+        trainer = load_trainer()
+        if args.window not in trainer.windows:
+            print(f"❌ Erro: janela '{args.window}' não existe. Janelas: {sorted(trainer.windows)}")
+            sys.exit(1)
+        trainer.remove_window(args.window)
+        print(f"✅ Janela '{args.window}' removida.")
+        publish(trainer)
+    else:
+        trainer = load_trainer()
+        missing = [w for w in (args.train or []) + args.eval if w not in trainer.windows]
+        if missing:
+            print(f"❌ Erro: janelas inexistentes: {missing}")
+            sys.exit(1)
+        coef, intercept = trainer.solve(args.train)
+        metrics = trainer.evaluate(coef, intercept, args.eval)
+        print("\n--- Relatório de Métricas (Regressão Linear incremental) ---")
+        print(f"Treino: {args.train or 'todas as janelas'} | Avaliação: {args.eval} ({metrics['n']:.0f} registros)")
+        print(f"🔹 RMSE: {metrics['rmse']:.2f}")
+        print(f"🔸 Coeficiente de Determinação (R²): {metrics['r2']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,9 @@
 #           e OTIMIZAR o modelo para evitar overfitting.
 # =============================================================================
 
+from thread_budget import apply_thread_budget
+apply_thread_budget(workers=1)  # antes do NumPy/scikit-learn
+
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split, GridSearchCV # <-- MUDANÇA
@@ -0,0 +1,67 @@
+#==============================================================================
+# Script para treinar/atualizar o modelo INCREMENTAL de evasão escolar
+# Objetivo: Fazer o bootstrap do modelo online a partir do xAPI_dropout.csv
+# ou aplicar um novo lote de matrículas rotuladas sem retreino completo.
+# Uso (a partir da pasta ai_model):
+#   python -m src.models.trainingOnlineDropout --bootstrap
+#   python -m src.models.trainingOnlineDropout --update novos_rotulos.csv
+#==============================================================================
+
+import argparse
+import sys
+from pathlib import Path
+
+import pandas as pd
+from sklearn.metrics import f1_score, roc_auc_score
+
+from src.datasets.storage import load_dataset
+from src.models.online_dropout import OnlineDropoutTrainer, TARGET
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DATASET_PATH = BASE_DIR / "datasets" / "xAPI_dropout.csv"
+CHECKPOINT_PATH = BASE_DIR / "pipelines" / "dropout_online_checkpoint.pkl"
+
+
+def evaluate(trainer, data):
+    """Mesmas métricas do treino em lote (trainingDropoutModel.py)."""
+    X = data.reindex(columns=trainer.preprocessor.feature_names_in_, fill_value=0)
+    y = data[TARGET].astype(int)
+    X_proc = trainer.preprocessor.transform(X)
+    y_pred = trainer.model.predict(X_proc)
+    y_proba = trainer.model.predict_proba(X_proc)[:, 1]
+    print(f"🔹 F1-Score: {f1_score(y, y_pred):.4f}")
+    if y.nunique() > 1:
+        print(f"🔸 ROC-AUC: {roc_auc_score(y, y_proba):.4f}")
+    else:
+        print("🔸 ROC-AUC: indisponível (lote com uma única classe)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modelo incremental de evasão (SGD + partial_fit).")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--bootstrap", action="store_true", help="Treino inicial a partir do xAPI_dropout.csv")
+    group.add_argument("--update", type=Path, help="CSV com novas matrículas rotuladas (coluna dropout_label)")
+    parser.add_argument("--checkpoint", type=Path, default=CHECKPOINT_PATH)
+    args = parser.parse_args()
+
+    if args.bootstrap:
+        data = load_dataset(DATASET_PATH)
+        trainer = OnlineDropoutTrainer(args.checkpoint)
+        state = trainer.bootstrap(data)
+        print(f"✅ Bootstrap concluído com {state['n_samples']} registros.")
+    else:
+        if not args.checkpoint.exists():
+            print(f"❌ Erro: checkpoint '{args.checkpoint}' não encontrado. Execute --bootstrap primeiro.")
+            sys.exit(1)
+        data = pd.read_csv(args.update)
+        trainer = OnlineDropoutTrainer.load(args.checkpoint)
+        state = trainer.update(data)
+        print(f"✅ Lote aplicado: {len(data)} registros (atualização nº {state['n_updates']}).")
+
+    print("\n--- Métricas no lote utilizado ---")
+    evaluate(trainer, data)
+    print(f"\n💾 Checkpoint salvo em '{args.checkpoint}'")
+
+
+if __name__ == "__main__":
+    main()
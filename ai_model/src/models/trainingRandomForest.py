@@ -4,11 +4,18 @@
 #           hiperparâmetros restritivos para combater o overfitting.
 # =============================================================================
 
+import json
+
+from thread_budget import apply_thread_budget
+apply_thread_budget(workers=1)  # antes do NumPy/scikit-learn
+
 import pandas as pd
 import joblib
 from sklearn.model_selection import train_test_split, GridSearchCV
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
+from sklearn.metrics import classification_report, roc_auc_score
+
+from ensemble_pruning import prune_forest
 
 class ModelTrainer:
     """
@@ -24,7 +31,7 @@ class ModelTrainer:
             print(f"❌ Erro: Pré-processador '{preprocessor_path}' não encontrado.")
             self.preprocessor = None
 
-    def train(self, data, nota_de_corte=68):
+    def train(self, data, nota_de_corte=68, prune=True):
         if self.preprocessor is None:
             return
 
@@ -73,6 +80,10 @@ class ModelTrainer:
         
         # 4. Salvar o MODELO
         self._save_model()
+
+        # 5. Poda gulosa: menos árvores com ROC-AUC praticamente igual
+        if prune:
+            self._prune_model(X_test_proc, y_test)
         
     def _evaluate(self, X_test_proc, y_test):
         y_pred = self.model.predict(X_test_proc)
@@ -83,6 +94,18 @@ class ModelTrainer:
         joblib.dump(self.model, '../pipelines/perf_rf_model.pkl')
         print("\n💾 Modelo RandomForestClassifier otimizado salvo com sucesso em '../pipelines/perf_rf_model.pkl'!")
 
+    def _prune_model(self, X_test_proc, y_test):
+        pruned, report = prune_forest(self.model, X_test_proc, y_test, roc_auc_score)
+        joblib.dump(pruned, '../pipelines/perf_rf_model.pruned.pkl')
+        with open('../pipelines/perf_rf_model.pruning.json', 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+        latency = report['latency_ms']
+        print(f"\n✂️ Floresta podada: {report['n_trees_pruned']} de {report['n_trees_full']} árvores")
+        print(f"   ROC-AUC (metade de controle): {report['holdout']['full']:.4f} -> {report['holdout']['pruned']:.4f}")
+        print(f"   Latência do lote: {latency['full_batch']:.1f} ms -> {latency['pruned_batch']:.1f} ms")
+        print("💾 Modelo podado salvo em '../pipelines/perf_rf_model.pruned.pkl' (relatório: perf_rf_model.pruning.json)")
+
 def load_data(filepath):
     try:
         df = pd.read_csv(filepath)
@@ -1,17 +1,30 @@
 # =============================================================================
 # OBJETIVO: Criar, treinar e salvar o pipeline de pré-processamento.
+#           --encoding onehot (padrão): uma coluna indicadora por categoria.
+#           --encoding ordinal: um código por coluna categórica (matriz mais
+#           estreita; as árvores dividem o código como número). Salvo à parte
+#           (perf_preprocess_ordinal.pkl), só para comparação offline: os
+#           modelos servidos carregam o one-hot.
 # =============================================================================
 
+import argparse
+
 import pandas as pd
 import joblib
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 
 # --- CONFIGURAÇÕES ---
 DATASET_PATH = '../datasets/StudentPerformanceFactors.csv'
 PREPROCESSOR_PATH = '../pipelines/perf_preprocess.pkl'
+ORDINAL_PREPROCESSOR_PATH = '../pipelines/perf_preprocess_ordinal.pkl'
+
+parser = argparse.ArgumentParser(description="Cria o pré-processador de desempenho")
+parser.add_argument('--encoding', choices=['onehot', 'ordinal'], default='onehot',
+                    help="Codificação das colunas categóricas")
+ENCODING = parser.parse_args().encoding
 
 print("Iniciando a criação do pré-processador...")
 
@@ -59,9 +72,14 @@ numeric_transformer = Pipeline(steps=[
     ('imputer', SimpleImputer(strategy='median')),
     ('scaler', StandardScaler())
 ])
+if ENCODING == 'ordinal':
+    # Categoria desconhecida vira -1, abaixo de todos os códigos conhecidos
+    encoder = ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1))
+else:
+    encoder = ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
 categorical_transformer = Pipeline(steps=[
     ('imputer', SimpleImputer(strategy='most_frequent')),
-    ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+    encoder
 ])
 
 # 3. Juntar os pipelines com o ColumnTransformer
@@ -77,7 +95,9 @@ preprocessor = ColumnTransformer(
 print("Treinando o pré-processador...")
 preprocessor.fit(X)
 print("✅ Pré-processador treinado com sucesso.")
+print(f"   Codificação '{ENCODING}': {len(preprocessor.get_feature_names_out())} colunas processadas.")
 
 # 5. Salvar o novo objeto
-joblib.dump(preprocessor, PREPROCESSOR_PATH)
-print(f"💾 Novo pré-processador salvo em '{PREPROCESSOR_PATH}'.")
\ No newline at end of file
+output_path = ORDINAL_PREPROCESSOR_PATH if ENCODING == 'ordinal' else PREPROCESSOR_PATH
+joblib.dump(preprocessor, output_path)
+print(f"💾 Novo pré-processador salvo em '{output_path}'.")
\ No newline at end of file
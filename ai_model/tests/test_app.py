@@ -1,6 +1,8 @@
 from fastapi.testclient import TestClient
 
+import src.app
 from src.app import app
+from src.models.model_registry import LiveModel
 
 client = TestClient(app)
 
@@ -47,6 +49,7 @@ def test_predict_performance_success():
     assert "approval_status" in body
     assert "confidence" in body
     assert "factors" in body and isinstance(body["factors"], list)
+    assert 0 <= body["percentile"] <= 100
     assert body["saved"] is False
 
 
@@ -70,3 +73,75 @@ def test_predict_dropout_success():
     assert "probability_dropout" in data
     assert "explain" in data
 
+    provided = set(payload)
+    assert isinstance(data["factors"], list)
+    assert all(factor["feature"] in provided for factor in data["factors"])
+
+
+class StubSimulationService:
+    """Nota = 10 × Hours_Studied, sem modelo carregado."""
+    def __init__(self):
+        self.calls = []
+
+    def simulate_student(self, base, overrides):
+        self.calls.append((base, overrides))
+        reports = [self._report({**base, **override}) for override in overrides]
+        return self._report(base), reports
+
+    def _report(self, row):
+        score = 10.0 * row["Hours_Studied"]
+        return {"predicted_score": score, "is_approved": score >= 60.0, "grade_category": "REGULAR"}
+
+
+def test_simulate_performance_scores_grid_and_variants(monkeypatch):
+    service = StubSimulationService()
+    monkeypatch.setattr(src.app.performance_slot, "current", LiveModel("stub-v1", service))
+    student = client.get("/predict/performance").json()["example_approved"]
+    payload = {
+        "student": student,
+        "grid": {"Hours_Studied": [2.0, 6.0, 10.0], "Motivation_Level": ["Low", "High"]},
+        "variants": [{"Sleep_Hours": 5.0}]
+    }
+
+    response = client.post("/simulate/performance", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["model_version"] == "stub-v1"
+    assert body["n_variants"] == 7
+    assert body["fields"] == ["Sleep_Hours", "Hours_Studied", "Motivation_Level"]
+    assert body["base"]["predicted_score"] == 60.0
+    assert body["variants"][0] == {"Sleep_Hours": 5.0, "predicted_score": 60.0, "is_approved": True}
+    grid_rows = [(row["Hours_Studied"], row["Motivation_Level"], row["predicted_score"]) for row in body["variants"][1:]]
+    assert grid_rows == [(2.0, "Low", 20.0), (2.0, "High", 20.0), (6.0, "Low", 60.0),
+                         (6.0, "High", 60.0), (10.0, "Low", 100.0), (10.0, "High", 100.0)]
+    assert [row["is_approved"] for row in body["variants"][1:]] == [False, False, True, True, True, True]
+    assert len(service.calls) == 1
+
+    invalid = client.post("/simulate/performance", json={"student": student, "variants": [{"Motivation_Level": "Huge"}]})
+    assert invalid.status_code == 422
+
+    # A grade é rejeitada pelo tamanho antes de ser expandida
+    huge_grid = {field: list(range(10)) for field in ["Hours_Studied", "Attendance", "Sleep_Hours",
+                                                        "Tutoring_Sessions", "Physical_Activity", "Previous_Scores"]}
+    too_many = client.post("/simulate/performance", json={"student": student, "grid": huge_grid})
+    assert too_many.status_code == 422
+    assert "1000000" in too_many.json()["detail"]
+    monkeypatch.setattr(src.app, "MAX_SIMULATION_VARIANTS", 6)
+    over_limit = client.post("/simulate/performance", json=payload)
+    assert over_limit.status_code == 422
+    assert "(7)" in over_limit.json()["detail"]
+    unknown = client.post("/simulate/performance", json={"student": student, "grid": {"Shoe_Size": [40, 41]}})
+    assert unknown.status_code == 422
+    assert "Shoe_Size" in unknown.json()["detail"]
+    assert len(service.calls) == 1
+
+
+def test_admin_routes_are_closed_without_a_configured_token(monkeypatch):
+    monkeypatch.setattr(src.app, "ADMIN_TOKEN", None)
+    assert client.get("/admin/models").status_code == 503
+    assert client.post("/admin/models/dropout/rollback").status_code == 503
+
+    monkeypatch.setattr(src.app, "ADMIN_TOKEN", "segredo")
+    assert client.get("/admin/models", headers={"X-Admin-Token": "errado"}).status_code == 403
+    assert client.get("/admin/models", headers={"X-Admin-Token": "segredo"}).status_code == 200
@@ -0,0 +1,32 @@
+import pandas as pd
+import pytest
+
+from src.models.approval_cube import ApprovalCube
+
+DF = pd.DataFrame({
+    "Attendance": [65, 68, 75, 85, 95, 99],
+    "Motivation_Level": ["Low", "High", "Low", "Low", "High", "High"],
+    "Exam_Score": [55, 62, 58, 70, 80, 90],
+})
+
+
+def test_slice_matches_groupby():
+    cube = ApprovalCube(DF)
+
+    cell = cube.query({"Motivation_Level": "Low", "Attendance": "<70%"})
+    assert cell["count"] == 1 and cell["approval_rate"] == 0.0 and cell["mean_score"] == 55.0
+
+    grouped = cube.query({"Motivation_Level": "High"}, group_by="Attendance")
+    rows = {g["value"]: g["count"] for g in grouped["groups"]}
+    assert rows == {"<70%": 1, "70-80%": 0, "80-90%": 0, ">90%": 2}
+    assert grouped["approval_rate"] == 1.0
+    assert cube.query()["count"] == len(DF)
+
+
+def test_more_than_two_dimensions_is_rejected():
+    cube = ApprovalCube(DF.assign(Gender="Male"))
+
+    with pytest.raises(ValueError):
+        cube.query({"Motivation_Level": "Low", "Gender": "Male"}, group_by="Attendance")
+    with pytest.raises(KeyError):
+        cube.query({"Motivation_Level": "Medium"})
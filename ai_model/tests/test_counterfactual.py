@@ -0,0 +1,55 @@
+from src.models.counterfactual import CounterfactualSearch, candidates_with_cost, field_moves, ACTIONABLE
+
+
+class FakeService:
+    """Nota = 5 por hora de estudo + 10 se a motivação for alta."""
+    def __init__(self):
+        self.rows = 0
+
+    def _report(self, row):
+        score = 5 * row["Hours_Studied"] + (10 if row["Motivation_Level"] == "High" else 0)
+        return {"predicted_score": score, "is_approved": score >= 60}
+
+    def simulate_student(self, base, overrides):
+        rows = [base] + [{**base, **override} for override in overrides]
+        self.rows += len(rows)
+        reports = [self._report(row) for row in rows]
+        return reports[0], reports[1:]
+
+
+STUDENT = {"Hours_Studied": 8.0, "Motivation_Level": "Medium", "Sleep_Hours": 7.0}
+
+
+def test_moves_respect_bounds_and_directions():
+    assert field_moves(ACTIONABLE["Motivation_Level"], "High") == []
+    assert [value for _, value in field_moves(ACTIONABLE["Hours_Studied"], 40.0)] == [42.0, 44.0]
+    # Contagens do dataset; enums da API não geram movimentos
+    assert field_moves(ACTIONABLE["Tutoring_Sessions"], 7) == [(1, 8.0)]
+    assert field_moves(ACTIONABLE["Physical_Activity"], "High") == []
+    assert len(list(candidates_with_cost({"a": [(1, "x")], "b": [(1, "y"), (2, "z")]}, 2))) == 2
+
+
+def test_finds_minimum_change_and_caches():
+    search = CounterfactualSearch(max_evaluations=500)
+    service = FakeService()
+
+    result = search.search(service, "v1", STUDENT, n_results=2)
+
+    best = result["counterfactuals"][0]
+    assert best["cost"] == 2
+    assert best["changes"] == [{"feature": "Hours_Studied", "from": 8.0, "to": 12.0}]
+    second = {change["feature"]: change["to"] for change in result["counterfactuals"][1]["changes"]}
+    assert second == {"Hours_Studied": 10.0, "Motivation_Level": "High"}
+    assert all(cf["predicted_score"] >= 60 for cf in result["counterfactuals"])
+    assert result["cached"] is False
+
+    rows = service.rows
+    assert search.search(service, "v1", STUDENT, n_results=2)["cached"] is True
+    assert service.rows == rows
+
+
+def test_budget_limits_evaluations():
+    result = CounterfactualSearch(max_evaluations=5).search(FakeService(), "v1", STUDENT)
+
+    assert result["evaluations"] == 5
+    assert result["budget_exhausted"] is True
@@ -0,0 +1,46 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from src.models.early_exit import early_exit_proba
+from src.models.packed_forest import PackedForest
+
+
+def test_clear_cases_stop_early_and_borderline_use_all_trees():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 4))
+    y = X[:, 0] > 0
+    model = RandomForestClassifier(n_estimators=100, max_depth=4, random_state=0).fit(X, y)
+    X_eval = np.array([[4.0, 0, 0, 0], [-4.0, 0, 0, 0]])
+
+    probabilities, used, total = early_exit_proba(model, X_eval, [0.6], confidence=0.95, chunk_size=10)
+
+    assert total == 100
+    assert (used < total).all()
+    full = model.predict_proba(X_eval)[:, 1]
+    np.testing.assert_array_equal(probabilities >= 0.6, full >= 0.6)
+
+
+def test_without_early_stop_matches_full_forest():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(200, 3))
+    model = RandomForestClassifier(n_estimators=30, random_state=0).fit(X, X[:, 1] > 0)
+
+    probabilities, used, _ = early_exit_proba(model, X[:20], [0.6], min_trees=1000)
+
+    assert (used == 30).all()
+    np.testing.assert_allclose(probabilities, model.predict_proba(X[:20])[:, 1])
+
+
+def test_packed_forest_small_batches_use_a_single_full_pass():
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(300, 4))
+    model = RandomForestClassifier(n_estimators=60, max_depth=4, random_state=0).fit(X, X[:, 0] > 0)
+    packed = PackedForest.from_estimator(model)
+    X_eval = np.array([[4.0, 0, 0, 0], [-4.0, 0, 0, 0]])
+
+    probabilities, used, total = early_exit_proba(packed, X_eval, [0.6])
+
+    assert (used == total).all()
+    np.testing.assert_allclose(probabilities, model.predict_proba(X_eval)[:, 1], rtol=1e-5)
+    _, used, _ = early_exit_proba(packed, np.repeat(X_eval, 8, axis=0), [0.6])
+    assert (used < total).all()
@@ -0,0 +1,31 @@
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import roc_auc_score
+
+from src.models.ensemble_pruning import greedy_forward_selection, prune_forest
+
+
+def test_greedy_selection_picks_best_tree_first():
+    predictions = np.array([[0.9, 0.1, 0.9, 0.1], [0.1, 0.9, 0.1, 0.9], [0.6, 0.4, 0.5, 0.5]])
+    y = np.array([1, 0, 1, 0])
+
+    order, curve = greedy_forward_selection(predictions, y, roc_auc_score, max_trees=2)
+
+    assert order[0] == 0
+    assert curve[0] == 1.0
+    assert len(order) == 2 and len(set(order)) == 2
+
+
+def test_pruned_forest_is_smaller_and_uses_selected_trees():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(600, 4))
+    y = (X[:, 0] + 0.5 * X[:, 1] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=60, max_depth=4, random_state=0).fit(X[:400], y[:400])
+
+    pruned, report = prune_forest(model, X[400:], y[400:], roc_auc_score, tolerance=0.01, max_trees=30)
+
+    assert pruned.n_estimators == report["n_trees_pruned"] <= 30
+    assert len(model.estimators_) == 60
+    expected = np.mean([model.estimators_[i].predict_proba(X[400:])[:, 1] for i in report["selected_trees"]], axis=0)
+    np.testing.assert_allclose(pruned.predict_proba(X[400:])[:, 1], expected)
+    assert report["holdout"]["quality_lost"] < 0.05
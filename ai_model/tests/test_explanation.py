@@ -0,0 +1,64 @@
+import numpy as np
+
+import shap
+from sklearn.ensemble import RandomForestClassifier
+
+from src.models.explanation import ExplanationSession, build_source_index, top_n_indices
+
+
+def test_build_source_index_maps_one_hot_columns():
+    names = ["num__Hours_Studied", "cat__Motivation_Level_Low", "cat__Motivation_Level_High", "cat__Gender_Male"]
+    sources, index = build_source_index(names, ["Hours_Studied", "Motivation_Level", "Gender"])
+
+    assert [sources[i] for i in index] == ["Hours_Studied", "Motivation_Level", "Motivation_Level", "Gender"]
+
+
+def test_build_source_index_maps_ordinal_columns():
+    names = ["num__Hours_Studied", "cat__Motivation_Level", "cat__Gender"]
+    sources, index = build_source_index(names, ["Hours_Studied", "Motivation_Level", "Gender"])
+
+    assert [sources[i] for i in index] == ["Hours_Studied", "Motivation_Level", "Gender"]
+
+
+def test_top_n_indices_orders_by_magnitude():
+    values = np.array([
+        [0.1, -0.9, 0.3, 0.05],
+        [0.0, 0.2, -0.1, 0.7],
+    ])
+
+    np.testing.assert_array_equal(top_n_indices(values, 2), [[1, 2], [3, 1]])
+    assert top_n_indices(values, 10).shape == (2, 4)
+
+
+def test_one_hot_contributions_are_summed_per_original_feature():
+    names = ["num__Hours_Studied", "cat__Motivation_Level_Low", "cat__Motivation_Level_High", "cat__Gender_Male"]
+    session = ExplanationSession(
+        None, None, names, source_columns=["Hours_Studied", "Motivation_Level", "Gender"], explainer=object()
+    )
+    shap_values = np.array([[0.30, 0.20, 0.15, -0.25]])
+
+    grouped = session.grouped_values(shap_values)
+
+    np.testing.assert_allclose(grouped, [[0.30, 0.35, -0.25]])
+    np.testing.assert_array_equal(top_n_indices(grouped, 2), [[1, 0]])
+
+
+def test_fast_tier_uses_path_contributions_of_the_forest_itself():
+    rng = np.random.RandomState(0)
+    X = rng.normal(size=(300, 3))
+    y = (X[:, 1] > 0).astype(int)
+    model = RandomForestClassifier(n_estimators=20, max_depth=4, random_state=0).fit(X, y)
+    names = ["num__Hours_Studied", "num__Attendance", "num__Sleep_Hours"]
+    session = ExplanationSession(
+        model, X[:50], names, source_columns=["Hours_Studied", "Attendance", "Sleep_Hours"],
+        explainer=shap.TreeExplainer(model)
+    )
+
+    values = session.shap_values(X[:5], approximate=True)
+    factors = session.factors(values, [{"Attendance": 90}] * 5, top_n=1)
+
+    assert values.shape == (5, 3)
+    # Saabas também é aditivo: base (raiz) + contribuições = probabilidade prevista
+    np.testing.assert_allclose(values.sum(axis=1) - values.sum(axis=1).mean(),
+                               model.predict_proba(X[:5])[:, 1] - model.predict_proba(X[:5])[:, 1].mean())
+    assert all(row[0]["feature"] == "Attendance" for row in factors)
@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from src.models.explanation_jobs import ExplanationJobManager, QueueFullError
+
+
+def _wait(manager, job_id, timeout=5.0):
+    deadline = time.time() + timeout
+    job = manager.get(job_id)
+    while job["status"] == "pending" and time.time() < deadline:
+        time.sleep(0.01)
+        job = manager.get(job_id)
+    return job
+
+
+def test_job_result_is_available_after_completion():
+    manager = ExplanationJobManager(max_workers=1, ttl_seconds=60)
+    job_id = manager.submit(lambda: [{"feature": "Hours_Studied"}])
+
+    job = _wait(manager, job_id)
+
+    assert job["status"] == "done"
+    assert job["result"] == [{"feature": "Hours_Studied"}]
+    manager.shutdown()
+
+
+def test_failed_and_expired_jobs():
+    manager = ExplanationJobManager(max_workers=1, ttl_seconds=0)
+    job_id = manager.submit(lambda: 1 / 0)
+
+    deadline = time.time() + 5
+    while manager._jobs[job_id]["status"] == "pending" and time.time() < deadline:
+        time.sleep(0.01)
+    assert manager._jobs[job_id]["status"] == "failed"
+
+    time.sleep(0.01)
+    assert manager.get(job_id) is None
+    assert manager.get("desconhecido") is None
+    manager.shutdown()
+
+
+def test_queue_is_bounded_and_stale_pending_jobs_expire():
+    release = threading.Event()
+    calls = []
+    manager = ExplanationJobManager(max_workers=1, ttl_seconds=60, max_pending=1, pending_timeout=0.2)
+    try:
+        running = manager.submit(release.wait)
+        deadline = time.time() + 5
+        while manager._jobs[running]["started_at"] is None and time.time() < deadline:
+            time.sleep(0.01)
+        waiting = manager.submit(calls.append, "na fila")
+
+        with pytest.raises(QueueFullError):
+            manager.submit(calls.append, "recusado")
+
+        time.sleep(0.3)
+        assert manager.get(waiting) is None
+    finally:
+        release.set()
+
+    assert _wait(manager, running)["status"] == "done"
+    # O job expirado sai da fila sem ser executado e libera a vaga
+    deadline = time.time() + 5
+    while manager._queued and time.time() < deadline:
+        time.sleep(0.01)
+    accepted = manager.submit(calls.append, "aceito")
+    assert _wait(manager, accepted)["status"] == "done"
+    assert calls == ["aceito"]
+    manager.shutdown()
@@ -0,0 +1,30 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.models.feature_pruning import slim_preprocessor
+from src.models.preview import PredictionService
+
+
+def test_slim_preprocessor_drops_columns_and_service_ignores_them():
+    df = pd.DataFrame({
+        "Hours_Studied": [10.0, 20.0, 30.0],
+        "Gender": ["Male", "Female", "Male"],
+        "Motivation_Level": ["Low", "High", "Medium"],
+    })
+    preprocessor = ColumnTransformer([
+        ("num", StandardScaler(), ["Hours_Studied"]),
+        ("cat", OneHotEncoder(sparse_output=False), ["Gender", "Motivation_Level"]),
+    ]).fit(df)
+
+    slim = slim_preprocessor(preprocessor, ["Gender"]).fit(df.drop(columns=["Gender"]))
+
+    assert list(slim.feature_names_in_) == ["Hours_Studied", "Motivation_Level"]
+    assert not any("Gender" in name for name in slim.get_feature_names_out())
+    # Clientes antigos continuam enviando o campo removido
+    service = SimpleNamespace(preprocessor=slim)
+    frame = PredictionService._frame(service, df.to_dict("records"))
+    np.testing.assert_allclose(slim.transform(frame), slim.transform(df[["Hours_Studied", "Motivation_Level"]]))
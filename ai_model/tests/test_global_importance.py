@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+
+from src.models import global_importance
+from src.models.global_importance import GlobalImportanceStore, cohort_digest, compute_global_importance
+
+COHORT = pd.DataFrame({"Attendance": [70.0, 90.0, 85.0], "Motivation_Level": ["Low", "High", "Low"]})
+
+
+class FakeSession:
+    """Uma coluna processada por feature original; SHAP = próprio valor."""
+    source_columns = ["Attendance", "Motivation_Level"]
+    source_index = np.array([0, 1, 1])
+
+    def shap_values(self, X):
+        return np.asarray(X, dtype=float)
+
+    def grouped_values(self, values):
+        return np.column_stack([values[:, 0], values[:, 1] + values[:, 2]])
+
+
+def _counting_compute(monkeypatch):
+    calls = []
+
+    def fake(session, X_processed, df_original, **kwargs):
+        calls.append(len(df_original))
+        return {"n_samples": len(df_original), "features": []}
+
+    monkeypatch.setattr(global_importance, "compute_global_importance", fake)
+    return calls
+
+
+def test_store_reuses_result_until_cohort_or_version_changes(tmp_path, monkeypatch):
+    calls = _counting_compute(monkeypatch)
+    store = GlobalImportanceStore(tmp_path)
+
+    first = store.compute(None, "Random Forest", "abc", None, COHORT, cohort="turma-a")
+    again = store.compute(None, "Random Forest", "abc", None, COHORT.copy(), cohort="turma-a")
+    changed = COHORT.assign(Attendance=[70.0, 90.0, 60.0])
+    store.compute(None, "Random Forest", "abc", None, changed, cohort="turma-a")
+    store.compute(None, "Random Forest", "def", None, changed, cohort="turma-a")
+
+    assert again is first
+    assert calls == [3, 3, 3]
+    assert store.get("Random Forest", "abc", "turma-a")["cohort_hash"] == cohort_digest(changed)
+    assert store.get("Random Forest", "abc", "turma-b") is None
+
+
+def test_store_reads_results_written_by_another_process(tmp_path, monkeypatch):
+    calls = _counting_compute(monkeypatch)
+    GlobalImportanceStore(tmp_path).compute(None, "Regressão Logística", "abc", None, COHORT)
+
+    reopened = GlobalImportanceStore(tmp_path)
+    result = reopened.get("Regressão Logística", "abc")
+    reopened.compute(None, "Regressão Logística", "abc", None, COHORT)
+
+    assert result["cohort"] == "training"
+    assert calls == [3]
+    assert [entry["model_version"] for entry in reopened.entries()] == ["abc"]
+
+
+def test_similar_cohort_names_do_not_share_results(tmp_path, monkeypatch):
+    _counting_compute(monkeypatch)
+    GlobalImportanceStore(tmp_path).compute(None, "Random Forest", "abc", None, COHORT, cohort="turma a")
+
+    reopened = GlobalImportanceStore(tmp_path)
+
+    assert reopened.get("Random Forest", "abc", "turma_a") is None
+    assert reopened.get("Random Forest", "abc", "turma a")["cohort"] == "turma a"
+
+
+def test_memory_keeps_only_the_most_recent_cohorts(tmp_path, monkeypatch):
+    _counting_compute(monkeypatch)
+    store = GlobalImportanceStore(tmp_path, max_entries=2)
+
+    for cohort in ("a", "b", "c"):
+        store.compute(None, "Random Forest", "abc", None, COHORT, cohort=cohort)
+
+    assert [entry["cohort"] for entry in store.entries()] == ["b", "c"]
+    # O resultado removido da memória continua no disco
+    assert store.get("Random Forest", "abc", "a")["cohort"] == "a"
+
+
+def test_cohort_digest_depends_on_content_not_index():
+    assert cohort_digest(COHORT) == cohort_digest(COHORT.set_index(pd.Index([10, 11, 12])))
+    assert cohort_digest(COHORT) != cohort_digest(COHORT.iloc[::-1])
+
+
+def test_chunks_are_combined_into_mean_abs_and_per_value_means():
+    X = np.array([[-1.0, 0.5, 0.0], [3.0, 0.0, -0.5], [2.0, 1.0, 0.0]])
+
+    result = compute_global_importance(FakeSession(), X, COHORT, chunk_size=2, n_jobs=1)
+
+    attendance, motivation = result["features"]
+    assert result["n_samples"] == 3
+    assert attendance["feature"] == "Attendance"
+    assert attendance["mean_abs_shap"] == 2.0
+    assert motivation["values"]["Low"] == {"mean_shap": 0.75, "count": 2}
+    assert motivation["values"]["High"] == {"mean_shap": -0.5, "count": 1}
@@ -0,0 +1,44 @@
+import numpy as np
+from sklearn.linear_model import LinearRegression, Ridge
+
+from src.models.incremental_linear import IncrementalLeastSquares
+
+
+def _data(n=300, d=6, seed=0):
+    rng = np.random.RandomState(seed)
+    X = rng.normal(size=(n, d))
+    # Duas colunas complementares simulam um one-hot completo (matriz singular)
+    X[:, -2] = (X[:, 0] > 0).astype(float)
+    X[:, -1] = 1.0 - X[:, -2]
+    y = X @ rng.normal(size=d) + rng.normal(scale=0.1, size=n) + 60
+    return X, y
+
+
+def test_incremental_matches_batch_fit():
+    X, y = _data()
+    trainer = IncrementalLeastSquares(X.shape[1])
+    for start in range(0, len(y), 64):
+        trainer.partial_fit(X[start:start + 64], y[start:start + 64])
+
+    batch = LinearRegression().fit(X, y)
+    incremental = trainer.to_estimator()
+
+    np.testing.assert_allclose(incremental.predict(X), batch.predict(X), atol=1e-6)
+
+
+def test_remove_window_and_ridge():
+    X, y = _data()
+    trainer = IncrementalLeastSquares(X.shape[1], alpha=2.0)
+    trainer.partial_fit(X[:200], y[:200], window="2024-1")
+    trainer.partial_fit(X[200:], y[200:], window="2024-2")
+    trainer.remove_window("2024-2")
+
+    coef, intercept = trainer.solve()
+    ridge = Ridge(alpha=2.0).fit(X[:200], y[:200])
+
+    np.testing.assert_allclose(coef, ridge.coef_, atol=1e-6)
+    assert abs(intercept - ridge.intercept_) < 1e-6
+
+    metrics = trainer.evaluate(coef, intercept)
+    residuals = y[:200] - ridge.predict(X[:200])
+    assert abs(metrics["rmse"] - np.sqrt(np.mean(residuals ** 2))) < 1e-6
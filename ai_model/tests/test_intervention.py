@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.models.intervention import apply_rules, simulate_interventions
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+
+class FakePerformance:
+    """Aprova quem tem frequência >= 80 ou ao menos duas sessões de tutoria."""
+    def approval_probabilities(self, df):
+        return np.where((df["Attendance"] >= 80) | (df["Tutoring_Sessions"] >= 2), 0.9, 0.1)
+
+
+COHORT = pd.DataFrame({
+    "Attendance": [60.0, 70.0, 75.0, 90.0],
+    "Tutoring_Sessions": [0, 1, 0, 1],
+})
+
+
+def test_deterministic_rule_uses_single_draw():
+    rules = [{"column": "Attendance", "op": "add", "value": 10, "max": 100}]
+
+    result = simulate_interventions(COHORT, rules, performance_service=FakePerformance(), n_draws=50)
+
+    assert result["n_draws"] == 1
+    assert result["pass_rate"]["baseline"] == 0.25
+    assert result["pass_rate"]["mean"] == 0.75
+
+
+def test_draws_are_chunked_and_coverage_is_random():
+    rules = [{"column": "Tutoring_Sessions", "op": "set", "value": 2, "coverage": 0.5}]
+
+    result = simulate_interventions(
+        COHORT, rules, performance_service=FakePerformance(), n_draws=400, max_rows_per_chunk=10
+    )
+
+    assert result["n_draws"] == 400
+    assert 0.55 < result["pass_rate"]["mean"] < 0.70
+    assert result["pass_rate"]["p05"] < result["pass_rate"]["p95"]
+
+
+def test_unknown_column_is_rejected():
+    with pytest.raises(ValueError):
+        simulate_interventions(COHORT, [{"column": "Sleep", "op": "add", "value": 1}], FakePerformance())
+
+
+@pytest.mark.parametrize("value", ["Yes", 1.5, True])
+def test_set_value_must_match_column_dtype(value):
+    rules = [{"column": "Tutoring_Sessions", "op": "set", "value": value}]
+
+    with pytest.raises(ValueError, match="Tutoring_Sessions"):
+        simulate_interventions(COHORT, rules, FakePerformance())
+
+
+def test_count_columns_stay_known_categories_for_the_preprocessor():
+    preprocessor = joblib.load(SRC_DIR / "pipelines" / "perf_preprocess.pkl")
+    cohort = pd.read_csv(SRC_DIR / "datasets" / "StudentPerformanceFactors.csv").head(40).drop(columns=["Exam_Score"])
+    rules = [
+        {"column": "Tutoring_Sessions", "op": "multiply", "value": 1.4, "sd": 0.3, "max": 8},
+        {"column": "Physical_Activity", "op": "add", "value": -0.6, "sd": 0.8},
+    ]
+    n_draws = 25
+    frame = cohort.iloc[np.tile(np.arange(len(cohort)), n_draws)].reset_index(drop=True)
+    draw_ids = np.repeat(np.arange(n_draws), len(cohort))
+
+    frame = apply_rules(frame, rules, draw_ids, n_draws, np.random.default_rng(0))
+
+    assert frame["Tutoring_Sessions"].dtype == cohort["Tutoring_Sessions"].dtype
+    assert frame["Tutoring_Sessions"].between(0, 8).all()
+    assert (frame["Physical_Activity"] >= 0).all()
+    encoded = pd.DataFrame(preprocessor.transform(frame), columns=preprocessor.get_feature_names_out())
+    for column in ("Tutoring_Sessions", "Physical_Activity"):
+        one_hot = encoded.filter(like=f"cat__{column}_")
+        assert (one_hot.sum(axis=1) == 1).all(), column
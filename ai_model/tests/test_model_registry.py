@@ -0,0 +1,81 @@
+import threading
+
+from src.models.model_registry import ARTIFACTS, ModelRegistry, ModelSlot
+
+
+def _artifacts_dir(tmp_path, label):
+    source = tmp_path / label
+    source.mkdir()
+    for filename in ARTIFACTS["dropout"]:
+        (source / filename).write_text(label)
+    return source
+
+
+def test_activate_swaps_slot_and_rollback_returns_previous_version(tmp_path):
+    loaded = []
+
+    def loader(version_dir):
+        loaded.append(version_dir.name)
+        return (version_dir / "dropout_preprocess.pkl").read_text()
+
+    registry = ModelRegistry(tmp_path / "registry", loaders={"dropout": loader})
+    registry.register("dropout", _artifacts_dir(tmp_path, "a"), version="v1")
+    registry.register("dropout", _artifacts_dir(tmp_path, "b"), version="v2")
+    slot = ModelSlot("dropout", service="bundled", version="bundled")
+
+    registry.activate("dropout", "v1", slot, background=False)
+    registry.activate("dropout", "v2", slot, background=False)
+
+    assert slot.current == ("v2", "b")
+    assert slot.state["previous"] == "v1"
+    assert registry.active_version("dropout") == "v2"
+    assert registry.rollback_target("dropout", "v2") == "v1"
+    assert [info["version"] for info in registry.versions("dropout") if info["active"]] == ["v2"]
+    assert loaded == ["v1", "v2"]
+
+
+def test_failed_activation_keeps_serving_current_version(tmp_path):
+    def loader(version_dir):
+        raise ValueError("pickle inválido")
+
+    registry = ModelRegistry(tmp_path / "registry", loaders={"dropout": loader})
+    registry.register("dropout", _artifacts_dir(tmp_path, "a"), version="v1")
+    slot = ModelSlot("dropout", service="atual", version="bundled")
+
+    registry.activate("dropout", "v1", slot, background=False)
+
+    assert slot.current == ("bundled", "atual")
+    assert slot.state["status"] == "failed"
+    assert registry.active_version("dropout") is None
+
+
+def test_concurrent_activations_start_a_single_loader(tmp_path):
+    release = threading.Event()
+
+    def loader(version_dir):
+        release.wait(5)
+        return version_dir.name
+
+    registry = ModelRegistry(tmp_path / "registry", loaders={"dropout": loader})
+    registry.register("dropout", _artifacts_dir(tmp_path, "a"), version="v1")
+    slot = ModelSlot("dropout", service="bundled", version="bundled")
+    outcomes = []
+    barrier = threading.Barrier(8)
+
+    def activate():
+        barrier.wait()
+        try:
+            registry.activate("dropout", "v1", slot)
+            outcomes.append("started")
+        except RuntimeError:
+            outcomes.append("rejected")
+
+    threads = [threading.Thread(target=activate) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    release.set()
+
+    assert outcomes.count("started") == 1
+    assert outcomes.count("rejected") == 7
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import log_loss
+
+from src.models.dropout_service import DropoutService
+from src.models.online_dropout import OnlineDropoutTrainer, StreamingPreprocessor, TARGET
+
+DATA_PATH = Path(__file__).resolve().parents[1] / "src" / "datasets" / "xAPI_dropout.csv"
+PIPELINES_DIR = Path(__file__).resolve().parents[1] / "src" / "pipelines"
+# Campos enviados por LabelledDropoutData na API
+API_FIELDS = [
+    "raisedhands", "VisITedResources", "AnnouncementsView", "Discussion",
+    "ParentAnsweringSurvey", "ParentschoolSatisfaction", "StudentAbsenceDays",
+]
+
+
+@pytest.fixture(scope="module")
+def data():
+    return pd.read_csv(DATA_PATH)
+
+
+class RecordingService:
+    def __init__(self):
+        self.published = []
+
+    def publish(self, preprocessor, model):
+        self.published.append((preprocessor, model))
+
+
+def test_streaming_preprocessor_matches_batch_statistics(data):
+    preprocessor = StreamingPreprocessor()
+    preprocessor.partial_fit(data.iloc[:200]).partial_fit(data.iloc[200:])
+
+    X = preprocessor.transform(data)
+    numeric = data[preprocessor.numeric_cols].to_numpy(dtype=float)
+
+    assert X.shape == (len(data), len(preprocessor.get_feature_names_out()))
+    np.testing.assert_allclose(preprocessor.scaler.mean_, numeric.mean(axis=0))
+    np.testing.assert_allclose(X[:, -len(preprocessor.numeric_cols):].mean(axis=0), 0.0, atol=1e-9)
+
+
+def test_absent_features_use_expected_values_and_keep_statistics(data):
+    preprocessor = StreamingPreprocessor().partial_fit(data)
+    mean_before = preprocessor.scaler.mean_.copy()
+    gender_counts = preprocessor.category_counts_["gender"].copy()
+
+    partial = data[API_FIELDS].iloc[:50]
+    preprocessor.partial_fit(partial)
+    X = preprocessor.transform(partial)
+    names = list(preprocessor.get_feature_names_out())
+    gender = [names.index("categorical__gender_F"), names.index("categorical__gender_M")]
+
+    np.testing.assert_allclose(X[:, gender], np.tile(gender_counts / gender_counts.sum(), (50, 1)))
+    assert (preprocessor.category_counts_["gender"] == gender_counts).all()
+    # As quatro numéricas vêm no lote parcial, então a média muda
+    assert not np.allclose(preprocessor.scaler.mean_, mean_before)
+    assert preprocessor.output_mask(API_FIELDS).sum() == 4 + 2 + 2 + 2
+
+
+def test_bootstrap_requires_every_feature(data, tmp_path):
+    trainer = OnlineDropoutTrainer(tmp_path / "checkpoint.pkl")
+
+    with pytest.raises(ValueError, match="todas as features"):
+        trainer.bootstrap(data[API_FIELDS + [TARGET]])
+
+
+def test_bootstrap_update_checkpoint_and_publish(data, tmp_path):
+    service = RecordingService()
+    trainer = OnlineDropoutTrainer(tmp_path / "checkpoint.pkl", service=service)
+    trainer.bootstrap(data, epochs=2)
+    published_model = trainer.model
+    coef_before = trainer.model.coef_.copy()
+
+    state = trainer.update(data[API_FIELDS + [TARGET]].iloc[:64])
+
+    present = trainer.preprocessor.output_mask(API_FIELDS)
+    assert state == {"n_updates": 2, "n_samples": len(data) + 64}
+    assert len(service.published) == 2
+    assert service.published[-1] == (trainer.preprocessor, trainer.model)
+    # O par publicado antes da atualização não é alterado
+    np.testing.assert_array_equal(published_model.coef_, coef_before)
+    np.testing.assert_array_equal(trainer.model.coef_[:, ~present], coef_before[:, ~present])
+    assert not np.allclose(trainer.model.coef_[:, present], coef_before[:, present])
+
+    restored = OnlineDropoutTrainer.load(tmp_path / "checkpoint.pkl")
+    X = data.drop(columns=[TARGET])
+    np.testing.assert_allclose(
+        restored.model.predict_proba(restored.preprocessor.transform(X)),
+        trainer.model.predict_proba(trainer.preprocessor.transform(X)),
+    )
+    assert restored.n_updates == 2
+
+
+def test_bootstrapped_model_stays_close_to_batch_logistic_regression(data, tmp_path):
+    trainer = OnlineDropoutTrainer(tmp_path / "checkpoint.pkl")
+    trainer.bootstrap(data)
+    X = trainer.preprocessor.transform(data.drop(columns=[TARGET]))
+    y = data[TARGET].astype(int)
+    batch = LogisticRegression(class_weight="balanced", max_iter=500, random_state=42).fit(X, y)
+
+    online_proba = trainer.model.predict_proba(X)[:, 1]
+    batch_proba = batch.predict_proba(X)[:, 1]
+
+    assert log_loss(y, online_proba) < log_loss(y, batch_proba) + 0.05
+    assert np.abs(online_proba - batch_proba).mean() < 0.05
+    assert np.abs(trainer.model.coef_).max() < 2 * np.abs(batch.coef_).max()
+    assert online_proba.max() < 0.999
+
+
+def test_service_imputes_fields_the_api_does_not_send(data, tmp_path):
+    service = DropoutService(PIPELINES_DIR / "dropout_preprocess.pkl", PIPELINES_DIR / "dropout_logreg_model.pkl")
+    trainer = OnlineDropoutTrainer(tmp_path / "checkpoint.pkl", service=service)
+    trainer.bootstrap(data)
+    partial = data[API_FIELDS]
+
+    served = service.dropout_probabilities(partial)
+    imputed = trainer.model.predict_proba(trainer.preprocessor.transform(partial))[:, 1]
+    batch = service.predict_dropout_batch(partial.iloc[:3].to_dict("records"))
+
+    np.testing.assert_allclose(served, imputed)
+    np.testing.assert_allclose([r["probability_dropout"] for r in batch], imputed[:3])
@@ -0,0 +1,113 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+
+from src.models import packed_forest
+from src.models.packed_forest import PackedForest, export, load_model, max_packed_rows
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 6))
+    y = X[:, 0] * 3 + X[:, 1] ** 2 + rng.normal(scale=0.1, size=300)
+    return X, y
+
+
+def test_packed_classifier_matches_predict_proba(tmp_path):
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y > 0)
+
+    PackedForest.from_estimator(model).save(tmp_path / "rf.packed")
+    packed = PackedForest.load(tmp_path / "rf.packed")
+
+    np.testing.assert_allclose(packed.predict_proba(X), model.predict_proba(X), atol=1e-5)
+    np.testing.assert_array_equal(packed.predict(X), model.predict(X))
+
+
+def test_packed_boosting_regressor_and_load_model_prefers_packed(tmp_path):
+    import joblib
+
+    X, y = _data()
+    model = GradientBoostingRegressor(n_estimators=30, max_depth=3, random_state=0).fit(X, y)
+    model_path = tmp_path / "reg.pkl"
+    joblib.dump(model, model_path)
+    export(model_path, X)
+
+    loaded = load_model(model_path)
+
+    assert isinstance(loaded, PackedForest)
+    np.testing.assert_allclose(loaded.predict(X), model.predict(X), atol=1e-3)
+
+
+def test_load_model_ignores_packed_export_of_an_older_pickle(tmp_path):
+    import joblib
+
+    X, y = _data()
+    model_path = tmp_path / "reg.pkl"
+    joblib.dump(GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y), model_path)
+    export(model_path, X)
+    retrained = GradientBoostingRegressor(n_estimators=20, random_state=1).fit(X, y)
+    joblib.dump(retrained, model_path)
+
+    loaded = load_model(model_path)
+
+    assert isinstance(loaded, GradientBoostingRegressor)
+    np.testing.assert_allclose(loaded.predict(X), retrained.predict(X))
+
+
+def test_export_records_latency_and_large_batches_use_the_original(tmp_path):
+    import joblib
+
+    X, y = _data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=6, random_state=0).fit(X, y > 0)
+    model_path = tmp_path / "rf.pkl"
+    joblib.dump(model, model_path)
+    export(model_path, X)
+
+    loaded = load_model(model_path)
+    assert set(loaded.meta["latency_ms"]) == {"1", "16", "64", "256", "1024", "4096"}
+    assert loaded.meta["max_packed_rows"] >= 1
+
+    loaded.max_packed_rows = 10
+    np.testing.assert_allclose(loaded.predict_proba(X[:5]), model.predict_proba(X[:5]), atol=1e-5)
+    assert loaded._original is None
+    np.testing.assert_array_equal(loaded.predict_proba(X)[:, 1], model.predict_proba(X)[:, 1])
+    assert loaded._original is not None
+
+
+def test_export_refuses_a_format_slower_than_the_original(tmp_path, monkeypatch):
+    import joblib
+
+    X, y = _data()
+    model_path = tmp_path / "reg.pkl"
+    joblib.dump(GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y), model_path)
+    monkeypatch.setattr(packed_forest, "measure_latency",
+                        lambda original, packed, X: {"1": {"original": 0.1, "packed": 0.2}})
+
+    with pytest.raises(ValueError, match="mais lento"):
+        export(model_path, X)
+    assert not (tmp_path / "reg.packed").exists()
+    assert max_packed_rows({"1": {"original": 1, "packed": 0.5}, "64": {"original": 2, "packed": 3},
+                            "16": {"original": 1, "packed": 0.9}}) == 16
+
+
+def test_load_model_hashes_only_when_the_pickle_signature_changes(tmp_path, monkeypatch):
+    import joblib
+
+    X, y = _data()
+    model_path = tmp_path / "reg.pkl"
+    joblib.dump(GradientBoostingRegressor(n_estimators=10, random_state=0).fit(X, y), model_path)
+    export(model_path, X)
+    digest = packed_forest._digest
+    calls = []
+    monkeypatch.setattr(packed_forest, "_digest", lambda path: calls.append(path) or digest(path))
+
+    assert isinstance(load_model(model_path), PackedForest)
+    assert calls == []
+
+    stat = model_path.stat()
+    os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert isinstance(load_model(model_path), PackedForest)
+    assert calls == [model_path]
@@ -0,0 +1,50 @@
+import numpy as np
+
+from src.models.percentile_index import PercentileIndex
+
+
+def test_percentile_uses_mid_rank():
+    index = PercentileIndex([10, 20, 20, 30])
+
+    assert index.percentile([5, 20, 35]) == [0.0, 50.0, 100.0]
+    assert PercentileIndex().percentile([1.0]) == [None]
+
+
+def _mid_rank(reference, values):
+    reference = np.sort(reference)
+    left = np.searchsorted(reference, values, side="left")
+    right = np.searchsorted(reference, values, side="right")
+    return (100.0 * (left + right) / (2 * len(reference))).tolist()
+
+
+def test_recorded_values_are_merged_in_order():
+    rng = np.random.default_rng(0)
+    reference = rng.normal(size=500)
+    recorded = rng.normal(size=300)
+    index = PercentileIndex(reference, merge_every=100)
+
+    index.record(recorded[:250])
+    index.record(recorded[250:])
+    assert index.state() == {"size": 750, "weight": 750, "pending": 50}
+    index.flush()
+
+    everything = np.concatenate([reference, recorded])
+    probes = np.concatenate([everything[::7], [-10.0, 0.0, 10.0]])
+    assert index.state() == {"size": 800, "weight": 800, "pending": 0}
+    np.testing.assert_allclose(index.percentile(probes), _mid_rank(everything, probes))
+
+
+def test_size_is_bounded_and_old_data_keeps_its_weight():
+    # Referência antiga em [0, 1) e o mesmo número de predições novas em [1, 2):
+    # o valor 1 continua na mediana apesar das reduções repetidas
+    index = PercentileIndex(np.linspace(0.0, 1.0, 1000, endpoint=False), merge_every=100, max_size=300)
+    recorded = np.linspace(1.0, 2.0, 1000, endpoint=False)
+
+    for start in range(0, len(recorded), 100):
+        index.record(recorded[start:start + 100])
+
+    state = index.state()
+    assert state["size"] <= 300
+    assert state["weight"] == 2000
+    assert abs(index.percentile([1.0])[0] - 50.0) < 1.0
+    np.testing.assert_allclose(index.percentile([0.5, 1.5]), [25.0, 75.0], atol=1.0)
@@ -0,0 +1,18 @@
+from types import SimpleNamespace
+
+import pandas as pd
+
+from src.models.preview import PredictionService
+
+
+def test_warm_up_runs_every_explanation_tier_once():
+    calls = []
+    service = SimpleNamespace(
+        X_train_ref=pd.DataFrame({"Hours_Studied": [10.0, 20.0]}),
+        generate_reports=lambda students, tier: calls.append((students, tier)),
+    )
+
+    PredictionService.warm_up(service)
+
+    assert [tier for _, tier in calls] == ["exact", "approx", "fast"]
+    assert all(students == [{"Hours_Studied": 10.0}] for students, _ in calls)
@@ -0,0 +1,42 @@
+import time
+
+from src.models.shadow import ShadowEvaluator
+
+
+class _FakeService:
+    def __init__(self, scores):
+        self.scores = scores
+
+    def score_students(self, students):
+        return None, [{"predicted_score": self.scores[s["id"]]} for s in students]
+
+
+def _wait_idle(evaluator, timeout=5.0):
+    deadline = time.time() + timeout
+    while evaluator.summary()["pending"] and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_summary_reports_score_diff_and_approval_flips():
+    evaluator = ShadowEvaluator(sample_rate=1.0)
+    evaluator.set_candidate("v2", _FakeService({1: 65.0, 2: 40.0}))
+
+    evaluator.observe([{"id": 1}], [{"predicted_score": 55.0}], primary_latency_ms=4.0)
+    evaluator.observe([{"id": 2}], [{"predicted_score": 45.0}], primary_latency_ms=6.0)
+    _wait_idle(evaluator)
+    summary = evaluator.summary()
+
+    assert summary["candidate_version"] == "v2"
+    assert summary["n_observations"] == 2
+    assert summary["score_diff"]["mean_abs"] == 7.5
+    assert summary["approval_flips"]["failed_to_approved"] == 1
+    assert summary["approval_flips"]["approved_to_failed"] == 0
+
+
+def test_no_candidate_or_zero_rate_skips_sampling():
+    evaluator = ShadowEvaluator(sample_rate=0.0)
+    evaluator.observe([{"id": 1}], [{"predicted_score": 55.0}], primary_latency_ms=4.0)
+    evaluator.set_candidate("v2", _FakeService({1: 65.0}))
+    evaluator.observe([{"id": 1}], [{"predicted_score": 55.0}], primary_latency_ms=4.0)
+
+    assert evaluator.summary()["sampled"] == 0
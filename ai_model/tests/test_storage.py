@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from src.datasets import storage
+
+CSV = (
+    "Hours_Studied,Attendance,Motivation_Level,Tutoring_Sessions,Gender,Exam_Score\n"
+    "20,84,Low,0,Male,67\n"
+    "19,64,Medium,2,Female,61\n"
+    "24,98,High,1,Male,74\n"
+)
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "COLUMNAR_DIR", tmp_path / "columnar")
+    csv_path = tmp_path / "StudentPerformanceFactors.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    return csv_path
+
+
+def test_fallback_without_pyarrow_reads_typed_csv(dataset, monkeypatch):
+    monkeypatch.setattr(storage, "HAS_PYARROW", False)
+
+    df = storage.load_dataset(dataset, columns=["Exam_Score", "Motivation_Level"])
+
+    assert list(df.columns) == ["Exam_Score", "Motivation_Level"]
+    assert str(df["Exam_Score"].dtype) == "float32"
+    assert list(df["Motivation_Level"].cat.categories) == ["Low", "Medium", "High"]
+    assert not (storage.COLUMNAR_DIR).exists()
+
+
+def test_convert_writes_schema_and_projection_reads_only_requested_columns(dataset):
+    pytest.importorskip("pyarrow")
+
+    storage.convert_dataset(dataset)
+    _, schema_path = storage._columnar_paths(dataset.stem, "parquet")
+    schema = json.loads(schema_path.read_text(encoding="utf-8"))
+    df = storage.load_dataset(dataset, columns=["Gender", "Tutoring_Sessions"])
+
+    assert schema["rows"] == 3
+    assert schema["categories"]["Gender"] == ["Female", "Male"]
+    assert schema["columns"]["Tutoring_Sessions"] == "int8"
+    assert list(df.columns) == ["Gender", "Tutoring_Sessions"]
+    assert df["Tutoring_Sessions"].tolist() == [0, 2, 1]
+
+
+def test_changed_csv_makes_columnar_copy_stale(dataset):
+    pytest.importorskip("pyarrow")
+
+    storage.load_dataset(dataset)
+    _, schema_path = storage._columnar_paths(dataset.stem, "parquet")
+    assert storage._is_fresh(dataset, schema_path)
+
+    with dataset.open("a", encoding="utf-8") as f:
+        f.write("10,70,Low,3,Female,58\n")
+    assert not storage._is_fresh(dataset, schema_path)
+    assert len(storage.load_dataset(dataset, refresh=False)) == 4
+    assert len(storage.load_dataset(dataset)) == 4
+    assert storage._is_fresh(dataset, schema_path)
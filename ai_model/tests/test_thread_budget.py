@@ -0,0 +1,26 @@
+import os
+
+from src.models import thread_budget
+from src.models.thread_budget import THREAD_ENV_VARS, apply_thread_budget, thread_budget as budget
+
+
+def test_cores_are_split_between_workers(monkeypatch):
+    monkeypatch.setattr(thread_budget, "available_cores", lambda: 8)
+    monkeypatch.delenv("THREADS_PER_WORKER", raising=False)
+
+    assert budget(workers=4) == (8, 4, 2)
+    assert budget(workers=16) == (8, 16, 1)
+    monkeypatch.setenv("THREADS_PER_WORKER", "3")
+    assert budget(workers=4) == (8, 4, 3)
+
+
+def test_apply_sets_environment(monkeypatch):
+    monkeypatch.setattr(thread_budget, "available_cores", lambda: 4)
+    monkeypatch.delenv("THREADS_PER_WORKER", raising=False)
+    for name in THREAD_ENV_VARS:
+        monkeypatch.setenv(name, "")
+
+    settings = apply_thread_budget(workers=2)
+
+    assert settings["threads_per_worker"] == 2
+    assert all(os.environ[name] == "2" for name in THREAD_ENV_VARS)
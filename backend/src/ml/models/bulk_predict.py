@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para predição em lote (ex.: execução noturna de toda a instituição)
+
+Lê CSV/JSONL/Parquet em blocos de tamanho fixo, distribui os blocos entre
+processos que mantêm os modelos carregados e grava os resultados em JSONL
+ou CSV na mesma ordem da entrada. A memória fica limitada por
+chunk_size × (workers × 2) linhas, independente do tamanho do arquivo.
+
+Uso:
+    python models/bulk_predict.py alunos.csv resultados.jsonl --task both --top-n 3 --workers 4
+"""
+
+import argparse
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+from thread_budget import apply_thread_budget, available_cores
+
+from dropout_predict import load_dropout_artifacts, predict_dropout_batch
+from performance_predict import load_artifacts, load_regression_model, load_surrogate, predict_performance_batch
+
+TASKS = ('performance', 'dropout', 'both')
+
+# Estado de cada processo trabalhador (carregado uma única vez no initializer)
+_worker_state = {}
+
+
+def _init_worker(task, top_n, workers):
+    """Carrega os modelos uma vez por processo"""
+    # Cada processo usa sua fração dos núcleos (evita BLAS/OpenMP disputando CPUs)
+    apply_thread_budget(workers=workers)
+    _worker_state['task'] = task
+    _worker_state['top_n'] = top_n
+    if task in ('performance', 'both'):
+        _worker_state['performance'] = (load_artifacts(), load_regression_model(), load_surrogate())
+    if task in ('dropout', 'both'):
+        _worker_state['dropout'] = load_dropout_artifacts()
+
+
+def _score_chunk(chunk: pd.DataFrame):
+    """Executa as predições de um bloco; retorna uma lista de dicts por linha."""
+    task = _worker_state['task']
+    n_rows = len(chunk)
+    results = [{} for _ in range(n_rows)]
+
+    if task in ('performance', 'both'):
+        artifacts, regression_model, surrogate = _worker_state['performance']
+        performance = predict_performance_batch(
+            chunk, artifacts, regression_model, top_n=_worker_state['top_n'], surrogate=surrogate
+        )
+        for row, value in zip(results, performance):
+            row['performance'] = value
+    if task in ('dropout', 'both'):
+        preprocessor, model = _worker_state['dropout']
+        for row, value in zip(results, predict_dropout_batch(chunk, preprocessor, model)):
+            row['dropout'] = value
+    return results
+
+
+def iter_chunks(input_path: Path, chunk_size: int):
+    """Lê o arquivo de entrada em blocos de até chunk_size linhas"""
+    suffix = input_path.suffix.lower()
+    if suffix == '.csv':
+        yield from pd.read_csv(input_path, chunksize=chunk_size)
+    elif suffix in ('.jsonl', '.ndjson'):
+        yield from pd.read_json(input_path, lines=True, chunksize=chunk_size)
+    elif suffix == '.parquet':
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("pyarrow é necessário para ler arquivos Parquet (pip install pyarrow)")
+        for batch in pq.ParquetFile(input_path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Formato de entrada não suportado: {suffix} (use .csv, .jsonl ou .parquet)")
+
+
+class ResultWriter:
+    """Grava os resultados em JSONL (um objeto por linha) ou CSV (achatado)"""
+    def __init__(self, output_path: Path, id_column=None):
+        self.csv = output_path.suffix.lower() == '.csv'
+        self.id_column = id_column
+        self.file = open(output_path, 'w', encoding='utf-8', newline='')
+        self.header_written = False
+
+    def write(self, chunk: pd.DataFrame, offset: int, results):
+        ids = chunk[self.id_column].tolist() if self.id_column else range(offset, offset + len(chunk))
+        if not self.csv:
+            for row_id, row in zip(ids, results):
+                self.file.write(json.dumps({"id": row_id, **row}, ensure_ascii=False, default=str) + "\n")
+            return
+
+        flat_rows = []
+        for row_id, row in zip(ids, results):
+            flat = {"id": row_id}
+            for task, values in row.items():
+                for key, value in values.items():
+                    flat[f"{task}_{key}"] = json.dumps(value, ensure_ascii=False) if isinstance(value, list) else value
+            flat_rows.append(flat)
+        pd.DataFrame(flat_rows).to_csv(self.file, header=not self.header_written, index=False)
+        self.header_written = True
+
+    def close(self):
+        self.file.close()
+
+
+def run(input_path, output_path, task='both', top_n=0, workers=None, chunk_size=1000, id_column=None):
+    """Executa a predição em lote; retorna o número de linhas processadas"""
+    workers = workers or available_cores()
+    max_in_flight = workers * 2
+    writer = ResultWriter(Path(output_path), id_column=id_column)
+    pending = deque()
+    processed = 0
+    started = time.perf_counter()
+
+    def _drain_one():
+        nonlocal processed
+        chunk, offset, future = pending.popleft()
+        writer.write(chunk, offset, future.result())
+        processed += len(chunk)
+        elapsed = time.perf_counter() - started
+        print(f"⏳ {processed} linhas processadas ({processed / elapsed:.0f} linhas/s)", file=sys.stderr)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(task, top_n, workers)) as pool:
+            offset = 0
+            for chunk in iter_chunks(Path(input_path), chunk_size):
+                # Limita os blocos em memória e grava na ordem de entrada
+                if len(pending) >= max_in_flight:
+                    _drain_one()
+                pending.append((chunk, offset, pool.submit(_score_chunk, chunk)))
+                offset += len(chunk)
+            while pending:
+                _drain_one()
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {processed} linhas em {elapsed:.1f}s com {workers} processo(s)", file=sys.stderr)
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Predição em lote de desempenho e evasão")
+    parser.add_argument("input", type=Path, help="Arquivo de entrada (.csv, .jsonl ou .parquet)")
+    parser.add_argument("output", type=Path, help="Arquivo de saída (.jsonl ou .csv)")
+    parser.add_argument("--task", choices=TASKS, default="both")
+    parser.add_argument("--top-n", type=int, default=0, help="Número de fatores SHAP por aluno (0 = sem explicação)")
+    parser.add_argument("--workers", type=int, default=None, help="Processos trabalhadores (padrão: nº de CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Linhas por bloco")
+    parser.add_argument("--id-column", help="Coluna da entrada usada como identificador na saída")
+    args = parser.parse_args()
+
+    if not args.input.exists():
+        print(f"❌ Erro: arquivo de entrada não encontrado: {args.input}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        run(args.input, args.output, task=args.task, top_n=args.top_n, workers=args.workers,
+            chunk_size=args.chunk_size, id_column=args.id_column)
+    except Exception as e:
+        print(json.dumps({"error": str(e), "type": type(e).__name__}, ensure_ascii=False), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Script para destilar o modelo de regressão de desempenho em um substituto leve
+
+O substituto (árvore rasa ou modelo linear sobre as features codificadas) é
+treinado para imitar as notas do modelo escolhido por
+train_performance_regression.py. A validação é dividida em duas partes: na
+de calibração mede-se o erro em relação ao modelo completo e a margem de
+segurança é um quantil alto desse erro; a fidelidade (cobertura, decisões
+invertidas) é medida na outra parte, que não participou da escolha da margem.
+Em produção o substituto só responde quando sua nota está a mais de `margin`
+pontos do corte de 60 — os demais alunos usam o modelo completo. A margem é
+alargada até que nenhuma decisão aprovado/reprovado se inverta na calibração,
+e o substituto não é salvo (saída com código 1) se alguma se inverter na
+parte de avaliação. A garantia é empírica: vale para os alunos de validação,
+e alunos novos muito diferentes deles ainda podem ter a decisão invertida. O
+substituto guarda o digest do modelo completo e é ignorado se a regressão
+for retreinada.
+
+Uso:
+    python models/distill_regression.py --quantile 0.995 --max-depth 6
+"""
+
+import argparse
+import sys
+import time
+
+from thread_budget import apply_thread_budget
+apply_thread_budget(workers=1)  # antes do NumPy/scikit-learn
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import Ridge
+from sklearn.model_selection import train_test_split
+from sklearn.tree import DecisionTreeRegressor
+
+from performance_predict import (
+    PREPROCESSOR_PATH, DATA_PATH, REGRESSION_MODEL_PATH, SURROGATE_PATH,
+    _surrogate_gate, file_digest, file_signature, load_regression_model
+)
+from train_performance_regression import asymmetric_loss, RANDOM_STATE, TEST_SIZE
+
+CUTOFF = 60.0
+
+
+def _median_latency_ms(model, X, repeats=50):
+    """Latência mediana de uma predição de uma linha"""
+    row = X[:1]
+    model.predict(row)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict(row)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times) * 1000)
+
+
+def calibrate_margin(scores, teacher_scores, quantile):
+    """
+    Margem de segurança: o quantil do erro em relação ao modelo completo,
+    alargada para cobrir todo aluno da calibração cuja decisão o substituto
+    inverteria (a inversão só é evitada se |nota - corte| <= margem).
+    """
+    margin = float(np.quantile(np.abs(scores - teacher_scores), quantile))
+    flips = (scores >= CUTOFF) != (teacher_scores >= CUTOFF)
+    if flips.any():
+        margin = max(margin, float(np.abs(scores[flips] - CUTOFF).max()))
+    return margin
+
+
+def evaluate_surrogate(surrogate, teacher_scores, y_true, X_val):
+    """
+    Fidelidade do substituto com a margem escolhida, em relação ao modelo
+    completo (teacher_scores) e às notas reais (y_true).
+    """
+    scores, confident = _surrogate_gate(surrogate, X_val)
+    gated = np.where(confident, scores, teacher_scores)
+    flips = (scores >= CUTOFF) != (teacher_scores >= CUTOFF)
+    return {
+        'mae_vs_teacher': float(np.mean(np.abs(scores - teacher_scores))),
+        'coverage': float(confident.mean()),
+        'decision_flips': int((flips & confident).sum()),
+        'decision_agreement_answered': float(1.0 - flips[confident].mean()) if confident.any() else 1.0,
+        'asym_loss_gated': float(asymmetric_loss(np.asarray(y_true, dtype=float), gated)),
+        'asym_loss_teacher': float(asymmetric_loss(np.asarray(y_true, dtype=float), teacher_scores)),
+        'validation_rows': int(len(teacher_scores))
+    }
+
+
+def distill(quantile=0.995, max_depth=6, calibration_size=0.5):
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    teacher = load_regression_model()
+    if teacher is None:
+        raise FileNotFoundError("Modelo de regressão não encontrado; execute train_performance_regression.py")
+
+    df = pd.read_csv(DATA_PATH)
+    X = df[list(preprocessor.feature_names_in_)]
+    y = df['Exam_Score']
+    X_train, X_val, _, y_val = train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE)
+    # Calibração da margem e avaliação da fidelidade em partes separadas
+    X_cal, X_eval, _, y_eval = train_test_split(
+        X_val, y_val, train_size=calibration_size, random_state=RANDOM_STATE
+    )
+    X_train_proc = preprocessor.transform(X_train)
+    X_cal_proc = preprocessor.transform(X_cal)
+    X_eval_proc = preprocessor.transform(X_eval)
+
+    # Alvo da destilação: as notas do modelo completo (não as notas reais)
+    teacher_train = np.clip(teacher.predict(X_train_proc).astype(float), 0.0, 100.0)
+    teacher_cal = np.clip(teacher.predict(X_cal_proc).astype(float), 0.0, 100.0)
+    teacher_eval = np.clip(teacher.predict(X_eval_proc).astype(float), 0.0, 100.0)
+    teacher_ms = _median_latency_ms(teacher, X_eval_proc)
+    teacher_digest = file_digest(REGRESSION_MODEL_PATH)
+
+    candidates = {
+        f'Árvore rasa (profundidade {max_depth})': DecisionTreeRegressor(max_depth=max_depth, random_state=RANDOM_STATE),
+        'Ridge': Ridge(alpha=1.0)
+    }
+
+    best = None
+    for name, model in candidates.items():
+        model.fit(X_train_proc, teacher_train)
+        cal_scores = np.clip(model.predict(X_cal_proc).astype(float), 0.0, 100.0)
+        surrogate = {
+            'model': model,
+            'name': name,
+            'cutoff': CUTOFF,
+            'margin': calibrate_margin(cal_scores, teacher_cal, quantile),
+            'quantile': quantile,
+            'teacher_digest': teacher_digest,
+            'teacher_signature': file_signature(REGRESSION_MODEL_PATH)
+        }
+        fidelity = evaluate_surrogate(surrogate, teacher_eval, y_eval, X_eval_proc)
+        fidelity['calibration_rows'] = int(len(teacher_cal))
+        fidelity['latency_ms'] = _median_latency_ms(model, X_eval_proc)
+        fidelity['teacher_latency_ms'] = teacher_ms
+        surrogate['fidelity'] = fidelity
+
+        print(f"\n--- {name} ---")
+        print(f"   MAE vs modelo completo: {fidelity['mae_vs_teacher']:.2f} | margem: ±{surrogate['margin']:.2f}")
+        print(f"   Cobertura: {fidelity['coverage'] * 100:.1f}% | decisões invertidas: {fidelity['decision_flips']}")
+        print(f"   Latência: {fidelity['latency_ms']:.3f} ms (modelo completo: {teacher_ms:.3f} ms)")
+
+        # Preferir o que não inverte decisões e responde mais alunos
+        key = (-fidelity['decision_flips'], fidelity['coverage'])
+        if best is None or key > best[0]:
+            best = (key, surrogate)
+
+    return best[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Destila o modelo de regressão em um substituto leve")
+    parser.add_argument('--quantile', type=float, default=0.995,
+                        help="Quantil do erro vs modelo completo usado como margem de segurança")
+    parser.add_argument('--max-depth', type=int, default=6, help="Profundidade da árvore substituta")
+    args = parser.parse_args()
+
+    try:
+        surrogate = distill(quantile=args.quantile, max_depth=args.max_depth)
+    except FileNotFoundError as e:
+        print(f"❌ Erro: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    fidelity = surrogate['fidelity']
+    if fidelity['decision_flips'] > 0:
+        print(f"❌ Erro: o substituto {surrogate['name']} inverte {fidelity['decision_flips']} decisões na "
+              f"avaliação mesmo com margem ±{surrogate['margin']:.2f}; nada foi salvo", file=sys.stderr)
+        sys.exit(1)
+
+    joblib.dump(surrogate, SURROGATE_PATH)
+    print(f"\n🏆 Substituto escolhido: {surrogate['name']}")
+    print(f"   Responde {fidelity['coverage'] * 100:.1f}% dos alunos sem o modelo completo")
+    print(f"✅ Substituto salvo em: {SURROGATE_PATH}")
+
+
+if __name__ == "__main__":
+    main()
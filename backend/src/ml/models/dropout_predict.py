@@ -8,6 +8,7 @@ Executado via child_process do Node.js
 import sys
 import json
 import joblib
+import numpy as np
 import pandas as pd
 from pathlib import Path
 
@@ -16,12 +17,48 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 DROP_PREPROCESS = BASE_DIR / "pipelines" / "dropout_preprocess.pkl"
 DROP_MODEL = BASE_DIR / "pipelines" / "dropout_logreg_model.pkl"
 
+def load_dropout_artifacts():
+    """Carrega o pré-processador e o modelo de evasão"""
+    return joblib.load(DROP_PREPROCESS), joblib.load(DROP_MODEL)
+
+def _classify(proba):
+    """Classifica a probabilidade de evasão em baixo/médio/alto"""
+    if proba < 0.33:
+        return "baixo"
+    elif proba < 0.66:
+        return "médio"
+    return "alto"
+
+def predict_dropout_batch(df_students: pd.DataFrame, preprocessor, model):
+    """
+    Prediz o risco de evasão de um lote de alunos em uma única passada.
+    Usado pelo bulk_predict.py.
+    """
+    X = df_students
+    try:
+        X = X.reindex(columns=preprocessor.feature_names_in_, fill_value=0)
+    except AttributeError:
+        pass
+    probabilities = np.asarray(model.predict_proba(preprocessor.transform(X))[:, 1], dtype=float)
+
+    results = []
+    for proba in probabilities:
+        dropout_class = _classify(proba)
+        results.append({
+            "probability_dropout": float(proba),
+            "class_dropout": dropout_class,
+            "explain": (
+                f"Probabilidade de evasão classificada como {dropout_class} "
+                f"com base nos dados fornecidos."
+            )
+        })
+    return results
+
 def predict_dropout(student_data: dict):
     """Prediz risco de evasão"""
     try:
         # Carrega o pré-processador e o modelo
-        preprocessor = joblib.load(DROP_PREPROCESS)
-        model = joblib.load(DROP_MODEL)
+        preprocessor, model = load_dropout_artifacts()
         
         # Converte o dicionário em DataFrame
         X = pd.DataFrame([student_data])
@@ -40,12 +77,7 @@ def predict_dropout(student_data: dict):
         proba = model.predict_proba(X_processed)[0, 1]
         
         # Define a classificação com base no limiar
-        if proba < 0.33:
-            dropout_class = "baixo"
-        elif proba < 0.66:
-            dropout_class = "médio"
-        else:
-            dropout_class = "alto"
+        dropout_class = _classify(proba)
         
         explain = (
             f"Probabilidade de evasão classificada como {dropout_class} "
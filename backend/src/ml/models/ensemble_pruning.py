@@ -0,0 +1,140 @@
+# =============================================================================
+# ARQUIVO: backend/src/ml/models/ensemble_pruning.py
+# OBJETIVO: Poda gulosa de florestas (Random Forest) após o treinamento.
+#           - As saídas de cada árvore na validação são calculadas uma vez.
+#           - Seleção gulosa para frente: a cada passo entra a árvore que mais
+#             melhora a métrica da média das já escolhidas.
+#           - Fica o menor subconjunto cuja qualidade está a até `tolerance`
+#             (fração relativa) da floresta completa; o relatório compara a qualidade perdida
+#             (em uma metade da validação não usada na seleção) com a
+#             latência ganha.
+# =============================================================================
+
+import copy
+import time
+
+import numpy as np
+
+
+def tree_predictions(model, X):
+    """Saída de cada árvore (prob. da classe positiva ou valor): T×N."""
+    if hasattr(model, "predict_proba"):
+        return np.vstack([estimator.predict_proba(X)[:, 1] for estimator in model.estimators_])
+    return np.vstack([estimator.predict(X) for estimator in model.estimators_])
+
+
+def greedy_forward_selection(predictions, y, metric, greater_is_better=True, max_trees=None):
+    """
+    Ordem gulosa das árvores (sem reposição) e a métrica após cada inclusão.
+
+    Args:
+        predictions: Saídas por árvore, T×N.
+        y: Alvo da validação.
+        metric: Função (y, predição média) -> valor.
+        greater_is_better: True para ROC-AUC, False para perdas.
+        max_trees: Tamanho máximo do subconjunto.
+    """
+    n_trees = predictions.shape[0]
+    max_trees = min(max_trees or n_trees, n_trees)
+    sign = 1.0 if greater_is_better else -1.0
+    remaining = list(range(n_trees))
+    order, curve = [], []
+    total = np.zeros(predictions.shape[1])
+    for k in range(1, max_trees + 1):
+        scores = [sign * metric(y, (total + predictions[t]) / k) for t in remaining]
+        best = remaining.pop(int(np.argmax(scores)))
+        order.append(best)
+        curve.append(sign * max(scores))
+        total += predictions[best]
+    return order, curve
+
+
+def subset_forest(model, indices):
+    """Cópia da floresta apenas com as árvores escolhidas."""
+    pruned = copy.deepcopy(model)
+    pruned.estimators_ = [model.estimators_[i] for i in indices]
+    pruned.n_estimators = len(indices)
+    return pruned
+
+
+def _latency_ms(model, X, repeats=20):
+    predict = model.predict_proba if hasattr(model, "predict_proba") else model.predict
+    predict(X[:1])
+    single, batch = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X[:1])
+        single.append(time.perf_counter() - start)
+    for _ in range(max(repeats // 4, 1)):
+        start = time.perf_counter()
+        predict(X)
+        batch.append(time.perf_counter() - start)
+    return float(np.median(single) * 1000), float(np.median(batch) * 1000)
+
+
+def prune_forest(model, X_val, y_val, metric, greater_is_better=True, tolerance=0.005,
+                 max_trees=50, random_state=42):
+    """
+    Poda a floresta usando metade da validação para a seleção e a outra
+    metade para medir a qualidade perdida.
+
+    Args:
+        model: RandomForestClassifier/Regressor (ou ExtraTrees) já treinado.
+        X_val, y_val: Validação já processada, não usada no treino.
+        metric: roc_auc_score (classificação) ou asymmetric_loss (regressão).
+        greater_is_better: Sentido da métrica.
+        tolerance: Piora relativa aceita em relação à floresta completa.
+        max_trees: Tamanho máximo do subconjunto.
+
+    Returns:
+        tuple: (floresta podada, relatório)
+    """
+    y_val = np.asarray(y_val)
+    rng = np.random.default_rng(random_state)
+    shuffled = rng.permutation(len(y_val))
+    select_idx, holdout_idx = shuffled[: len(y_val) // 2], shuffled[len(y_val) // 2:]
+
+    predictions = tree_predictions(model, X_val)
+    select_pred, holdout_pred = predictions[:, select_idx], predictions[:, holdout_idx]
+    y_select, y_holdout = y_val[select_idx], y_val[holdout_idx]
+
+    order, curve = greedy_forward_selection(
+        select_pred, y_select, metric, greater_is_better=greater_is_better, max_trees=max_trees
+    )
+    full_select = metric(y_select, select_pred.mean(axis=0))
+    # Menor k dentro da tolerância da floresta completa (ou o melhor k da curva)
+    gaps = [(full_select - score) if greater_is_better else (score - full_select) for score in curve]
+    within = [k for k, gap in enumerate(gaps, start=1) if gap <= tolerance * abs(full_select)]
+    k = within[0] if within else int(np.argmin(gaps)) + 1
+    selected = sorted(order[:k])
+
+    pruned = subset_forest(model, selected)
+    full_holdout = metric(y_holdout, holdout_pred.mean(axis=0))
+    pruned_holdout = metric(y_holdout, holdout_pred[selected].mean(axis=0))
+    full_single, full_batch = _latency_ms(model, X_val)
+    pruned_single, pruned_batch = _latency_ms(pruned, X_val)
+
+    report = {
+        "n_trees_full": int(predictions.shape[0]),
+        "n_trees_pruned": int(k),
+        "selected_trees": [int(i) for i in selected],
+        "tolerance": tolerance,
+        "greater_is_better": greater_is_better,
+        "selection": {"full": float(full_select), "pruned": float(curve[k - 1]), "rows": int(len(select_idx))},
+        "holdout": {
+            "full": float(full_holdout),
+            "pruned": float(pruned_holdout),
+            "quality_lost": float((full_holdout - pruned_holdout) if greater_is_better else (pruned_holdout - full_holdout)),
+            "rows": int(len(holdout_idx)),
+        },
+        "latency_ms": {
+            "full_single_row": full_single,
+            "pruned_single_row": pruned_single,
+            "full_batch": full_batch,
+            "pruned_batch": pruned_batch,
+            "batch_rows": int(X_val.shape[0]),
+            "batch_speedup": float(full_batch / pruned_batch) if pruned_batch else None,
+        },
+        "curve": [float(score) for score in curve],
+    }
+    return pruned, report
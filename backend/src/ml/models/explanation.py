@@ -0,0 +1,150 @@
+# =============================================================================
+# ARQUIVO: backend/src/ml/models/explanation.py
+# OBJETIVO: Sessão de explicação SHAP reutilizável e vetorizada.
+#           - O explainer é criado uma única vez por modelo.
+#           - Calcula os valores SHAP de um lote N×d em uma chamada.
+#           - Seleciona os top-N fatores por linha com argpartition.
+#           - Cada coluna processada aponta para sua coluna original por um
+#             array de índices pré-calculado (sem busca por prefixo por linha).
+#           - As contribuições das colunas one-hot são somadas por feature
+#             original (uma multiplicação de matrizes) antes do ranking, então
+#             cada feature aparece no máximo uma vez entre os fatores.
+# =============================================================================
+
+import numpy as np
+import shap
+
+DEFAULT_LABELS = ("positiva", "negativa")
+
+
+def build_source_index(feature_names, source_columns=None):
+    """
+    Mapeia cada coluna processada (ex.: 'cat__Motivation_Level_Low') para a
+    coluna original ('Motivation_Level').
+
+    Returns:
+        tuple: (lista de colunas originais, array com o índice da coluna
+        original de cada feature processada).
+    """
+    sources = list(source_columns) if source_columns is not None else []
+    # Prefixo mais longo primeiro, para nomes que começam com outro nome
+    candidates = sorted(sources, key=len, reverse=True)
+    index = np.empty(len(feature_names), dtype=np.intp)
+    for i, name in enumerate(feature_names):
+        feature_part = name.split('__', 1)[1] if '__' in name else name
+        source = next(
+            (col for col in candidates
+             if feature_part == col or feature_part.startswith(col + '_')),
+            None
+        )
+        if source is None:
+            # Sem correspondência: a própria feature é tratada como original
+            source = feature_part
+            if source not in sources:
+                sources.append(source)
+        index[i] = sources.index(source)
+    return sources, index
+
+
+def top_n_indices(values, top_n):
+    """
+    Índices das top_n maiores magnitudes de cada linha, em ordem decrescente
+    de |valor|. Usa argpartition (O(d) por linha) antes de ordenar só os k.
+    """
+    magnitudes = np.abs(values)
+    n_cols = magnitudes.shape[1]
+    k = min(top_n, n_cols)
+    if k <= 0:
+        return np.empty((magnitudes.shape[0], 0), dtype=np.intp)
+    if k < n_cols:
+        candidates = np.argpartition(-magnitudes, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n_cols), magnitudes.shape)
+    order = np.argsort(-np.take_along_axis(magnitudes, candidates, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1)
+
+
+class ExplanationSession:
+    """
+    Explicações SHAP de um modelo sobre um pré-processador fixo.
+
+    Args:
+        model: Modelo treinado (ignorado se `explainer` for informado).
+        background: Dados de referência já processados para o SHAP.
+        feature_names: Nomes das colunas processadas (get_feature_names_out).
+        source_columns: Colunas originais (ex.: preprocessor.feature_names_in_).
+        explainer: Explainer SHAP já construído, para reaproveitar.
+        aggregate: Soma as contribuições por feature original antes do ranking.
+    """
+    def __init__(self, model, background, feature_names, source_columns=None, explainer=None, aggregate=True):
+        if explainer is None and hasattr(model, "shap_model"):
+            # Modelos compactados (packed_forest) expõem as árvores no formato
+            # de dicionário do SHAP; o fundo é amostrado como no shap.Explainer
+            explainer = shap.TreeExplainer(model.shap_model(), data=shap.utils.sample(background, 100, random_state=0))
+        self.explainer = explainer if explainer is not None else shap.Explainer(model, background)
+        self.feature_names = np.asarray(feature_names, dtype=object)
+        self.source_columns, self.source_index = build_source_index(self.feature_names, source_columns)
+        self.aggregate = aggregate
+        # Matriz indicadora d×k (coluna processada -> feature original): o
+        # scatter-add de um lote inteiro vira um único produto matricial
+        self.group_matrix = np.zeros((len(self.feature_names), len(self.source_columns)))
+        self.group_matrix[np.arange(len(self.feature_names)), self.source_index] = 1.0
+
+    def shap_values(self, X_processed):
+        """Valores SHAP (classe positiva, se houver) como array N×d."""
+        values = np.asarray(self.explainer(X_processed).values)
+        if values.ndim == 3:
+            values = values[:, :, 1]
+        return values
+
+    def grouped_values(self, shap_values):
+        """Soma as contribuições por feature original: N×d -> N×k."""
+        return shap_values @ self.group_matrix
+
+    def top_features(self, X_processed, top_n=3):
+        """
+        Retorna (índices N×top_n das features originais, contribuições N×top_n).
+        Com aggregate=False o ranking é feito por coluna processada e os
+        índices são convertidos para a feature original correspondente.
+        """
+        return self.rank(self.shap_values(X_processed), top_n)
+
+    def rank(self, values, top_n=3):
+        """Mesmo ranking de top_features, para valores N×d já calculados."""
+        if self.aggregate:
+            values = self.grouped_values(values)
+            indices = top_n_indices(values, top_n)
+            return indices, np.take_along_axis(values, indices, axis=1)
+        indices = top_n_indices(values, top_n)
+        return self.source_index[indices], np.take_along_axis(values, indices, axis=1)
+
+    def explain(self, X_processed, records, top_n=3, labels=DEFAULT_LABELS):
+        """
+        Lista de fatores por aluno, no formato das respostas da API.
+
+        Args:
+            X_processed: Lote já processado (N×d).
+            records: Lista com os dicionários originais de cada aluno.
+            top_n: Número de fatores por aluno.
+            labels: Textos de influência (positiva, negativa).
+        """
+        return self.factors(self.shap_values(X_processed), records, top_n, labels)
+
+    def factors(self, values, records, top_n=3, labels=DEFAULT_LABELS):
+        """
+        Formata os fatores a partir de contribuições N×d por coluna processada
+        (ex.: valores SHAP já calculados).
+        """
+        sources, values = self.rank(values, top_n)
+        explanations = []
+        for record, row_sources, row_values in zip(records, sources, values):
+            factors = []
+            for source, value in zip(row_sources, row_values):
+                feature = self.source_columns[source]
+                factors.append({
+                    "feature": feature,
+                    "value": record.get(feature, 'N/A'),
+                    "influence": labels[0] if value > 0 else labels[1]
+                })
+            explanations.append(factors)
+        return explanations
@@ -7,29 +7,40 @@ Executado via child_process do Node.js
 
 import sys
 import json
-import math
+import hashlib
 import joblib
+import numpy as np
 import pandas as pd
-import shap
 from pathlib import Path
 
+from explanation import ExplanationSession
+from packed_forest import load_model
+from early_exit import early_exit_proba
+
 # Configuração de caminhos - agora relativo ao backend/src/ml
 BASE_DIR = Path(__file__).resolve().parent.parent
 PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess.pkl"
 LOGREG_PATH = BASE_DIR / "pipelines" / "perf_logreg_model.pkl"
 RF_PATH = BASE_DIR / "pipelines" / "perf_rf_model.pkl"
 REGRESSION_MODEL_PATH = BASE_DIR / "pipelines" / "perf_regression_model.pkl"
+# Modelo substituto destilado (distill_regression.py): responde quando está
+# seguramente longe do corte de 60; os demais alunos usam a regressão completa
+SURROGATE_PATH = BASE_DIR / "pipelines" / "perf_regression_surrogate.pkl"
 DATA_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
 
-# Cache global para modelos e explainers
+# Cache global para modelos e sessões de explicação SHAP
 _models_cache = None
 _preprocessor_cache = None
 _explainers_cache = None
 _X_train_proc_cache = None
 _feature_names_cache = None
 
-def load_artifacts():
-    """Carrega modelos e explainers (com cache)"""
+def load_artifacts(explain=True):
+    """
+    Carrega modelos e explainers (com cache). Com explain=False (--only) só
+    o preprocessor e os modelos: sem ler o CSV de treino nem montar as
+    sessões SHAP, que a resposta só com a decisão não usa.
+    """
     global _models_cache, _preprocessor_cache, _explainers_cache
     global _X_train_proc_cache, _feature_names_cache
     
@@ -42,8 +53,10 @@ def load_artifacts():
         _preprocessor_cache = joblib.load(PREPROCESSOR_PATH)
         _models_cache = {
             'Regressão Logística': joblib.load(LOGREG_PATH),
-            'Random Forest': joblib.load(RF_PATH)
+            'Random Forest': load_model(RF_PATH)
         }
+        if not explain:
+            return _preprocessor_cache, _models_cache, {}, None, None
         
         df_train = pd.read_csv(DATA_PATH)
         print(f"🔍 DEBUG load_artifacts: Colunas no dataset: {list(df_train.columns)}", file=sys.stderr)
@@ -89,7 +102,9 @@ def load_artifacts():
                 # Tentando fazer uma predição de teste
                 test_pred = model.predict(_X_train_proc_cache[:1])
                 # Se funcionou, criar o explainer
-                _explainers_cache[name] = shap.Explainer(model, _X_train_proc_cache)
+                _explainers_cache[name] = ExplanationSession(
+                    model, _X_train_proc_cache, _feature_names_cache, source_columns=X_train_ref.columns
+                )
                 print(f"✅ DEBUG load_artifacts: Explainer criado para {name}", file=sys.stderr)
             except Exception as e:
                 print(f"⚠️ DEBUG load_artifacts: Não foi possível criar explainer para {name}: {str(e)}", file=sys.stderr)
@@ -114,10 +129,176 @@ def _get_grade_category(score: float) -> str:
     else:
         return "INSUFICIENTE"
 
-def predict_performance(student_data: dict, top_n=3):
-    """Prediz desempenho acadêmico"""
+def _approval_probability(scores):
+    """
+    Probabilidade de aprovação por sigmóide centrada em 60 e confidence pela
+    distância ao limiar (vetorizado; aceita escalar ou array de notas).
+    """
+    scores = np.asarray(scores, dtype=float)
+    z = (scores - 60) / 10  # Normaliza: cada 10 pontos = 1 unidade
+    probability = 1 / (1 + np.exp(-z))
+    distance_from_threshold = np.abs(scores - 60)
+    confidence = np.minimum(0.95, np.maximum(0.6, 0.6 + (distance_from_threshold / 20) * 0.35))
+    return probability, confidence
+
+def _probability_to_score(probability):
+    """Mapeia a probabilidade do classificador para nota 0-100 (fallback sem regressão)."""
+    probability = np.asarray(probability, dtype=float)
+    scores = np.select(
+        [probability < 0.3, probability < 0.7],
+        [probability / 0.3 * 40, 40 + (probability - 0.3) / 0.4 * 30],
+        default=70 + (probability - 0.7) / 0.3 * 30
+    )
+    return np.clip(scores, 0, 100)
+
+# Cortes de nota que separam as categorias (o primeiro é o de aprovação)
+GRADE_CUTOFFS = (60.0, 70.0, 80.0, 90.0)
+RESPONSE_LEVELS = ('decision', 'category')
+
+def _score_to_probability(score):
+    """Inversa de _probability_to_score: probabilidade que corresponde à nota."""
+    if score < 40:
+        return score / 40 * 0.3
+    if score < 70:
+        return 0.3 + (score - 40) / 30 * 0.4
+    return 0.7 + (score - 70) / 30 * 0.3
+
+def _align_features(preprocessor, df_students):
+    """Reordena colunas e preenche features ausentes como em predict_performance."""
+    if not hasattr(preprocessor, 'feature_names_in_'):
+        return df_students
+    expected_features = list(preprocessor.feature_names_in_)
+    df_students = df_students.copy()
+    for feature in expected_features:
+        if feature not in df_students.columns:
+            if feature in ['Hours_Studied', 'Sleep_Hours', 'Attendance']:
+                df_students[feature] = 0
+            else:
+                df_students[feature] = 'Unknown'
+    return df_students[expected_features]
+
+def load_regression_model():
+    """Carrega o modelo de regressão (formato compacto, se exportado); None se ainda não foi treinado."""
+    try:
+        return load_model(REGRESSION_MODEL_PATH)
+    except FileNotFoundError:
+        return None
+
+def file_digest(path) -> str:
+    """Versão de um artefato: prefixo do SHA-256 do arquivo."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+def file_signature(path):
+    """Tamanho e mtime do arquivo: se não mudaram, o SHA-256 também não."""
+    stat = Path(path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+def _teacher_matches(surrogate):
+    """O substituto foi destilado do modelo de regressão atual? (hash só se tamanho/mtime mudaram)"""
+    if not REGRESSION_MODEL_PATH.exists():
+        return False
+    if surrogate.get('teacher_signature') == file_signature(REGRESSION_MODEL_PATH):
+        return True
+    return surrogate.get('teacher_digest') == file_digest(REGRESSION_MODEL_PATH)
+
+def load_surrogate():
+    """
+    Carrega o substituto destilado ({model, margin, cutoff, fidelity,
+    teacher_digest}); None se não existir ou se tiver sido destilado de outra
+    versão do modelo de regressão (a margem não vale para o modelo atual).
+    """
     try:
-        preprocessor, models, explainers, X_train_proc, feature_names = load_artifacts()
+        surrogate = joblib.load(SURROGATE_PATH)
+    except FileNotFoundError:
+        return None
+    if not _teacher_matches(surrogate):
+        print("⚠️ Substituto destilado de outra versão do modelo de regressão; ignorado "
+              "(execute distill_regression.py novamente).", file=sys.stderr)
+        return None
+    return surrogate
+
+def _surrogate_gate(surrogate, processed):
+    """
+    Notas do substituto e máscara dos alunos que ele pode responder: aqueles
+    cuja nota está a mais de `margin` pontos do corte (margem medida na
+    destilação como quantil alto do erro em relação ao modelo completo).
+    """
+    scores = np.clip(surrogate['model'].predict(processed).astype(float), 0.0, 100.0)
+    confident = np.abs(scores - surrogate['cutoff']) > surrogate['margin']
+    return scores, confident
+
+def _regression_scores(processed, regression_model, surrogate=None):
+    """Notas da regressão, com o substituto respondendo os casos seguros."""
+    if surrogate is None:
+        scores = np.clip(regression_model.predict(processed).astype(float), 0.0, 100.0)
+        return scores, np.zeros(len(scores), dtype=bool)
+    scores, confident = _surrogate_gate(surrogate, processed)
+    deferred = np.flatnonzero(~confident)
+    if len(deferred):
+        scores[deferred] = np.clip(regression_model.predict(processed[deferred]).astype(float), 0.0, 100.0)
+    return scores, confident
+
+def predict_performance_batch(df_students: pd.DataFrame, artifacts, regression_model=None, top_n=3, surrogate=None):
+    """
+    Prediz o desempenho de um lote de alunos em uma única passada vetorizada.
+    Usado pelo bulk_predict.py; `artifacts` é o retorno de load_artifacts().
+
+    Returns:
+        list: Um dicionário por aluno, no mesmo formato de predict_performance.
+    """
+    preprocessor, models, explainers, _, _ = artifacts
+    records = df_students.to_dict(orient='records')
+    processed = preprocessor.transform(_align_features(preprocessor, df_students))
+
+    if regression_model is not None:
+        scores, by_surrogate = _regression_scores(processed, regression_model, surrogate)
+        _, confidences = _approval_probability(scores)
+        models_used = np.where(by_surrogate, 'surrogate', 'regression')
+    else:
+        probabilities = models['Random Forest'].predict_proba(processed)[:, 1]
+        scores = _probability_to_score(probabilities)
+        confidences = probabilities
+        models_used = np.full(len(scores), 'random_forest')
+
+    factors = [[] for _ in records]
+    if top_n and explainers:
+        explainer_model_name = 'Random Forest' if 'Random Forest' in explainers else list(explainers.keys())[0]
+        # SHAP e seleção top-N do bloco inteiro em uma operação vetorizada
+        factors = explainers[explainer_model_name].explain(processed, records, top_n=top_n)
+
+    results = []
+    for score, confidence, student_factors, model_used in zip(scores, confidences, factors, models_used):
+        score = float(score)
+        is_approved = score >= 60.0
+        results.append({
+            "predicted_score": score,
+            "confidence": float(confidence),
+            "is_approved": is_approved,
+            "approval_status": "APROVADO" if is_approved else "REPROVADO",
+            "grade_category": _get_grade_category(score),
+            "factors": student_factors,
+            "model_used": str(model_used),
+            "saved": False
+        })
+    return results
+
+def predict_performance(student_data: dict, top_n=3, only=None):
+    """
+    Prediz desempenho acadêmico.
+    Com only='decision' ou 'category', devolve só a decisão (e a categoria),
+    sem SHAP; no fallback da Random Forest as árvores são avaliadas com
+    parada antecipada e a saída informa quantas foram usadas.
+    """
+    trees_used = None
+    n_trees_total = None
+    try:
+        preprocessor, models, explainers, X_train_proc, feature_names = load_artifacts(
+            explain=only not in RESPONSE_LEVELS
+        )
         
         df_student = pd.DataFrame([student_data])
         # Log para debug
@@ -169,10 +350,22 @@ def predict_performance(student_data: dict, top_n=3):
             
             # O modelo foi treinado com casos extremos (tudo negativo → 0, tudo positivo → 100)
             # Então ele deve aprender esses padrões. Não precisamos de lógica de correção no backend.
-            regression_model = joblib.load(REGRESSION_MODEL_PATH)
-            # Predição de regressão: retorna a nota real (0-100)
-            predicted_score = float(regression_model.predict(processed_student_data)[0])
-            print(f"🔍 Predição do modelo (sem correções): {predicted_score:.2f}", file=sys.stderr)
+            # Substituto destilado primeiro: se a nota está seguramente longe do
+            # corte, o ensemble completo nem precisa ser carregado
+            predicted_score = None
+            surrogate = load_surrogate()
+            if surrogate is not None:
+                surrogate_scores, confident = _surrogate_gate(surrogate, processed_student_data)
+                if confident[0]:
+                    predicted_score = float(surrogate_scores[0])
+                    model_used = 'surrogate'
+                    print(f"⚡ Predição do substituto (margem {surrogate['margin']:.2f}): {predicted_score:.2f}", file=sys.stderr)
+            if predicted_score is None:
+                regression_model = load_model(REGRESSION_MODEL_PATH)
+                # Predição de regressão: retorna a nota real (0-100)
+                predicted_score = float(regression_model.predict(processed_student_data)[0])
+                model_used = 'regression'
+                print(f"🔍 Predição do modelo (sem correções): {predicted_score:.2f}", file=sys.stderr)
             
             # Apenas garantir que está no range válido (0-100)
             predicted_score = max(0.0, min(100.0, predicted_score))
@@ -187,72 +380,66 @@ def predict_performance(student_data: dict, top_n=3):
             # Se nota = 60, probability = 0.5 (incerto)
             # Se nota = 70, probability ≈ 0.88 (alta confiança em aprovação)
             # Se nota = 50, probability ≈ 0.12 (alta confiança em reprovação)
-            z = (predicted_score - 60) / 10  # Normaliza: cada 10 pontos = 1 unidade
-            probability = 1 / (1 + math.exp(-z))  # Função sigmóide
-            
-            # Calcular confidence baseada na distância do limiar (60)
-            # Confidence alta quando está longe de 60, média quando está perto
-            distance_from_threshold = abs(predicted_score - 60)
-            # Confidence máxima (0.95) quando está 20+ pontos longe, mínima (0.6) quando está em 60
-            confidence = min(0.95, max(0.6, 0.6 + (distance_from_threshold / 20) * 0.35))
+            # Confidence alta quando está longe de 60, média quando está perto:
+            # máxima (0.95) quando está 20+ pontos longe, mínima (0.6) quando está em 60
+            probability, confidence = (float(v) for v in _approval_probability(predicted_score))
             
             prediction_code = 1 if predicted_score >= 60 else 0
             use_regression = True
         except (FileNotFoundError, Exception) as e:
             # Fallback para modelo de classificação
             use_regression = False
+            model_used = 'random_forest'
             model_name = 'Random Forest'
             model = models[model_name]
-            prediction_code = int(model.predict(processed_student_data)[0])
-            probability = float(model.predict_proba(processed_student_data)[0][1])
-            # Mapear probabilidade para nota (método antigo melhorado)
-            if probability < 0.3:
-                predicted_score = float(probability / 0.3 * 40)
-            elif probability < 0.7:
-                predicted_score = float(40 + (probability - 0.3) / 0.4 * 30)
+            if only in RESPONSE_LEVELS:
+                # Só o lado dos cortes importa: parar quando estiver decidido
+                cutoffs = GRADE_CUTOFFS[:1] if only == 'decision' else GRADE_CUTOFFS
+                probabilities, used, n_trees_total = early_exit_proba(
+                    model, processed_student_data, [_score_to_probability(c) for c in cutoffs]
+                )
+                probability = float(probabilities[0])
+                trees_used = int(used[0])
+                prediction_code = int(probability >= 0.5)
             else:
-                predicted_score = float(70 + (probability - 0.7) / 0.3 * 30)
-            predicted_score = max(0, min(100, predicted_score))
+                prediction_code = int(model.predict(processed_student_data)[0])
+                probability = float(model.predict_proba(processed_student_data)[0][1])
+            # Mapear probabilidade para nota (método antigo melhorado)
+            predicted_score = float(_probability_to_score(probability))
             # Para modelo de classificação, confidence = probability (confiança do modelo)
             confidence = float(probability)
         
+        if only in RESPONSE_LEVELS:
+            is_approved = predicted_score >= 60.0
+            result = {
+                "is_approved": is_approved,
+                "approval_status": "APROVADO" if is_approved else "REPROVADO",
+                "model_used": model_used,
+                "saved": False
+            }
+            if only == 'category':
+                result["grade_category"] = _get_grade_category(predicted_score)
+            if trees_used is not None:
+                result["trees_used"] = trees_used
+                result["n_trees"] = n_trees_total
+            print(json.dumps(result, ensure_ascii=False))
+            return
+        
         # Explicação com SHAP (usa Random Forest para explicação mesmo se regressão for usada)
         # Se o explainer do Random Forest não estiver disponível, usar o primeiro disponível
         explanation_list = []
-        shap_values_for_positive_class = None
         
         if explainers:
             # Tentar usar Random Forest primeiro, senão usar o primeiro disponível
             explainer_model_name = 'Random Forest' if 'Random Forest' in explainers else list(explainers.keys())[0]
-            explainer = explainers[explainer_model_name]
             
             try:
-                shap_values = explainer(processed_student_data)
-                
-                try:
-                    shap_values_for_positive_class = shap_values.values[0, :, 1]
-                except IndexError:
-                    shap_values_for_positive_class = shap_values.values[0]
+                explanation_list = explainers[explainer_model_name].explain(
+                    processed_student_data, [student_data], top_n=top_n
+                )[0]
             except Exception as e:
                 print(f"⚠️ DEBUG: Erro ao calcular SHAP values: {str(e)}", file=sys.stderr)
                 # Se não conseguir calcular SHAP, usar lista vazia de explicações
-                shap_values_for_positive_class = None
-        
-            feature_impacts = pd.DataFrame(
-                list(zip(feature_names, shap_values_for_positive_class)),
-                columns=['feature', 'shap_value']
-            ).sort_values(by='shap_value', key=abs, ascending=False).head(top_n)
-            
-            for _, row in feature_impacts.iterrows():
-                feature_part = row['feature'].split('__')[1] if '__' in row['feature'] else row['feature']
-                original_feature_name = next((col for col in student_data if feature_part.startswith(col)), feature_part)
-                feature_value = student_data.get(original_feature_name, 'N/A')
-                influence = "positiva" if row['shap_value'] > 0 else "negativa"
-                explanation_list.append({
-                    "feature": original_feature_name,
-                    "value": feature_value,
-                    "influence": influence
-                })
         
         # predicted_score já foi calculado acima (do modelo de regressão ou mapeado do classificador)
         is_approved = predicted_score >= 60.0
@@ -268,6 +455,7 @@ def predict_performance(student_data: dict, top_n=3):
             "approval_status": "APROVADO" if is_approved else "REPROVADO",
             "grade_category": _get_grade_category(predicted_score),
             "factors": explanation_list,
+            "model_used": model_used,
             "saved": False
         }
         
@@ -283,6 +471,15 @@ def predict_performance(student_data: dict, top_n=3):
         sys.exit(1)
 
 if __name__ == "__main__":
+    # --only decision|category: responde só a decisão (e a categoria)
+    only = None
+    if "--only" in sys.argv:
+        only = sys.argv[sys.argv.index("--only") + 1] if sys.argv.index("--only") + 1 < len(sys.argv) else None
+        if only not in RESPONSE_LEVELS:
+            print(json.dumps({"error": f"--only deve ser um de {RESPONSE_LEVELS}", "type": "ValueError"},
+                             ensure_ascii=False), file=sys.stderr)
+            sys.exit(1)
+    
     # Verificar se há argumentos de linha de comando para modo de teste
     if len(sys.argv) > 1 and sys.argv[1] == "--test":
         # Modo de teste com dados de exemplo
@@ -307,7 +504,7 @@ if __name__ == "__main__":
             "Physical_Activity": "Low"
         }
         print("🧪 Modo de teste ativado", file=sys.stderr)
-        predict_performance(test_data)
+        predict_performance(test_data, only=only)
     else:
         # Lê dados do stdin (modo normal quando chamado pelo Node.js)
         input_data = sys.stdin.read()
@@ -322,7 +519,7 @@ if __name__ == "__main__":
         
         try:
             student_data = json.loads(input_data)
-            predict_performance(student_data)
+            predict_performance(student_data, only=only)
         except json.JSONDecodeError as e:
             error_result = {
                 "error": f"Erro ao parsear JSON: {str(e)}",
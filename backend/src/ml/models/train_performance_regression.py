@@ -6,6 +6,14 @@ Retorna a nota real (0-100) ao invés de apenas classificar aprovado/reprovado
 """
 
 import sys
+import io
+import json
+import time
+import argparse
+
+from thread_budget import apply_thread_budget
+apply_thread_budget(workers=1)  # antes do NumPy/scikit-learn (n_jobs=-1 respeita o limite)
+
 import pandas as pd
 import joblib
 import numpy as np
@@ -19,6 +27,8 @@ from sklearn.base import BaseEstimator, RegressorMixin
 import warnings
 warnings.filterwarnings('ignore')
 
+from ensemble_pruning import prune_forest
+
 def asymmetric_loss(y_true, y_pred):
     """
     Função de perda assimétrica que penaliza mais quando:
@@ -111,8 +121,15 @@ class AsymmetricGradientBoosting(BaseEstimator, RegressorMixin):
 # Configuração de caminhos
 BASE_DIR = Path(__file__).resolve().parent.parent
 PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess.pkl"
+ORDINAL_PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess_ordinal.pkl"
 DATA_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
 MODEL_PATH = BASE_DIR / "pipelines" / "perf_regression_model.pkl"
+# Scorecard, modelo podado e relatório da poda ficam ao lado do modelo
+# (.scorecard.json, .pruned.pkl, .pruning.json).
+# Com --encoding ordinal o modelo é salvo à parte, só para comparação offline
+# (scorecard): nenhum caminho de serviço o carrega, performance_predict.py
+# transforma as entradas com o pré-processador one-hot
+ORDINAL_MODEL_PATH = BASE_DIR / "pipelines" / "perf_regression_model_ordinal.pkl"
 
 RANDOM_STATE = 42
 TEST_SIZE = 0.2
@@ -130,14 +147,14 @@ def load_data():
         print(f"❌ Erro ao carregar dataset: {str(e)}")
         sys.exit(1)
 
-def load_preprocessor():
+def load_preprocessor(preprocessor_path=PREPROCESSOR_PATH):
     """Carrega o pré-processador existente"""
     try:
-        preprocessor = joblib.load(PREPROCESSOR_PATH)
-        print("✅ Pré-processador carregado")
+        preprocessor = joblib.load(preprocessor_path)
+        print(f"✅ Pré-processador carregado: {preprocessor_path.name}")
         return preprocessor
     except FileNotFoundError:
-        print(f"❌ Erro: Pré-processador não encontrado em {PREPROCESSOR_PATH}")
+        print(f"❌ Erro: Pré-processador não encontrado em {preprocessor_path}")
         print("   Execute primeiro o script de treinamento do pré-processador")
         sys.exit(1)
     except Exception as e:
@@ -302,8 +319,87 @@ def generate_extreme_cases(X, num_cases=50):
     
     return extreme_df, extreme_targets_series
 
-def train_regression_model(df, preprocessor):
-    """Treina modelo de regressão para prever a nota real"""
+def measure_inference_cost(model, X, single_repeats=50, batch_repeats=5, batch_size=1000):
+    """
+    Mede o custo de servir o modelo:
+    - latência de uma predição de 1 linha (mediana de single_repeats chamadas)
+    - latência de um lote de até batch_size linhas (mediana de batch_repeats)
+    - tamanho serializado (joblib) e tempo de carga desse pickle
+    """
+    single_row = X[:1]
+    batch = X[:batch_size]
+    model.predict(single_row)  # aquecimento
+
+    single_times = []
+    for _ in range(single_repeats):
+        start = time.perf_counter()
+        model.predict(single_row)
+        single_times.append(time.perf_counter() - start)
+
+    batch_times = []
+    for _ in range(batch_repeats):
+        start = time.perf_counter()
+        model.predict(batch)
+        batch_times.append(time.perf_counter() - start)
+
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    size_bytes = buffer.tell()
+    buffer.seek(0)
+    start = time.perf_counter()
+    joblib.load(buffer)
+    load_seconds = time.perf_counter() - start
+
+    batch_ms = float(np.median(batch_times) * 1000)
+    return {
+        'single_row_ms': float(np.median(single_times) * 1000),
+        'batch_ms': batch_ms,
+        'batch_rows': int(batch.shape[0]),
+        'batch_us_per_row': batch_ms * 1000 / max(batch.shape[0], 1),
+        'size_mb': size_bytes / (1024 * 1024),
+        'load_seconds': load_seconds
+    }
+
+# Limites do orçamento (None = sem limite) -> chave correspondente em measure_inference_cost
+BUDGET_KEYS = {
+    'max_single_row_ms': 'single_row_ms',
+    'max_batch_ms': 'batch_ms',
+    'max_size_mb': 'size_mb',
+    'max_load_seconds': 'load_seconds'
+}
+
+def budget_violations(cost, budget):
+    """Lista os limites do orçamento que o candidato ultrapassa"""
+    violations = []
+    for limit_name, cost_key in BUDGET_KEYS.items():
+        limit = (budget or {}).get(limit_name)
+        if limit is not None and cost[cost_key] > limit:
+            violations.append(f"{cost_key}={cost[cost_key]:.2f} > {limit}")
+    return violations
+
+def select_model(results):
+    """
+    Nome do candidato de menor perda assimétrica entre os que cabem no
+    orçamento; se nenhum couber, o de menor perda entre todos.
+    """
+    eligible = [name for name, r in results.items() if r['within_budget']]
+    if not eligible:
+        print("\n⚠️ Nenhum candidato dentro do orçamento; escolhendo pela perda assimétrica")
+        eligible = list(results)
+    return min(eligible, key=lambda name: results[name]['asym_loss_test'])
+
+def train_regression_model(df, preprocessor, budget=None, prune=False):
+    """
+    Treina modelo de regressão para prever a nota real.
+
+    O vencedor é o candidato de menor perda assimétrica entre os que cabem no
+    orçamento de latência/tamanho (`budget`, ver BUDGET_KEYS). Se nenhum
+    couber, vence o de menor perda e o scorecard registra as violações.
+
+    Com `prune`, se o vencedor for o Random Forest, uma poda gulosa escolhe
+    um subconjunto pequeno de árvores pela perda assimétrica na validação
+    (results[nome]['pruned_model'] e results[nome]['pruning']).
+    """
     
     # Separar features e target
     # REMOVER Previous_Scores para evitar viés (o modelo não deve usar notas anteriores)
@@ -410,9 +506,6 @@ def train_regression_model(df, preprocessor):
         )
     }
     
-    best_model = None
-    best_name = None
-    best_score = float('inf')
     results = {}
     
     print("\n🔍 Treinando e comparando modelos...")
@@ -433,12 +526,19 @@ def train_regression_model(df, preprocessor):
         # Calcular perda assimétrica (penaliza mais erros críticos)
         asym_loss_test = asymmetric_loss(y_test.values, y_pred_test)
         
+        # Custo de inferência: é o que se paga em cada requisição
+        cost = measure_inference_cost(model, X_test_proc)
+        violations = budget_violations(cost, budget)
+        
         results[name] = {
             'mae_train': mae_train,
             'mae_test': mae_test,
             'rmse_test': rmse_test,
             'r2_test': r2_test,
             'asym_loss_test': asym_loss_test,
+            **cost,
+            'within_budget': not violations,
+            'budget_violations': violations,
             'model': model
         }
         
@@ -447,12 +547,16 @@ def train_regression_model(df, preprocessor):
         print(f"   RMSE (teste): {rmse_test:.2f}")
         print(f"   R² (teste): {r2_test:.4f}")
         print(f"   Perda Assimétrica (teste): {asym_loss_test:.2f}")
-        
-        # Escolher o melhor modelo baseado na perda assimétrica (prioriza evitar falsos positivos/negativos)
-        if asym_loss_test < best_score:
-            best_score = asym_loss_test
-            best_model = model
-            best_name = name
+        print(f"   Latência 1 linha: {cost['single_row_ms']:.2f} ms | lote ({cost['batch_rows']}): {cost['batch_ms']:.1f} ms")
+        print(f"   Tamanho: {cost['size_mb']:.1f} MB | carga: {cost['load_seconds']:.2f} s")
+        if violations:
+            print(f"   ⚠️ Fora do orçamento: {', '.join(violations)}")
+    
+    # Escolher o melhor modelo baseado na perda assimétrica (prioriza evitar falsos positivos/negativos),
+    # apenas entre os candidatos que cabem no orçamento de latência/tamanho
+    best_name = select_model(results)
+    best_model = results[best_name]['model']
+    best_score = results[best_name]['asym_loss_test']
     
     print(f"\n🏆 Melhor modelo: {best_name} (Perda Assimétrica: {best_score:.2f})")
     
@@ -534,6 +638,20 @@ def train_regression_model(df, preprocessor):
         print(f"   Casos onde predição está dentro de ±5 pontos de 100: {(np.abs(hundred_pred - 100) <= 5).sum()} ({(np.abs(hundred_pred - 100) <= 5).sum() / len(hundred_pred) * 100:.1f}%)")
         print(f"   Casos onde predição está dentro de ±10 pontos de 100: {(np.abs(hundred_pred - 100) <= 10).sum()} ({(np.abs(hundred_pred - 100) <= 10).sum() / len(hundred_pred) * 100:.1f}%)")
     
+    if prune:
+        if isinstance(best_model, RandomForestRegressor):
+            pruned, report = prune_forest(
+                best_model, X_test_proc, y_test.values, asymmetric_loss, greater_is_better=False
+            )
+            results[best_name]['pruned_model'] = pruned
+            results[best_name]['pruning'] = report
+            latency = report['latency_ms']
+            print(f"\n✂️ Floresta podada: {report['n_trees_pruned']} de {report['n_trees_full']} árvores")
+            print(f"   Perda assimétrica (metade de controle): {report['holdout']['full']:.2f} -> {report['holdout']['pruned']:.2f}")
+            print(f"   Latência do lote: {latency['full_batch']:.1f} ms -> {latency['pruned_batch']:.1f} ms")
+        else:
+            print(f"\n⚠️ Poda ignorada: {best_name} não é um Random Forest")
+    
     return best_model, best_name, results
 
 def save_model(model, model_path):
@@ -546,7 +664,42 @@ def save_model(model, model_path):
         print(f"❌ Erro ao salvar modelo: {str(e)}")
         sys.exit(1)
 
+def save_scorecard(results, model_name, budget, scorecard_path):
+    """Grava o scorecard de todos os candidatos ao lado do modelo salvo"""
+    scorecard = {
+        'selected_model': model_name,
+        'budget': budget,
+        'candidates': {
+            name: {key: (float(value) if isinstance(value, (np.floating, float)) else value)
+                   for key, value in r.items() if key not in ('model', 'pruned_model', 'pruning')}
+            for name, r in results.items()
+        }
+    }
+    scorecard_path.write_text(json.dumps(scorecard, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"✅ Scorecard salvo em: {scorecard_path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Treina o modelo de regressão de desempenho")
+    parser.add_argument('--max-single-row-ms', type=float, help="Latência máxima de uma predição (ms)")
+    parser.add_argument('--max-batch-ms', type=float, help="Latência máxima de um lote de 1000 linhas (ms)")
+    parser.add_argument('--max-size-mb', type=float, help="Tamanho máximo do modelo serializado (MB)")
+    parser.add_argument('--max-load-seconds', type=float, help="Tempo máximo de carga do modelo (s)")
+    parser.add_argument('--encoding', choices=['onehot', 'ordinal'], default='onehot',
+                        help="Pré-processador usado (ordinal: perf_preprocess_ordinal.pkl, modelo salvo à parte)")
+    parser.add_argument('--prune', action='store_true',
+                        help="Salva também uma versão podada da floresta e o relatório de qualidade x latência")
+    return parser.parse_args()
+
 def main():
+    args = parse_args()
+    budget = {key: getattr(args, key) for key in BUDGET_KEYS}
+    if args.encoding == 'ordinal':
+        preprocessor_path, model_path = ORDINAL_PREPROCESSOR_PATH, ORDINAL_MODEL_PATH
+    else:
+        preprocessor_path, model_path = PREPROCESSOR_PATH, MODEL_PATH
+    scorecard_path = model_path.with_suffix(".scorecard.json")
+    pruning_report_path = model_path.with_suffix(".pruning.json")
+    
     print("=" * 60)
     print("TREINAMENTO DE MODELO DE REGRESSÃO PARA DESEMPENHO")
     print("=" * 60)
@@ -555,18 +708,26 @@ def main():
     df = load_data()
     
     # 2. Carregar pré-processador
-    preprocessor = load_preprocessor()
+    preprocessor = load_preprocessor(preprocessor_path)
     
     # 3. Treinar modelo
-    model, model_name, results = train_regression_model(df, preprocessor)
-    
-    # 4. Salvar modelo
-    save_model(model, MODEL_PATH)
+    model, model_name, results = train_regression_model(df, preprocessor, budget=budget, prune=args.prune)
+    
+    # 4. Salvar modelo e scorecard
+    save_model(model, model_path)
+    save_scorecard(results, model_name, budget, scorecard_path)
+    if 'pruning' in results[model_name]:
+        save_model(results[model_name]['pruned_model'], model_path.with_suffix(".pruned.pkl"))
+        pruning_report_path.write_text(
+            json.dumps(results[model_name]['pruning'], ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+        print(f"✅ Relatório da poda salvo em: {pruning_report_path}")
     
     print("\n" + "=" * 60)
     print("✅ TREINAMENTO CONCLUÍDO COM SUCESSO!")
     print("=" * 60)
-    print(f"\n📝 Modelo salvo: {MODEL_PATH}")
+    print(f"\n📝 Modelo salvo: {model_path}")
+    print(f"📝 Scorecard: {scorecard_path}")
     print(f"📝 Modelo escolhido: {model_name}")
     print(f"\n💡 Próximos passos:")
     print(f"   1. Atualize o script performance_predict.py para usar este modelo")
@@ -3,23 +3,51 @@
 """
 Script para retreinar o pré-processador SEM o campo Previous_Scores
 Isso evita viés no modelo - o modelo não deve usar notas anteriores para prever
+
+Com --encoding ordinal as colunas categóricas viram um código por coluna (em
+vez de uma coluna por categoria); as árvores dividem o código como número,
+então o SHAP exato (TreeExplainer) continua aditivo. As explicações continuam
+agregadas por feature original. Esse pipeline é salvo em
+perf_preprocess_ordinal.pkl, só para comparação offline: os modelos servidos
+e a API usam o one-hot.
 """
 
 import sys
+import argparse
 import pandas as pd
 import joblib
 from pathlib import Path
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.impute import SimpleImputer
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
+from sklearn.preprocessing import StandardScaler, OneHotEncoder, OrdinalEncoder
 
 # Configuração de caminhos
 BASE_DIR = Path(__file__).resolve().parent.parent
 DATASET_PATH = BASE_DIR / "datasets" / "StudentPerformanceFactors.csv"
 PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess.pkl"
+ORDINAL_PREPROCESSOR_PATH = BASE_DIR / "pipelines" / "perf_preprocess_ordinal.pkl"
+
+def build_categorical_transformer(encoding='onehot'):
+    """Imputação + codificação das colunas categóricas ('onehot' ou 'ordinal')"""
+    if encoding == 'ordinal':
+        # Categoria desconhecida vira -1, abaixo de todos os códigos conhecidos
+        encoder = ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1))
+    else:
+        encoder = ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+    return Pipeline(steps=[
+        ('imputer', SimpleImputer(strategy='most_frequent')),
+        encoder
+    ])
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Retreina o pré-processador de desempenho")
+    parser.add_argument('--encoding', choices=['onehot', 'ordinal'], default='onehot',
+                        help="Codificação das colunas categóricas")
+    return parser.parse_args()
 
 def main():
+    args = parse_args()
     print("=" * 60)
     print("RETREINANDO PRÉ-PROCESSADOR SEM Previous_Scores")
     print("=" * 60)
@@ -74,10 +102,8 @@ def main():
         ('scaler', StandardScaler())
     ])
     
-    categorical_transformer = Pipeline(steps=[
-        ('imputer', SimpleImputer(strategy='most_frequent')),
-        ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
-    ])
+    categorical_transformer = build_categorical_transformer(args.encoding)
+    print(f"📊 Codificação categórica: {args.encoding}")
     
     # Criar ColumnTransformer
     preprocessor = ColumnTransformer(
@@ -94,8 +120,9 @@ def main():
     print("✅ Pré-processador treinado com sucesso")
     
     # Salvar o pré-processador
-    print(f"\n💾 Salvando pré-processador em: {PREPROCESSOR_PATH}")
-    joblib.dump(preprocessor, PREPROCESSOR_PATH)
+    output_path = ORDINAL_PREPROCESSOR_PATH if args.encoding == 'ordinal' else PREPROCESSOR_PATH
+    print(f"\n💾 Salvando pré-processador em: {output_path}")
+    joblib.dump(preprocessor, output_path)
     print("✅ Pré-processador salvo com sucesso")
     
     # Testar o pré-processador
@@ -108,7 +135,7 @@ def main():
     print("✅ PROCESSO CONCLUÍDO COM SUCESSO!")
     print("=" * 60)
     print("\n💡 Próximos passos:")
-    print("   1. Retreine o modelo com: py models/train_performance_regression.py")
+    print(f"   1. Retreine o modelo com: py models/train_performance_regression.py --encoding {args.encoding}")
     print("   2. O modelo agora não usará Previous_Scores, evitando viés")
 
 if __name__ == "__main__":
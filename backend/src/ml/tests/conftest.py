@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# Os scripts de models/ importam uns aos outros pelo nome (execução direta)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "models"))
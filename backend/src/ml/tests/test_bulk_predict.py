@@ -0,0 +1,115 @@
+import json
+from concurrent.futures import Future
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+import bulk_predict
+from dropout_predict import load_dropout_artifacts, predict_dropout_batch
+from performance_predict import PREPROCESSOR_PATH, predict_performance_batch
+
+DATASETS_DIR = Path(__file__).resolve().parent.parent / "datasets"
+
+
+class ReversePool:
+    """
+    Executor no mesmo processo: cada bloco só é calculado quando o seu
+    resultado é pedido, e os mais novos terminam antes (ordem inversa).
+    """
+    def __init__(self, max_workers, initializer, initargs):
+        self.jobs = []
+        self.collected = 0
+        self.max_outstanding = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _collect(self, future):
+        for pending, fn, chunk in reversed(self.jobs):
+            if not pending.done():
+                pending.set_result(fn(chunk))
+        self.collected += 1
+        return Future.result(future)
+
+    def submit(self, fn, chunk):
+        future = Future()
+        future.result = lambda timeout=None: self._collect(future)
+        self.jobs.append((future, fn, chunk))
+        self.max_outstanding = max(self.max_outstanding, len(self.jobs) - self.collected)
+        return future
+
+
+class ConstantScore:
+    def __init__(self, score):
+        self.score = score
+
+    def predict(self, X):
+        return np.full(X.shape[0], self.score)
+
+
+class FixedScores:
+    def __init__(self, scores):
+        self.scores = np.asarray(scores, dtype=float)
+
+    def predict(self, X):
+        return self.scores[:X.shape[0]]
+
+
+def test_writer_keeps_input_order_and_bounds_chunks_in_flight(tmp_path, monkeypatch):
+    pools = []
+
+    def make_pool(**kwargs):
+        pools.append(ReversePool(**kwargs))
+        return pools[-1]
+
+    monkeypatch.setattr(bulk_predict, "ProcessPoolExecutor", make_pool)
+    monkeypatch.setattr(bulk_predict, "_score_chunk", lambda chunk: [
+        {"performance": {"value": int(v)}} for v in chunk["value"]
+    ])
+    input_path = tmp_path / "alunos.csv"
+    pd.DataFrame({"matricula": [f"a{i}" for i in range(25)], "value": range(25)}).to_csv(input_path, index=False)
+
+    processed = bulk_predict.run(input_path, tmp_path / "out.csv", workers=2, chunk_size=3, id_column="matricula")
+
+    output = pd.read_csv(tmp_path / "out.csv")
+    assert processed == 25
+    assert output["id"].tolist() == [f"a{i}" for i in range(25)]
+    assert output["performance_value"].tolist() == list(range(25))
+    assert pools[0].max_outstanding <= 2 * 2
+
+
+def test_dropout_csv_end_to_end_with_one_worker(tmp_path):
+    students = pd.read_csv(DATASETS_DIR / "xAPI_dropout.csv").head(23).drop(columns=["dropout_label"])
+    input_path = tmp_path / "alunos.csv"
+    students.to_csv(input_path, index=False)
+
+    processed = bulk_predict.run(input_path, tmp_path / "out.jsonl", task="dropout", workers=1, chunk_size=5)
+
+    rows = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text(encoding="utf-8").splitlines()]
+    expected = predict_dropout_batch(students, *load_dropout_artifacts())
+    assert processed == 23
+    assert [row["id"] for row in rows] == list(range(23))
+    np.testing.assert_allclose(
+        [row["dropout"]["probability_dropout"] for row in rows],
+        [item["probability_dropout"] for item in expected],
+    )
+
+
+def test_performance_batch_defers_uncertain_students_to_regression():
+    preprocessor = joblib.load(PREPROCESSOR_PATH)
+    students = pd.read_csv(DATASETS_DIR / "StudentPerformanceFactors.csv").head(4).drop(columns=["Exam_Score"])
+    surrogate = {"model": FixedScores([90.0, 61.0, 30.0, 58.0]), "margin": 5.0, "cutoff": 60.0}
+
+    results = predict_performance_batch(
+        students, (preprocessor, {}, {}, None, None),
+        regression_model=ConstantScore(62.0), top_n=0, surrogate=surrogate,
+    )
+
+    assert [r["model_used"] for r in results] == ["surrogate", "regression", "surrogate", "regression"]
+    assert [r["predicted_score"] for r in results] == [90.0, 62.0, 30.0, 62.0]
+    assert [r["is_approved"] for r in results] == [True, True, False, True]
@@ -0,0 +1,68 @@
+import joblib
+import numpy as np
+import pytest
+
+import distill_regression
+import performance_predict
+from distill_regression import CUTOFF, calibrate_margin
+from performance_predict import file_digest, file_signature, load_surrogate
+
+
+def test_surrogate_is_ignored_after_the_regression_model_changes(tmp_path, monkeypatch):
+    teacher_path = tmp_path / "perf_regression_model.pkl"
+    surrogate_path = tmp_path / "perf_regression_surrogate.pkl"
+    monkeypatch.setattr(performance_predict, "REGRESSION_MODEL_PATH", teacher_path)
+    monkeypatch.setattr(performance_predict, "SURROGATE_PATH", surrogate_path)
+    joblib.dump({"versão": 1}, teacher_path)
+    joblib.dump({"model": None, "margin": 2.0, "cutoff": 60.0, "teacher_digest": file_digest(teacher_path)},
+                surrogate_path)
+
+    assert load_surrogate()["margin"] == 2.0
+
+    joblib.dump({"versão": 2}, teacher_path)
+    assert load_surrogate() is None
+
+    joblib.dump({"model": None, "margin": 2.0, "cutoff": 60.0}, surrogate_path)
+    assert load_surrogate() is None
+
+
+def test_surrogate_check_skips_hashing_while_the_teacher_file_is_unchanged(tmp_path, monkeypatch):
+    teacher_path = tmp_path / "perf_regression_model.pkl"
+    surrogate_path = tmp_path / "perf_regression_surrogate.pkl"
+    monkeypatch.setattr(performance_predict, "REGRESSION_MODEL_PATH", teacher_path)
+    monkeypatch.setattr(performance_predict, "SURROGATE_PATH", surrogate_path)
+    joblib.dump({"versão": 1}, teacher_path)
+    joblib.dump({"model": None, "margin": 2.0, "cutoff": 60.0, "teacher_digest": file_digest(teacher_path),
+                 "teacher_signature": file_signature(teacher_path)}, surrogate_path)
+    hashed = []
+    monkeypatch.setattr(performance_predict, "file_digest", lambda path: hashed.append(path) or file_digest(path))
+
+    assert load_surrogate()["margin"] == 2.0
+    assert hashed == []
+
+
+def test_margin_is_widened_until_no_calibration_decision_flips():
+    teacher = np.array([59.0, 61.0, 30.0, 90.0, 64.0])
+    scores = np.array([59.5, 60.5, 31.0, 89.0, 58.0])  # último aluno invertido, 2 pontos do corte
+
+    margin = calibrate_margin(scores, teacher, quantile=0.5)
+
+    assert margin >= abs(58.0 - CUTOFF)
+    confident = np.abs(scores - CUTOFF) > margin
+    assert not (((scores >= CUTOFF) != (teacher >= CUTOFF)) & confident).any()
+    assert calibrate_margin(teacher + 0.5, teacher, quantile=1.0) == pytest.approx(0.5)
+
+
+def test_surrogate_that_flips_decisions_is_not_saved(tmp_path, monkeypatch):
+    surrogate_path = tmp_path / "perf_regression_surrogate.pkl"
+    monkeypatch.setattr(distill_regression, "SURROGATE_PATH", surrogate_path)
+    monkeypatch.setattr(distill_regression, "distill", lambda **kwargs: {
+        "name": "Ridge", "margin": 1.0, "fidelity": {"decision_flips": 2, "coverage": 0.9}
+    })
+    monkeypatch.setattr("sys.argv", ["distill_regression.py"])
+
+    with pytest.raises(SystemExit) as exit_info:
+        distill_regression.main()
+
+    assert exit_info.value.code == 1
+    assert not surrogate_path.exists()
@@ -0,0 +1,34 @@
+import json
+
+import joblib
+import numpy as np
+from sklearn.dummy import DummyClassifier, DummyRegressor
+
+import performance_predict
+from performance_predict import PREPROCESSOR_PATH, predict_performance
+
+STUDENT = {
+    "Hours_Studied": 20, "Attendance": 85, "Parental_Involvement": "Medium", "Access_to_Resources": "Medium",
+    "Extracurricular_Activities": "Yes", "Sleep_Hours": 7, "Motivation_Level": "Medium", "Internet_Access": "Yes",
+    "Tutoring_Sessions": 1, "Family_Income": "Medium", "Teacher_Quality": "Medium", "School_Type": "Public",
+    "Peer_Influence": "Neutral", "Physical_Activity": 3, "Learning_Disabilities": "No",
+    "Parental_Education_Level": "College", "Distance_from_Home": "Near", "Gender": "Female",
+}
+
+
+def test_only_category_skips_training_data_and_explainers(tmp_path, monkeypatch, capsys):
+    X = np.zeros((2, 3))
+    joblib.dump(DummyRegressor(strategy="constant", constant=72.0).fit(X, [0, 0]), tmp_path / "regression.pkl")
+    joblib.dump(DummyClassifier().fit(X, [0, 1]), tmp_path / "rf.pkl")
+    monkeypatch.setattr(performance_predict, "REGRESSION_MODEL_PATH", tmp_path / "regression.pkl")
+    monkeypatch.setattr(performance_predict, "RF_PATH", tmp_path / "rf.pkl")
+    monkeypatch.setattr(performance_predict, "SURROGATE_PATH", tmp_path / "ausente.pkl")
+    monkeypatch.setattr(performance_predict, "DATA_PATH", tmp_path / "ausente.csv")
+    monkeypatch.setattr(performance_predict, "ExplanationSession", lambda *a, **k: 1 / 0)
+    assert PREPROCESSOR_PATH.exists()
+
+    predict_performance(STUDENT, only="category")
+
+    result = json.loads(capsys.readouterr().out)
+    assert result == {"is_approved": True, "approval_status": "APROVADO", "model_used": "regression",
+                      "saved": False, "grade_category": "BOM"}
@@ -0,0 +1,79 @@
+import json
+
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+
+from train_performance_regression import (
+    BUDGET_KEYS, budget_violations, measure_inference_cost, save_scorecard, select_model
+)
+
+COST = {"single_row_ms": 2.0, "batch_ms": 40.0, "size_mb": 12.0, "load_seconds": 0.5}
+
+
+def _candidate(loss, within_budget, **extra):
+    return {"asym_loss_test": np.float64(loss), "within_budget": within_budget,
+            "budget_violations": [] if within_budget else ["size_mb=12.00 > 10"],
+            "model": Ridge(), **extra}
+
+
+def test_measure_inference_cost_reports_every_budgeted_key():
+    X = np.random.default_rng(0).normal(size=(50, 3))
+    model = Ridge().fit(X, X[:, 0])
+
+    cost = measure_inference_cost(model, X, single_repeats=3, batch_repeats=2, batch_size=20)
+
+    assert set(BUDGET_KEYS.values()) <= set(cost)
+    assert cost["batch_rows"] == 20
+    assert all(cost[key] > 0 for key in BUDGET_KEYS.values())
+
+
+@pytest.mark.parametrize("limit_name,cost_key", sorted(BUDGET_KEYS.items()))
+def test_each_budget_key_is_checked(limit_name, cost_key):
+    assert budget_violations(COST, {limit_name: COST[cost_key] * 2}) == []
+    violations = budget_violations(COST, {limit_name: COST[cost_key] / 2})
+    assert len(violations) == 1 and violations[0].startswith(f"{cost_key}=")
+
+
+def test_no_budget_means_no_violations():
+    assert budget_violations(COST, None) == []
+    assert budget_violations(COST, {key: None for key in BUDGET_KEYS}) == []
+
+
+def test_lowest_loss_within_budget_wins():
+    results = {
+        "Random Forest": _candidate(1.0, within_budget=False),
+        "Gradient Boosting": _candidate(3.0, within_budget=True),
+        "Ridge": _candidate(2.0, within_budget=True),
+    }
+
+    assert select_model(results) == "Ridge"
+
+
+def test_lowest_loss_overall_when_nothing_fits():
+    results = {
+        "Random Forest": _candidate(1.5, within_budget=False),
+        "Gradient Boosting": _candidate(1.2, within_budget=False),
+    }
+
+    assert select_model(results) == "Gradient Boosting"
+
+
+def test_scorecard_has_only_serializable_values(tmp_path):
+    results = {
+        "Random Forest": _candidate(1.0, within_budget=False, mae_test=np.float64(3.2), batch_rows=1000,
+                                    pruned_model=Ridge(), pruning={"n_trees": 10}),
+        "Ridge": _candidate(2.0, within_budget=True, mae_test=np.float32(4.5)),
+    }
+    path = tmp_path / "scorecard.json"
+
+    save_scorecard(results, "Ridge", {"max_size_mb": 10, "max_batch_ms": None}, path)
+
+    scorecard = json.loads(path.read_text(encoding="utf-8"))
+    assert scorecard["selected_model"] == "Ridge"
+    assert scorecard["budget"] == {"max_size_mb": 10, "max_batch_ms": None}
+    forest = scorecard["candidates"]["Random Forest"]
+    assert not {"model", "pruned_model", "pruning"} & set(forest)
+    assert forest["mae_test"] == pytest.approx(3.2)
+    assert forest["budget_violations"] == ["size_mb=12.00 > 10"]
+    assert scorecard["candidates"]["Ridge"]["mae_test"] == pytest.approx(4.5)